@@ -1,7 +1,51 @@
-import requests
+import json
+import os
 import sys
+import threading
 from datetime import datetime
 
+API_URL = os.environ.get('DEPREM_API_URL', 'http://localhost:5000')
+
+# Bağlantılar tekrar kullanılır; API'nin ETag'leri saklanır ve değişmeyen
+# yanıtlar için sunucu 304 döner, veri yerel kopyadan okunur.
+# requests ilk istekte içe aktarılır; menü beklemeden açılır.
+_session = None
+_session_kilidi = threading.Lock()
+_yanit_onbellegi = {}
+
+def get_session():
+    global _session
+    with _session_kilidi:
+        if _session is None:
+            import requests
+            _session = requests.Session()
+        return _session
+
+def api_istegi(method, path, **kwargs):
+    """
+    API'ye koşullu istek yapar; (durum kodu, json verisi) döndürür.
+    Bağlantı kurulamazsa ConnectionError fırlatır.
+    """
+    anahtar = (method, path, json.dumps(kwargs, sort_keys=True, default=str))
+    onceki = _yanit_onbellegi.get(anahtar)
+    headers = {'If-None-Match': onceki[0]} if onceki else {}
+
+    session = get_session()
+    import requests
+    try:
+        response = session.request(method, API_URL + path, headers=headers, **kwargs)
+    except requests.exceptions.ConnectionError as e:
+        raise ConnectionError(str(e)) from e
+    if response.status_code == 304 and onceki:
+        return 200, onceki[1]
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = response.json()
+    if response.headers.get('ETag'):
+        _yanit_onbellegi[anahtar] = (response.headers['ETag'], data)
+    return 200, data
+
 def display_earthquakes(earthquakes):
     """Deprem verilerini düzenli bir şekilde göster"""
     print("\n{:<20} {:<15} {:<10}".format("Tarih/Saat", "Konum", "Büyüklük"))
@@ -18,17 +62,16 @@ def display_earthquakes(earthquakes):
 def get_largest_earthquakes():
     """En büyük 5 depremi getir"""
     try:
-        response = requests.get('http://localhost:5000/api/largest-earthquakes')
-        if response.status_code == 200:
-            data = response.json()
+        status_code, data = api_istegi('GET', '/api/largest-earthquakes')
+        if status_code == 200:
             if data['status'] == 'success':
                 print("\n=== En Büyük 5 Deprem ===")
                 display_earthquakes(data['data'])
             else:
                 print("Hata:", data.get('message', 'Bilinmeyen bir hata oluştu'))
         else:
-            print(f"Hata: API yanıt kodu {response.status_code}")
-    except requests.exceptions.ConnectionError:
+            print(f"Hata: API yanıt kodu {status_code}")
+    except ConnectionError:
         print("Hata: API'ye bağlanılamadı. API'nin çalıştığından emin olun.")
     except Exception as e:
         print(f"Hata oluştu: {str(e)}")
@@ -36,19 +79,18 @@ def get_largest_earthquakes():
 def get_earthquakes_by_location(location):
     """Belirli bir konumdaki en büyük 5 depremi getir"""
     try:
-        response = requests.get(f'http://localhost:5000/api/earthquakes-by-location?location={location}')
-        if response.status_code == 200:
-            data = response.json()
+        status_code, data = api_istegi('GET', '/api/earthquakes-by-location', params={'location': location})
+        if status_code == 200:
             if data['status'] == 'success':
                 print(f"\n=== {location} İlindeki En Büyük 5 Deprem ===")
                 display_earthquakes(data['data'])
             else:
                 print("Hata:", data.get('message', 'Bilinmeyen bir hata oluştu'))
-        elif response.status_code == 404:
+        elif status_code == 404:
             print(f"Hata: {location} konumunda deprem kaydı bulunamadı")
         else:
-            print(f"Hata: API yanıt kodu {response.status_code}")
-    except requests.exceptions.ConnectionError:
+            print(f"Hata: API yanıt kodu {status_code}")
+    except ConnectionError:
         print("Hata: API'ye bağlanılamadı. API'nin çalıştığından emin olun.")
     except Exception as e:
         print(f"Hata oluştu: {str(e)}")
@@ -58,13 +100,9 @@ def predict_next_earthquake():
     try:
         location = input("Konum giriniz (örn: IZMIR): ").upper()
 
-        response = requests.post(
-            'http://localhost:5000/api/predict-next-earthquake',
-            json={'location': location}
-        )
+        status_code, data = api_istegi('POST', '/api/predict-next-earthquake', json={'location': location})
 
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             if data['status'] == 'success':
                 print(f"\n=== {data['location']} İçin Deprem Tahmini ===")
                 print(f"Tahmini Büyüklük: {data['predicted_magnitude']}")
@@ -74,23 +112,60 @@ def predict_next_earthquake():
             else:
                 print("Hata:", data.get('message', 'Bilinmeyen bir hata oluştu'))
         else:
-            print(f"Hata: API yanıt kodu {response.status_code}")
+            print(f"Hata: API yanıt kodu {status_code}")
+
+    except ConnectionError:
+        print("Hata: API'ye bağlanılamadı. API'nin çalıştığından emin olun.")
+    except Exception as e:
+        print(f"Hata oluştu: {str(e)}")
+
+def predict_all_earthquakes():
+    """Tüm konumlar (veya virgülle ayrılmış konumlar) için tek istekte tahmin yap"""
+    try:
+        secim = input("Konumlar (virgülle ayırın, tümü için boş bırakın): ").strip().upper()
+        locations = [k.strip() for k in secim.split(',') if k.strip()] if secim else 'all'
+
+        status_code, data = api_istegi('POST', '/api/predict-next-earthquakes', json={'locations': locations})
+
+        if status_code == 200:
+            if data['status'] == 'success':
+                print("\n=== Toplu Deprem Tahmini ===")
+                print("\n{:<20} {:<12} {:<20}".format("Konum", "Büyüklük", "Süre"))
+                print("-" * 52)
+                for tahmin in data['data']:
+                    if tahmin['status'] == 'success':
+                        print("{:<20} {:<12} {:<20}".format(
+                            tahmin['location'],
+                            tahmin['predicted_magnitude'],
+                            tahmin['predicted_time_range']
+                        ))
+                    else:
+                        print("{:<20} {}".format(tahmin['location'], tahmin['message']))
+                print("\nNOT: Bu tahminler sadece geçmiş verilere dayalı istatistiksel bir yaklaşımdır.")
+                print("Kesin sonuçlar vermez ve gerçek deprem tahmini için kullanılamaz.")
+            else:
+                print("Hata:", data.get('message', 'Bilinmeyen bir hata oluştu'))
+        else:
+            print(f"Hata: API yanıt kodu {status_code}")
 
-    except requests.exceptions.ConnectionError:
+    except ConnectionError:
         print("Hata: API'ye bağlanılamadı. API'nin çalıştığından emin olun.")
     except Exception as e:
         print(f"Hata oluştu: {str(e)}")
 
 def main_menu():
     """Ana menüyü göster ve kullanıcı seçimlerini işle"""
+    # Kullanıcı seçim yaparken requests arka planda yüklenir
+    threading.Thread(target=get_session, daemon=True).start()
     while True:
         print("\n=== Deprem Verileri Uygulaması ===")
         print("1. En Büyük 5 Depremi Göster")
         print("2. Tek Konuma Göre Deprem Ara")
         print("3. Deprem Tahmini Yap")
-        print("4. Çıkış")
+        print("4. Toplu Deprem Tahmini Yap")
+        print("5. Çıkış")
 
-        choice = input("\nSeçiminiz (1-4): ")
+        choice = input("\nSeçiminiz (1-5): ")
 
         if choice == '1':
             get_largest_earthquakes()
@@ -100,10 +175,12 @@ def main_menu():
         elif choice == '3':
             predict_next_earthquake()
         elif choice == '4':
+            predict_all_earthquakes()
+        elif choice == '5':
             print("Program sonlandırılıyor...")
             sys.exit(0)
         else:
-            print("Geçersiz seçim! Lütfen 1-4 arasında bir sayı giriniz.")
+            print("Geçersiz seçim! Lütfen 1-5 arasında bir sayı giriniz.")
 
 if __name__ == "__main__":
     main_menu()
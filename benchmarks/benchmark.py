@@ -0,0 +1,717 @@
+# Deprem projesi performans ölçümleri.
+#
+# Sentetik katalog üretir (earthquakes.csv ve updated_earthquakes.csv
+# biçiminde) ve etiketleme, özellik üretimi, eğitim, model yükleme, tahmin ile
+# API uç noktalarını, API ve CLI'nin ilk yanıta kadar geçen başlangıç süresini ve
+# yerel bir Kandilli taklidine karşı veri alma servisinin tazelik gecikmesini ve
+# geriye dönük testin süresini ölçer. Sonuçlar kayıtlı bir temel (baseline) JSON ile
+# karşılaştırılır; eşikten yavaş ölçümler gerileme olarak raporlanır.
+#
+#   python benchmarks/benchmark.py --sizes 10000 100000
+#   python benchmarks/benchmark.py --sizes 10000 --save-baseline
+#   python benchmarks/benchmark.py --sizes 10000 --only labelling features
+import argparse
+import gc
+import json
+import os
+import pickle
+import platform
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# Proje modülleri scripts/ ve models/ altında
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(benchmark_dir)
+sys.path.append(os.path.join(project_dir, 'scripts'))
+sys.path.append(os.path.join(project_dir, 'models'))
+
+baseline_path = os.path.join(benchmark_dir, 'baseline.json')
+
+TARIH_FORMATI = '%Y-%m-%d %H:%M:%S'
+
+# Türkiye ve çevresini kapsayan koordinat kutusu
+ENLEM_ARALIGI = (35.0, 43.0)
+BOYLAM_ARALIGI = (25.0, 45.5)
+
+OLCUMLER = ['ingest', 'labelling', 'features', 'training', 'model_load', 'predict', 'endpoints',
+            'startup', 'daemon', 'backtest']
+
+# İlk yanıta kadar geçen süre hedefleri (sn). API için süreç başlangıcından
+# ilk 200 yanıtına, anlık görüntüler hazırken; CLI için menü, ilk istek ve
+# çıkış dahil. Hedefi aşan ölçümler gerileme gibi hata döndürür.
+BASLANGIC_HEDEFLERI = {
+    'api_first_response': 1.5,
+    'cli_first_response': 0.5,
+}
+
+
+def tepe_bellek_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return tepe / (1024 * 1024) if sys.platform == 'darwin' else tepe / 1024
+
+
+# ---------------------------------------------------------------------------
+# Sentetik katalog üreticileri
+# ---------------------------------------------------------------------------
+
+def sentetik_ham_katalog(n, seed=42, baslangic='2020-01-01'):
+    """earthquakes.csv biçiminde n satırlık, zamana göre artan sentetik katalog"""
+    rng = np.random.default_rng(seed)
+    aralik = rng.exponential(300.0, n).round().astype(np.int64) + 1
+    tarih = pd.Timestamp(baslangic) + pd.to_timedelta(np.cumsum(aralik), unit='s')
+    # Gutenberg-Richter benzeri büyüklük dağılımı
+    buyukluk = np.minimum(1.0 + rng.exponential(0.45, n), 7.8).round(1)
+    return pd.DataFrame({
+        'Tarih': tarih,
+        'Enlem': rng.uniform(*ENLEM_ARALIGI, n).round(4),
+        'Boylam': rng.uniform(*BOYLAM_ARALIGI, n).round(4),
+        'Derinlik': rng.uniform(0.0, 30.0, n).round(1),
+        'Buyukluk': buyukluk,
+        'Yer': rng.choice(['AKDENIZ', 'EGE DENIZI', 'MARMARA DENIZI', 'KARADENIZ'], n) + ' İlksel',
+    })
+
+
+def sentetik_etiketli_katalog(ham):
+    """updated_earthquakes.csv biçimi: ham katalog il bilgisiyle etiketlenir"""
+    import data_processing
+    return data_processing.etiketle(ham)
+
+
+# ---------------------------------------------------------------------------
+# Ölçüm yardımcıları
+# ---------------------------------------------------------------------------
+
+def zamanla(fn, tekrar=1, bellek=False, birim=1):
+    """
+    fn'i tekrar kez çalıştırır. Süreler (sn), birim/saniye verim ve istenirse
+    tracemalloc ile ilk çalıştırmadaki tepe Python/NumPy belleği döner.
+    """
+    tepe = None
+    if bellek:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        tepe = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    sureler = []
+    for _ in range(tekrar):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        sureler.append(time.perf_counter() - t0)
+    medyan = float(np.median(sureler))
+    return {
+        'seconds': medyan,
+        'min_seconds': float(min(sureler)),
+        'throughput': birim / medyan if medyan > 0 else None,
+        'peak_mb': tepe,
+    }
+
+
+def gecikme(fn, cagri=200, isinma=5):
+    """Tek tek çağrıların gecikme yüzdelikleri (ms) ve saniyedeki çağrı sayısı"""
+    for _ in range(isinma):
+        fn()
+    sureler = np.empty(cagri)
+    for i in range(cagri):
+        t0 = time.perf_counter()
+        fn()
+        sureler[i] = time.perf_counter() - t0
+    return {
+        'seconds': float(np.median(sureler)),
+        'p50_ms': float(np.percentile(sureler, 50) * 1000),
+        'p95_ms': float(np.percentile(sureler, 95) * 1000),
+        'p99_ms': float(np.percentile(sureler, 99) * 1000),
+        'throughput': float(cagri / sureler.sum()),
+        'peak_mb': None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Ölçümler
+# ---------------------------------------------------------------------------
+
+class Baglam:
+    """Ölçümler arasında paylaşılan sentetik veri ve modeller"""
+
+    def __init__(self, n, args, gecici):
+        self.n = n
+        self.args = args
+        self.gecici = gecici
+        self.ham = sentetik_ham_katalog(n, seed=args.seed)
+        self.etiketli = None
+        self.ozellikli = None
+        self.modeller = None
+        self.encoder = None
+        self.model_yollari = None
+
+    def etiketli_katalog(self):
+        if self.etiketli is None:
+            self.etiketli = sentetik_etiketli_katalog(self.ham)
+        return self.etiketli
+
+    def ozellikli_katalog(self):
+        if self.ozellikli is None:
+            import model_training
+            df = self.etiketli_katalog().copy()
+            self.encoder = model_training.encode_locations(df)
+            self.ozellikli = model_training.create_features(df)
+        return self.ozellikli
+
+    def egitilmis_modeller(self):
+        if self.modeller is None:
+            import model_training
+            self.modeller = model_training.train_models(self.ozellikli_katalog().copy(), self.args.jobs)[:2]
+        return self.modeller
+
+
+def kandilli_sayfasi(ham):
+    """Ham kayıtları lst0.asp biçiminde bir sayfaya dönüştürür"""
+    satirlar = [f"{t.strftime('%Y.%m.%d %H:%M:%S')}  {r.Enlem:7.4f}   {r.Boylam:7.4f}       "
+                f"{r.Derinlik:4.1f}      -.-  {r.Buyukluk:.1f}  -.-   {r.Yer:<60}"
+                for t, r in zip(ham['Tarih'], ham.itertuples())]
+    return '\n'.join(['<pre>'] * 6 + satirlar)
+
+
+def olc_ingest(b):
+    """Kandilli sayfasının ayrıştırılması ve anahtar dizinine birleştirme"""
+    import data_scrapper
+    import earthquake_store
+
+    ham = b.ham.tail(min(b.n, 500))
+    sayfa = kandilli_sayfasi(ham)
+    satirlar = sayfa.split('\n')[6:]
+
+    sonuc = {'parse_page': zamanla(lambda: data_scrapper.parse_kandilli(sayfa), tekrar=5,
+                                   birim=len(satirlar))}
+
+    # Katalog geçici dizinde; sayfadaki satırlar zaten katalogda olduğu için
+    # birleştirme, her taramadaki gibi yalnızca tekrar kontrolünü ölçer
+    for ad in ('csv_path', 'keys_path', 'state_path', 'journal_path'):
+        setattr(earthquake_store, ad, os.path.join(b.gecici, os.path.basename(getattr(earthquake_store, ad))))
+    ham_csv = b.ham.copy()
+    ham_csv['Tarih'] = ham_csv['Tarih'].dt.strftime(TARIH_FORMATI)
+    ham_csv.to_csv(earthquake_store.csv_path, index=False)
+    sonuc['key_index_build'] = zamanla(earthquake_store.rebuild, birim=b.n)
+    sayfa_df = data_scrapper.parse_kandilli(sayfa)
+    sonuc['merge_page'] = zamanla(lambda: earthquake_store.merge(sayfa_df), tekrar=3,
+                                  bellek=b.args.memory, birim=len(sayfa_df))
+    return sonuc
+
+
+def olc_labelling(b):
+    """Toplu il etiketleme: tek süreç ve --jobs süreçle parçalı"""
+    import geo_labeling
+
+    lats, lons = b.ham['Enlem'].to_numpy(), b.ham['Boylam'].to_numpy()
+    etiketleyici = geo_labeling.varsayilan_etiketleyici()
+    sonuc = {
+        'geo_labeling': zamanla(lambda: etiketleyici.etiketle(lats, lons), tekrar=3,
+                                bellek=b.args.memory, birim=b.n),
+    }
+    if b.args.jobs and b.args.jobs > 1:
+        parca = max(len(lats) // b.args.jobs, 1)
+        sonuc['geo_labeling_parallel'] = zamanla(
+            lambda: geo_labeling.etiketle(lats, lons, workers=b.args.jobs, parca=parca), birim=b.n)
+    return sonuc
+
+
+def olc_features(b):
+    import model_training
+
+    df = b.etiketli_katalog().copy()
+    model_training.encode_locations(df)
+    return {'create_features': zamanla(lambda: model_training.create_features(df.copy()),
+                                       bellek=b.args.memory, birim=b.n)}
+
+
+def olc_training(b):
+    import model_training
+
+    df = b.ozellikli_katalog()
+    sonuc = zamanla(lambda: model_training.train_models(df.copy(), b.args.jobs),
+                    bellek=b.args.memory, birim=b.n)
+    return {'train_models': sonuc}
+
+
+def _model_dosyalari(b):
+    """Eğitilen modelleri geçici dizine pickle ve düz dizi olarak yazar"""
+    import compact_model
+
+    if b.model_yollari is not None:
+        return b.model_yollari
+    magnitude_model, time_model = b.egitilmis_modeller()
+    compact_model.compact_root = os.path.join(b.gecici, 'compact')
+    yollar = {}
+    for ad, model in (('magnitude_model', magnitude_model), ('time_model', time_model)):
+        yol = os.path.join(b.gecici, f'{ad}.pkl')
+        with open(yol, 'wb') as f:
+            pickle.dump(model, f)
+        yollar[ad] = (yol, compact_model.export_forest(model, ad))
+    with open(os.path.join(b.gecici, 'label_encoder.pkl'), 'wb') as f:
+        pickle.dump(b.encoder, f)
+    b.model_yollari = yollar
+    return yollar
+
+
+def olc_model_load(b):
+    import compact_model
+    from registry import load_pickle
+
+    sonuc = {}
+    for ad, (pkl, manifest) in _model_dosyalari(b).items():
+        sonuc[f'{ad}_pickle'] = zamanla(lambda: load_pickle(pkl), tekrar=5)
+        sonuc[f'{ad}_compact'] = zamanla(lambda: compact_model.load_forest(manifest), tekrar=5)
+    return sonuc
+
+
+def olc_predict(b):
+    import compact_model
+    from feature_store import FEATURES
+
+    magnitude_model, time_model = b.egitilmis_modeller()
+    X = b.ozellikli_katalog()[FEATURES].fillna(0)
+    tek = X.iloc[:1]
+    toplu = X.iloc[:min(len(X), 81)]
+    yollar = _model_dosyalari(b)
+    kompakt = compact_model.load_forest(yollar['magnitude_model'][1])
+    kompakt_zaman = compact_model.load_forest(yollar['time_model'][1])
+
+    return {
+        'sklearn_single': gecikme(lambda: magnitude_model.predict(tek), cagri=100),
+        'sklearn_batch81': gecikme(lambda: magnitude_model.predict(toplu), cagri=50),
+        'compact_single': gecikme(lambda: kompakt.predict(tek), cagri=200),
+        'compact_batch81': gecikme(lambda: kompakt.predict(toplu), cagri=100),
+        'compact_time_batch81': gecikme(lambda: kompakt_zaman.predict(toplu), cagri=100),
+    }
+
+
+def olc_backtest(b):
+    """
+    Sentetik kataloğun günlük adımlarla geriye dönük testi; iller --jobs
+    süreçle paralel işlenir. Verim katalog satırı başınadır.
+    """
+    import model_training
+
+    _model_dosyalari(b)
+    csv_yolu = os.path.join(b.gecici, 'updated_earthquakes.csv')
+    b.etiketli_katalog().to_csv(csv_yolu, index=False, date_format=TARIH_FORMATI)
+    model_training.backtest_dir = os.path.join(b.gecici, 'backtest')
+    args = argparse.Namespace(adim='1D', donem='M', baslangic=None, bitis=None, model_dizini=b.gecici,
+                              jobs=b.args.jobs)
+    return {'replay_daily': zamanla(lambda: model_training.geriye_donuk_test(csv_yolu, args),
+                                    bellek=b.args.memory, birim=b.n)}
+
+
+def olc_endpoints(b):
+    """
+    Flask uç noktaları test istemcisiyle ölçülür. api modülü içe aktarılınca
+    projedeki katalog ve modeller yüklenir; ardından registry sentetik
+    dosyalara yönlendirilir.
+    """
+    import api
+    import compact_model
+    from catalog_index import load_catalog_index, append_catalog_index
+    from registry import load_pickle
+    from response_cache import ResponseCache
+
+    api.registry.stop_watcher()
+    yollar = _model_dosyalari(b)
+    csv_yolu = os.path.join(b.gecici, 'updated_earthquakes.csv')
+    b.etiketli_katalog().to_csv(csv_yolu, index=False, date_format=TARIH_FORMATI)
+    api.registry.register('catalog', csv_yolu, load_catalog_index, append_catalog_index)
+    api.registry.register('label_encoder', os.path.join(b.gecici, 'label_encoder.pkl'), load_pickle)
+    for ad, (_, manifest) in yollar.items():
+        api.registry.register(ad, manifest, compact_model.load_forest)
+    api.registry.load_all()
+
+    konum = b.etiketli_katalog()['Konum'].value_counts().index[0]
+    client = api.app.test_client()
+    istekler = {
+        'largest': lambda: client.get('/api/largest-earthquakes?k=5'),
+        'largest_range': lambda: client.get('/api/largest-earthquakes?k=20&start=2020-06-01&end=2020-12-31'),
+        'by_location': lambda: client.get('/api/earthquakes-by-location', query_string={'location': konum}),
+        'predict': lambda: client.post('/api/predict-next-earthquake', json={'location': konum}),
+        'predict_all': lambda: client.post('/api/predict-next-earthquakes', json={'locations': 'all'}),
+    }
+
+    sonuc = {}
+    onbellek = api.response_cache
+    try:
+        for ad, istek in istekler.items():
+            # Önbelleksiz: kayıt tutmayan önbellekle her istek yeniden hesaplanır
+            api.response_cache = ResponseCache(max_entries=0)
+            assert istek().status_code == 200, ad
+            sonuc[ad] = gecikme(istek, cagri=100)
+            api.response_cache = onbellek
+            sonuc[f'{ad}_cached'] = gecikme(istek, cagri=200)
+    finally:
+        api.response_cache = onbellek
+    return sonuc
+
+
+def _bos_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _proje_agaci(b):
+    """
+    API yollarını kendi dosya konumundan bulur; sentetik veri ve modellerle
+    geçici bir proje ağacı (scripts/, data/, models/compact/) kurulur
+    """
+    import compact_model
+
+    kok = os.path.join(b.gecici, 'YapayZekaSon1')
+    if os.path.exists(kok):
+        return kok
+    _model_dosyalari(b)
+    compact_model.export_encoder(b.encoder)
+    shutil.copytree(os.path.join(project_dir, 'scripts'), os.path.join(kok, 'scripts'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    shutil.copy(os.path.join(project_dir, 'app.py'), kok)
+    os.makedirs(os.path.join(kok, 'data'))
+    shutil.copy(os.path.join(project_dir, 'data', 'turkiye_il_koordinatlari.json'), os.path.join(kok, 'data'))
+    ham = b.ham.copy()
+    ham['Tarih'] = ham['Tarih'].dt.strftime(TARIH_FORMATI)
+    ham.to_csv(os.path.join(kok, 'data', 'earthquakes.csv'), index=False)
+    b.etiketli_katalog().to_csv(os.path.join(kok, 'data', 'updated_earthquakes.csv'), index=False,
+                                date_format=TARIH_FORMATI)
+    shutil.copytree(compact_model.compact_root, os.path.join(kok, 'models', 'compact'))
+    return kok
+
+
+def _ilk_yanit(kok, port, zaman_asimi=300):
+    """API sürecini başlatır; (süreç, ilk 200 yanıtına kadar geçen süre) döndürür"""
+    t0 = time.perf_counter()
+    surec = subprocess.Popen([sys.executable, os.path.join(kok, 'scripts', 'api.py'), '--serve',
+                              '--port', str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/api/largest-earthquakes'
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as yanit:
+                if yanit.status == 200:
+                    return surec, time.perf_counter() - t0
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        if surec.poll() is not None or time.perf_counter() - t0 > zaman_asimi:
+            surec.kill()
+            raise RuntimeError('API başlatılamadı')
+        time.sleep(0.005)
+
+
+def olc_startup(b):
+    """
+    Ayrı süreçlerde başlangıç süreleri: anlık görüntü yokken (soğuk) ve
+    varken API'nin ilk yanıtı, ilk tahmin isteği ve CLI'nin bir sorgu yapıp
+    çıkması
+    """
+    kok = _proje_agaci(b)
+    shutil.rmtree(os.path.join(kok, 'data', 'snapshots'), ignore_errors=True)
+    konum = b.etiketli_katalog()['Konum'].value_counts().index[0]
+    sonuc = {}
+
+    port = _bos_port()
+    surec, sure = _ilk_yanit(kok, port)
+    surec.terminate()
+    surec.wait()
+    sonuc['api_first_response_cold'] = {'seconds': sure}
+
+    port = _bos_port()
+    surec, sure = _ilk_yanit(kok, port)
+    try:
+        sonuc['api_first_response'] = {'seconds': sure}
+        istek = urllib.request.Request(f'http://127.0.0.1:{port}/api/predict-next-earthquake',
+                                       data=json.dumps({'location': konum}).encode('utf-8'),
+                                       headers={'Content-Type': 'application/json'})
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(istek, timeout=30) as yanit:
+            assert yanit.status == 200
+        sonuc['api_first_prediction'] = {'seconds': time.perf_counter() - t0}
+
+        t0 = time.perf_counter()
+        cikti = subprocess.run([sys.executable, os.path.join(kok, 'app.py')], input='1\n5\n',
+                               capture_output=True, text=True, timeout=60,
+                               env=dict(os.environ, DEPREM_API_URL=f'http://127.0.0.1:{port}'))
+        sonuc['cli_first_response'] = {'seconds': time.perf_counter() - t0}
+        assert 'En Büyük 5 Deprem' in cikti.stdout, cikti.stdout
+    finally:
+        surec.terminate()
+        surec.wait()
+
+    for ad, hedef in BASLANGIC_HEDEFLERI.items():
+        sonuc[ad]['target_seconds'] = hedef
+    return sonuc
+
+
+class KandilliTaklidi:
+    """
+    Yerel Kandilli taklidi: eklenen olayların son 500'ünü lst0.asp biçiminde
+    sunar. ETag göndermez; değişiklik içerik özetinden anlaşılır.
+    """
+
+    def __init__(self, ham):
+        self.olaylar = ham.tail(500).reset_index(drop=True)
+        self._lock = threading.Lock()
+        taklit = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with taklit._lock:
+                    govde = kandilli_sayfasi(taklit.olaylar).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(govde)))
+                self.end_headers()
+                self.wfile.write(govde)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.sunucu = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.sunucu.server_address[1]}/lst0.asp'
+        threading.Thread(target=self.sunucu.serve_forever, daemon=True).start()
+
+    def ekle(self, olaylar):
+        with self._lock:
+            self.olaylar = pd.concat([self.olaylar, olaylar], ignore_index=True).tail(500)
+
+    def kapat(self):
+        self.sunucu.shutdown()
+        self.sunucu.server_close()
+
+
+def _metrikleri_oku(url):
+    """Prometheus metin çıktısını {'ad{etiketler}': değer} sözlüğüne çevirir"""
+    with urllib.request.urlopen(url, timeout=5) as yanit:
+        metin = yanit.read().decode('utf-8')
+    return {m.group(1): float(m.group(2)) for m in re.finditer(r'^([^#\s][^ ]*) (\S+)$', metin, re.M)}
+
+
+def _bekle(kosul, zaman_asimi, aralik=0.1):
+    son = time.monotonic() + zaman_asimi
+    while time.monotonic() < son:
+        try:
+            if kosul():
+                return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(aralik)
+    return False
+
+
+def olc_daemon(b, sure=10.0, tik=0.5, olay_araligi=0.25):
+    """
+    Veri alma servisi, API ve yerel Kandilli taklidi ayrı süreçlerde
+    çalışırken taklide düzenli olarak yeni olaylar eklenir. Olay zamanından
+    API'de sorgulanabilir olmasına kadar geçen süre (tazelik) ve aşama
+    süreleri servisin /metrics çıktısından okunur; API'deki toplam sayı
+    eklenen olaylarla karşılaştırılır.
+    """
+    if b.ham['Tarih'].max() >= pd.Timestamp.now(tz='Europe/Istanbul').tz_localize(None):
+        # Yeni olaylar filigrandan eski kalır ve işlenmez
+        print("  sentetik katalog bugünü aşıyor, daemon ölçümü atlandı")
+        return {}
+    kok = _proje_agaci(b)
+    for ad in ('processing_state.json', 'scraper_state.json', 'earthquakes.keys', 'earthquakes_state.json',
+                'earthquakes.changes'):
+        yol = os.path.join(kok, 'data', ad)
+        if os.path.exists(yol):
+            os.remove(yol)
+    taklit = KandilliTaklidi(b.ham)
+    api_port, metrik_port = _bos_port(), _bos_port()
+    api, _ = _ilk_yanit(kok, api_port)
+    servis = None
+    try:
+        servis = subprocess.Popen(
+            [sys.executable, os.path.join(kok, 'scripts', 'ingest_daemon.py'), '--url', taklit.url,
+             '--api', f'http://127.0.0.1:{api_port}', '--aralik', str(tik),
+             '--metrics-port', str(metrik_port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        metrik_url = f'http://127.0.0.1:{metrik_port}/metrics'
+        # İlk çalıştırmada tam işleme yapılır; ölçüm ondan sonra başlar
+        if not _bekle(lambda: _metrikleri_oku(metrik_url).get('earthquake_ingest_behind') == 0.0
+                      and _metrikleri_oku(metrik_url).get('earthquake_ingest_ticks_total{result="unchanged"}', 0) > 0,
+                      300):
+            raise RuntimeError('Veri alma servisi başlatılamadı')
+
+        rng = np.random.default_rng(b.args.seed)
+        uretilen = 0
+        bitis = time.monotonic() + sure
+        while time.monotonic() < bitis:
+            ornek = b.ham.sample(2, random_state=int(rng.integers(1 << 31))).copy()
+            ornek['Tarih'] = pd.Timestamp.now(tz='Europe/Istanbul').tz_localize(None).floor('s')
+            ornek['Enlem'] += rng.uniform(-0.01, 0.01, len(ornek))
+            taklit.ekle(ornek)
+            uretilen += len(ornek)
+            time.sleep(olay_araligi)
+
+        anahtar = 'earthquake_ingest_events_total{stage="queryable"}'
+        if not _bekle(lambda: _metrikleri_oku(metrik_url).get(anahtar, 0) >= uretilen, 60):
+            raise RuntimeError('Eklenen olaylar API\'ye ulaşmadı')
+        degerler = _metrikleri_oku(metrik_url)
+        with urllib.request.urlopen(f'http://127.0.0.1:{api_port}/api/aggregates', timeout=10) as yanit:
+            toplam = json.loads(yanit.read())['count']
+        assert toplam == b.n + uretilen, (toplam, b.n + uretilen)
+    finally:
+        if servis is not None:
+            servis.send_signal(signal.SIGTERM)
+            try:
+                servis.wait(30)
+            except subprocess.TimeoutExpired:
+                servis.kill()
+        api.terminate()
+        api.wait()
+        taklit.kapat()
+
+    def ortalama(ad, etiket=''):
+        sayi = degerler.get(f'{ad}_count{etiket}', 0)
+        return {'seconds': degerler[f'{ad}_sum{etiket}'] / sayi if sayi else None, 'count': int(sayi)}
+
+    sonuc = {
+        'freshness_mean': ortalama('earthquake_ingest_freshness_seconds'),
+        'pipeline_latency_mean': ortalama('earthquake_ingest_pipeline_latency_seconds'),
+    }
+    for asama in ('fetch', 'label', 'notify'):
+        sonuc[f'stage_{asama}'] = ortalama('earthquake_ingest_stage_duration_seconds', f'{{stage="{asama}"}}')
+    return sonuc
+
+
+OLCUM_FONKSIYONLARI = {
+    'ingest': olc_ingest,
+    'labelling': olc_labelling,
+    'features': olc_features,
+    'training': olc_training,
+    'model_load': olc_model_load,
+    'predict': olc_predict,
+    'endpoints': olc_endpoints,
+    'startup': olc_startup,
+    'daemon': olc_daemon,
+    'backtest': olc_backtest,
+}
+
+
+# ---------------------------------------------------------------------------
+# Temel ile karşılaştırma ve rapor
+# ---------------------------------------------------------------------------
+
+def karsilastir(sonuclar, temel, esik):
+    """Temelden esik katından yavaş ölçümleri döndürür"""
+    gerilemeler = []
+    for anahtar, sonuc in sonuclar.items():
+        eski = temel.get('results', {}).get(anahtar)
+        if not eski or not eski.get('seconds') or sonuc.get('seconds') is None:
+            continue
+        oran = sonuc['seconds'] / eski['seconds']
+        sonuc['baseline_ratio'] = round(oran, 3)
+        if oran > esik:
+            gerilemeler.append((anahtar, oran))
+    return gerilemeler
+
+
+def hedef_disi(sonuclar):
+    """Hedef süresini aşan ölçümler"""
+    return [(anahtar, s['seconds'], s['target_seconds']) for anahtar, s in sonuclar.items()
+            if s.get('target_seconds') is not None and s['seconds'] > s['target_seconds']]
+
+
+def yazdir(sonuclar):
+    print(f"\n{'Ölçüm':<48} {'süre':>10} {'verim/sn':>12} {'p95 ms':>9} {'bellek MB':>10} {'temel':>7}")
+    print('-' * 100)
+    for anahtar, s in sonuclar.items():
+        sure = f"{s['seconds'] * 1000:.2f}ms" if s['seconds'] < 1 else f"{s['seconds']:.2f}s"
+        verim = f"{s['throughput']:.0f}" if s.get('throughput') else '-'
+        p95 = f"{s['p95_ms']:.2f}" if s.get('p95_ms') is not None else '-'
+        bellek = f"{s['peak_mb']:.1f}" if s.get('peak_mb') is not None else '-'
+        oran = f"{s['baseline_ratio']:.2f}x" if s.get('baseline_ratio') else '-'
+        print(f"{anahtar:<48} {sure:>10} {verim:>12} {p95:>9} {bellek:>10} {oran:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deprem projesi performans ölçümleri')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000],
+                        help='Sentetik katalog boyutları (ör. 10000 100000 1000000 10000000)')
+    parser.add_argument('--only', nargs='+', choices=OLCUMLER, default=OLCUMLER,
+                        help='Yalnızca seçilen ölçümleri çalıştır')
+    parser.add_argument('--jobs', type=int, default=-1, help='Eğitimde kullanılacak çekirdek sayısı')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--memory', action='store_true',
+                        help='Toplu ölçümlerde tracemalloc ile tepe belleği de ölç (ek bir çalıştırma)')
+    parser.add_argument('--baseline', default=baseline_path, help='Karşılaştırılacak temel JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='Sonuçları temel olarak kaydet')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Temelden bu kat yavaş ölçümler gerileme sayılır')
+    parser.add_argument('--output', help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    sonuclar = {}
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory(prefix='deprem-bench-') as gecici:
+            b = Baglam(n, args, gecici)
+            for ad in args.only:
+                print(f"[n={n}] {ad} ölçülüyor...", flush=True)
+                for olcum, sonuc in OLCUM_FONKSIYONLARI[ad](b).items():
+                    sonuclar[f'{ad}.{olcum}@{n}'] = sonuc
+
+    rapor = {
+        'created': pd.Timestamp.now().strftime(TARIH_FORMATI),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'process_peak_mb': tepe_bellek_mb(),
+        'results': sonuclar,
+    }
+
+    gerilemeler = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            gerilemeler = karsilastir(sonuclar, json.load(f), args.threshold)
+    yazdir(sonuclar)
+    if rapor['process_peak_mb'] is not None:
+        print(f"\nSüreç tepe belleği: {rapor['process_peak_mb']:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+        print(f"Temel '{args.baseline}' dosyasına kaydedildi.")
+
+    if gerilemeler:
+        print(f"\n{len(gerilemeler)} ölçümde gerileme (eşik {args.threshold}x):")
+        for anahtar, oran in gerilemeler:
+            print(f"  {anahtar}: {oran:.2f}x")
+    asanlar = hedef_disi(sonuclar)
+    if asanlar:
+        print(f"\n{len(asanlar)} ölçüm başlangıç hedefini aşıyor:")
+        for anahtar, sure, hedef in asanlar:
+            print(f"  {anahtar}: {sure:.2f} sn (hedef {hedef:.2f} sn)")
+    if gerilemeler or asanlar:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
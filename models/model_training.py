@@ -1,31 +1,160 @@
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import ParameterGrid, TimeSeriesSplit, train_test_split
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.metrics import mean_squared_error, accuracy_score
 import pickle
+import os
+import shutil
+import sys
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows'ta yok; tepe bellek ölçülemez
+    resource = None
+
+# Ortak modüller scripts/ altında
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_dir, 'scripts'))
+
+import columnar_store
+import compact_model
+from atomic_io import atomic_write_bytes, atomic_write_json, read_json
+from feature_store import FEATURES, SONAY_OZELLIKLERI, FeatureStore, ProvinceState, compute_features
+from registry import load_pickle
+
+# Dosya yollarını düzgün şekilde oluştur
+project_root = os.path.dirname(project_dir)
+data_dir = os.path.join(project_root, 'YapayZekaSon1', 'data')
+model_dir = os.path.join(project_root, 'YapayZekaSon1', 'models')
+state_path = os.path.join(model_dir, 'training_state.json')
+tuning_dir = os.path.join(model_dir, 'tuning')
+backtest_dir = os.path.join(model_dir, 'backtest')
+
+# Ormanların ortak ayarları
+AGAC_SAYISI = 200
+ORMAN_PARAMETRELERI = dict(
+    max_depth=15,
+    min_samples_split=5,
+    min_samples_leaf=2,
+    random_state=42
+)
+
+# Hiperparametre aramasının varsayılan ızgarası; --grid ile aynı yapıda
+# bir JSON dosyası verilebilir. Verilmeyen ayarlar yukarıdakilerden alınır.
+ARAMA_IZGARASI = {
+    'magnitude': {'n_estimators': [100, 200], 'max_depth': [10, 15, 20], 'min_samples_leaf': [1, 2, 4]},
+    'time': {'n_estimators': [100, 200], 'max_depth': [10, 15, 20], 'min_samples_leaf': [1, 2, 4]},
+}
+
+# Akış modunda okunan parçanın ve özellik hesabının satır başına yaklaşık
+# bellek maliyeti (bayt); parça boyu bellek sınırından buna göre seçilir
+SATIR_BASI_BAYT = 1024
+# Zaman kategorilerinin saat sınırları (create_time_category ile aynı)
+ZAMAN_SINIRLARI = [6, 12, 24, 72]
+
+def get_model_path(model_name):
+    return os.path.join(model_dir, f'{model_name}.pkl')
+
+def save_pickle(nesne, path):
+    # Atomik yazım: API'deki registry yarım yazılmış modeli okumaz
+    atomic_write_bytes(path, pickle.dumps(nesne))
+
+def tepe_bellek_mb():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (MB), ölçülemezse None"""
+    if resource is None:
+        return None
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsinden
+    return tepe / (1024 * 1024) if sys.platform == 'darwin' else tepe / 1024
+
+class Olcum:
+    """Eğitim aşamalarının sürelerini ve toplam süreyi tutar"""
+
+    def __init__(self):
+        self.baslangic = time.perf_counter()
+        self.asamalar = {}
+
+    @contextmanager
+    def asama(self, ad):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.asamalar[ad] = self.asamalar.get(ad, 0.0) + time.perf_counter() - t0
+
+    def rapor(self):
+        return {
+            'toplam_sn': round(time.perf_counter() - self.baslangic, 3),
+            'asamalar_sn': {ad: round(sure, 3) for ad, sure in self.asamalar.items()},
+            'tepe_bellek_mb': None if tepe_bellek_mb() is None else round(tepe_bellek_mb(), 1),
+        }
+
+    def yazdir(self):
+        rapor = self.rapor()
+        for ad, sure in rapor['asamalar_sn'].items():
+            print(f"  {ad:<14}: {sure:.2f} sn")
+        print(f"Toplam süre: {rapor['toplam_sn']:.2f} sn")
+        if rapor['tepe_bellek_mb'] is None:
+            print("Tepe bellek: ölçülemedi")
+        else:
+            print(f"Tepe bellek: {rapor['tepe_bellek_mb']:.1f} MB")
+        return rapor
+
+def is_butcesi(n_jobs=None):
+    """n_jobs verilmezse ya da 1'den küçükse tüm çekirdekler kullanılır"""
+    if n_jobs is None or n_jobs < 1:
+        return os.cpu_count() or 1
+    return n_jobs
+
+def fit_models(modeller, X, hedefler, n_jobs=None):
+    """
+    Modelleri aynı anda eğitir; işçi bütçesi modeller arasında paylaştırılır.
+    Ağaç kurma GIL'i bıraktığı için iş parçacıkları tüm çekirdekleri kullanır.
+    random_state sabit olduğundan sonuç işçi sayısından bağımsızdır.
+    """
+    butce = is_butcesi(n_jobs)
+    paralel = min(len(modeller), butce)
+    for i, model in enumerate(modeller):
+        model.set_params(n_jobs=butce // paralel + (1 if i < butce % paralel else 0))
+
+    if paralel == 1:
+        for model, y in zip(modeller, hedefler):
+            model.fit(X, y)
+    else:
+        with ThreadPoolExecutor(max_workers=paralel) as havuz:
+            isler = [havuz.submit(model.fit, X, y) for model, y in zip(modeller, hedefler)]
+            for is_ in isler:
+                is_.result()
+
+    # Kaydedilen modeller tahmin sırasında çekirdek açmasın
+    for model in modeller:
+        model.set_params(n_jobs=None)
+    return modeller
 
 def create_features(df):
-    df['SonAy_DepremSayisi'] = df.groupby('Konum').rolling(
-        window='30D', on='Tarih_Saat')['Buyukluk'].count().reset_index(0, drop=True)
-    df['SonAy_OrtBuyukluk'] = df.groupby('Konum').rolling(
-        window='30D', on='Tarih_Saat')['Buyukluk'].mean().reset_index(0, drop=True)
-    df['SonAy_MaxBuyukluk'] = df.groupby('Konum').rolling(
-        window='30D', on='Tarih_Saat')['Buyukluk'].max().reset_index(0, drop=True)
-    df['SonAy_MinBuyukluk'] = df.groupby('Konum').rolling(
-        window='30D', on='Tarih_Saat')['Buyukluk'].min().reset_index(0, drop=True)
-    df['SonAy_StdBuyukluk'] = df.groupby('Konum').rolling(
-        window='30D', on='Tarih_Saat')['Buyukluk'].std().reset_index(0, drop=True)
-
-    df = df.sort_values('Tarih_Saat')
+    # SonAy_* özellikleri servis tarafıyla aynı kayan durum hesabıyla tek geçişte üretilir
+    df = df.sort_values('Tarih_Saat', kind='mergesort')
+    ozellikler, araliklar, _ = compute_features(df)
+
+    for col in ['SonAy_DepremSayisi', 'SonAy_OrtBuyukluk', 'SonAy_MaxBuyukluk',
+                'SonAy_MinBuyukluk', 'SonAy_StdBuyukluk']:
+        df[col] = ozellikler[col]
+
     df['OncekiDepremZamani'] = df.groupby('Konum')['Tarih_Saat'].shift(1)
-    df['DepremAraligi'] = (df['Tarih_Saat'] - df['OncekiDepremZamani']).dt.total_seconds() / 3600
+    df['DepremAraligi'] = araliklar
 
-    df['SonAy_OrtAralik'] = df.groupby('Konum')['DepremAraligi'].rolling(window=30).mean().reset_index(0, drop=True)
-    df['SonAy_MaxAralik'] = df.groupby('Konum')['DepremAraligi'].rolling(window=30).max().reset_index(0, drop=True)
-    df['SonAy_MinAralik'] = df.groupby('Konum')['DepremAraligi'].rolling(window=30).min().reset_index(0, drop=True)
+    for col in ['SonAy_OrtAralik', 'SonAy_MaxAralik', 'SonAy_MinAralik']:
+        df[col] = ozellikler[col]
 
     datetime_cols = df.select_dtypes(include=['datetime64[ns]']).columns
     df[datetime_cols] = df[datetime_cols].fillna(pd.NaT)
@@ -46,57 +175,202 @@ def create_time_category(hours):
     else:
         return 4
 
-def load_and_preprocess_data(filepath):
+def load_catalog(filepath):
+    """
+    Etiketli kataloğu okur. filepath bir dizinse sütunlu katalogdan
+    (data/columnar) tipli olarak, değilse CSV'den okunur.
+    """
+    if os.path.isdir(filepath):
+        df = columnar_store.read_catalog('updated_earthquakes', mmap=False)
+        df['Konum'] = df['Konum'].astype(str)
+        df['Buyukluk'] = df['Buyukluk'].astype(np.float64)
+        return df
     df = pd.read_csv(filepath)
     df['Tarih_Saat'] = pd.to_datetime(df['Tarih_Saat'], format='%Y-%m-%d %H:%M:%S')
-    le = LabelEncoder()
-    df['Konum_Encoded'] = le.fit_transform(df['Konum'])
+    return df
+
+def encode_locations(df, le=None):
+    """
+    Konumları kodlar. le verilirse mevcut kodlama korunur; katalogda
+    encoder'ın bilmediği bir il varsa ValueError fırlatılır.
+    """
+    if le is None:
+        le = LabelEncoder()
+        df['Konum_Encoded'] = le.fit_transform(df['Konum'])
+    else:
+        df['Konum_Encoded'] = le.transform(df['Konum'])
+    return le
+
+def parca_satiri(bellek_mb):
+    """Bellek sınırına (MB) sığan parça satır sayısı"""
+    return max(int(bellek_mb * 1024 * 1024) // SATIR_BASI_BAYT, 1000)
+
+def katalog_parcalari(filepath, parca_satir, columns=None):
+    """
+    Etiketli kataloğu en fazla parca_satir satırlık parçalar halinde, dosyadaki
+    sırayla üretir. filepath bir dizinse sütunlu katalogun aylık bölümleri
+    bellek eşlemeli okunur. Tüm katalog belleğe alınmaz.
+    """
+    if os.path.isdir(filepath):
+        for bolum in columnar_store.iter_partitions('updated_earthquakes', columns=columns):
+            for i in range(0, len(bolum), parca_satir):
+                parca = bolum.iloc[i:i + parca_satir]
+                yield pd.DataFrame({sutun: (parca[sutun].astype(str) if sutun == 'Konum' else
+                                            parca[sutun].astype(np.float64) if sutun == 'Buyukluk' else
+                                            parca[sutun]) for sutun in parca.columns})
+        return
+    for parca in pd.read_csv(filepath, chunksize=parca_satir, usecols=columns):
+        if 'Tarih_Saat' in parca:
+            parca['Tarih_Saat'] = pd.to_datetime(parca['Tarih_Saat'], format='%Y-%m-%d %H:%M:%S')
+        yield parca
+
+def ozellik_dizileri(filepath, calisma_dizini, bellek_mb=512, sira=None):
+    """
+    Kataloğu bellek sınırına göre seçilen parçalarla iki kez okur; özellikleri
+    ve hedefleri calisma_dizini altındaki X.npy, y_magnitude.npy ve y_time.npy
+    dosyalarına bellek eşlemeli yazar:
+
+    1. geçiş: satır sayısı ve iller (LabelEncoder)
+    2. geçiş: SonAy_* özellikleri ve hedefler. İl başına kayan pencere durumu
+       FeatureStore'da parçadan parçaya taşındığı için değerler create_features
+       ile aynıdır.
+
+    sira verilirse satır sayısından her satırın dizideki konumunu üretir;
+    verilmezse satırlar zaman sırasıyla yazılır. Katalog zamana göre artan
+    sırada olmalıdır (data_processing.py çıktısı); değilse ValueError
+    fırlatılır. (le, store, X, y_mag, y_time, son zaman) döndürür.
+    """
+    parca_satir = parca_satiri(bellek_mb)
+
+    n = 0
+    iller = set()
+    for parca in katalog_parcalari(filepath, parca_satir, columns=['Konum']):
+        n += len(parca)
+        iller.update(parca['Konum'].astype(str).unique())
+    if n == 0:
+        raise ValueError('katalog boş')
+    le = LabelEncoder().fit(np.array(sorted(iller), dtype=object))
+    hedef = sira(n) if sira is not None else np.arange(n)
+
+    # sklearn ormanları X'i float32'ye çevirir; doğrudan o tipte tutulursa kopya olmaz
+    X = np.lib.format.open_memmap(os.path.join(calisma_dizini, 'X.npy'), mode='w+',
+                                  dtype=np.float32, shape=(n, len(FEATURES)))
+    y_mag = np.lib.format.open_memmap(os.path.join(calisma_dizini, 'y_magnitude.npy'), mode='w+',
+                                      dtype=np.float64, shape=(n,))
+    y_time = np.lib.format.open_memmap(os.path.join(calisma_dizini, 'y_time.npy'), mode='w+',
+                                       dtype=np.int64, shape=(n,))
+
+    store = FeatureStore()
+    basla = 0
+    son = None
+    for parca in katalog_parcalari(filepath, parca_satir, columns=['Tarih_Saat', 'Konum', 'Buyukluk']):
+        zaman = parca['Tarih_Saat'].to_numpy(dtype='datetime64[ns]')
+        if len(zaman) == 0:
+            continue
+        if (son is not None and zaman[0] < son) or (np.diff(zaman) < np.timedelta64(0)).any():
+            raise ValueError('katalog zamana göre artan sırada değil; data_processing.py --full '
+                             'ile yeniden üretin')
+        son = zaman[-1]
+
+        ozellikler, araliklar = store.update_frame(parca)
+        satirlar = hedef[basla:basla + len(parca)]
+        basla += len(parca)
+
+        X[satirlar, 0] = le.transform(parca['Konum'].astype(str))
+        degerler = ozellikler[SONAY_OZELLIKLERI].to_numpy()
+        X[satirlar, 1:] = np.where(np.isnan(degerler), 0.0, degerler)
+        y_mag[satirlar] = parca['Buyukluk'].to_numpy(dtype=np.float64)
+        saat = np.nan_to_num(araliklar.to_numpy(), nan=0.0)
+        y_time[satirlar] = np.searchsorted(ZAMAN_SINIRLARI, saat, side='left')
+
+    if basla != n:
+        raise ValueError('katalog okuma sırasında değişti')
+    for dizi in (X, y_mag, y_time):
+        dizi.flush()
+    return le, store, X, y_mag, y_time, pd.Timestamp(son)
+
+def _bolme_sirasi(n):
+    """
+    train_test_split'in karışımı yalnızca satır sayısına bağlıdır: her satırı
+    eğitim kümesindeyse ilk n_train, değilse son bölgedeki yerine koyar
+    """
+    egitim, test = train_test_split(np.arange(n), test_size=0.15, random_state=42)
+    hedef = np.empty(n, dtype=np.int64)
+    hedef[egitim] = np.arange(len(egitim))
+    hedef[test] = len(egitim) + np.arange(len(test))
+    return hedef
+
+def akis_egitim_verisi(filepath, calisma_dizini, bellek_mb=512):
+    """
+    _egitim_verisi ile aynı eğitim/test ayrımını diskteki dizilere yazar;
+    X'in ilk n_train satırı eğitim, kalanı test kümesidir ve ikisi de
+    kopyalanmadan dilimlenir. (le, store, X_train, X_test, y_mag_train,
+    y_mag_test, y_time_train, y_time_test, satır sayısı, son zaman) döndürür.
+    """
+    le, store, X, y_mag, y_time, son = ozellik_dizileri(filepath, calisma_dizini, bellek_mb,
+                                                        sira=_bolme_sirasi)
+    n = len(X)
+    n_train = n - int(np.ceil(0.15 * n))
+    return (le, store, X[:n_train], X[n_train:], y_mag[:n_train], y_mag[n_train:],
+            y_time[:n_train], y_time[n_train:], n, son)
+
+def load_and_preprocess_data(filepath):
+    df = load_catalog(filepath)
+    le = encode_locations(df)
     df = create_features(df)
 
     # LabelEncoder'ı kaydet
-    with open('C:/Users/alpba/Desktop/YapayZekaSon1/models/label_encoder.pkl', 'wb') as file:
-        pickle.dump(le, file)
+    save_pickle(le, get_model_path('label_encoder'))
 
     return df, le
 
-def train_models(df):
-    features = [
-        'Konum_Encoded', 'SonAy_DepremSayisi', 'SonAy_OrtBuyukluk', 
-        'SonAy_MaxBuyukluk', 'SonAy_MinBuyukluk', 'SonAy_StdBuyukluk',
-        'SonAy_OrtAralik', 'SonAy_MaxAralik', 'SonAy_MinAralik'
-    ]
-
-    X = df[features].fillna(0)
+def _egitim_verisi(df):
+    X = df[FEATURES].fillna(0)
     y_magnitude = df['Buyukluk']
-    df['ZamanKategorisi'] = df['DepremAraligi'].apply(create_time_category)
-    y_time = df['ZamanKategorisi']
-
-    X_train, X_test, y_mag_train, y_mag_test, y_time_train, y_time_test = train_test_split(
-        X, y_magnitude, y_time, test_size=0.15, random_state=42
-    )
-
-    magnitude_model = RandomForestRegressor(
-        n_estimators=200, 
-        max_depth=15,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42
-    )
-
-    time_model = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=15,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        class_weight='balanced',
-        random_state=42
-    )
-
-    magnitude_model.fit(X_train, y_mag_train)
-    time_model.fit(X_train, y_time_train)
+    y_time = df['DepremAraligi'].apply(create_time_category)
+    return train_test_split(X, y_magnitude, y_time, test_size=0.15, random_state=42)
+
+def train_models(df, n_jobs=None, veri=None):
+    """veri verilirse (akış modu) df yerine bu hazır eğitim/test dizileri kullanılır"""
+    if veri is None:
+        veri = _egitim_verisi(df)
+    X_train, X_test, y_mag_train, y_mag_test, y_time_train, y_time_test = veri
+
+    magnitude_model = RandomForestRegressor(n_estimators=AGAC_SAYISI, **ORMAN_PARAMETRELERI)
+    time_model = RandomForestClassifier(n_estimators=AGAC_SAYISI, class_weight='balanced',
+                                        **ORMAN_PARAMETRELERI)
+
+    fit_models([magnitude_model, time_model], X_train, [y_mag_train, y_time_train], n_jobs)
 
     return magnitude_model, time_model, X_test, y_mag_test, y_time_test
 
+def warm_start_models(df, magnitude_model, time_model, watermark, yeni_agac=20,
+                      pencere=50000, n_jobs=None):
+    """
+    Mevcut ormanlara yeni_agac kadar ağaç ekler. Yeni ağaçlar, son eğitimden
+    (watermark) sonra gelen satırların tamamını içeren en son pencere satır
+    üzerinde eğitilir; böylece maliyet katalog boyutuyla büyümez. Eski
+    ağaçlar değişmez. df zamana göre artan sırada olmalıdır.
+    """
+    yeni_satir = int((df['Tarih_Saat'] > watermark).sum())
+    if yeni_satir == 0:
+        raise ValueError('son eğitimden sonra yeni veri yok')
+    son = df.tail(max(pencere, yeni_satir))
+    X_train, X_test, y_mag_train, y_mag_test, y_time_train, y_time_test = _egitim_verisi(son)
+
+    # Yeni ağaçların sınıf listesi eskilerle aynı olmalı, yoksa olasılıklar toplanamaz
+    if set(np.unique(y_time_train)) != set(time_model.classes_):
+        raise ValueError('pencerede zaman kategorilerinin hepsi yok')
+
+    for model in (magnitude_model, time_model):
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + yeni_agac)
+    fit_models([magnitude_model, time_model], X_train, [y_mag_train, y_time_train], n_jobs)
+    for model in (magnitude_model, time_model):
+        model.set_params(warm_start=False)
+
+    # Not: test satırlarının bir kısmını eski ağaçlar eğitimde görmüş olabilir
+    return magnitude_model, time_model, X_test, y_mag_test, y_time_test
+
 def evaluate_models(magnitude_model, time_model, X_test, y_mag_test, y_time_test):
     mag_predictions = magnitude_model.predict(X_test)
     time_predictions = time_model.predict(X_test)
@@ -104,23 +378,14 @@ def evaluate_models(magnitude_model, time_model, X_test, y_mag_test, y_time_test
     print("Büyüklük Modeli MSE:", mean_squared_error(y_mag_test, mag_predictions))
     print("Zaman Modeli Doğruluk:", accuracy_score(y_time_test, time_predictions))
 
-def predict_next_earthquake(magnitude_model, time_model, location, df):
-    with open('C:/Users/alpba/Desktop/YapayZekaSon1/models/label_encoder.pkl', 'rb') as file:
-        encoder = pickle.load(file)
+def predict_next_earthquake(magnitude_model, time_model, location, df=None, store=None):
+    encoder = load_pickle(get_model_path('label_encoder'))
 
     location_encoded = encoder.transform([location])[0]
-    last_month = df[df['Konum'] == location].tail(30)
-    features = pd.DataFrame({
-        'Konum_Encoded': [location_encoded],
-        'SonAy_DepremSayisi': [len(last_month)],
-        'SonAy_OrtBuyukluk': [last_month['Buyukluk'].mean()],
-        'SonAy_MaxBuyukluk': [last_month['Buyukluk'].max()],
-        'SonAy_MinBuyukluk': [last_month['Buyukluk'].min()],
-        'SonAy_StdBuyukluk': [last_month['Buyukluk'].std()],
-        'SonAy_OrtAralik': [last_month['DepremAraligi'].mean()],
-        'SonAy_MaxAralik': [last_month['DepremAraligi'].max()],
-        'SonAy_MinAralik': [last_month['DepremAraligi'].min()]
-    }).fillna(0)
+    if store is None:
+        store = FeatureStore()
+        store.update_frame(df[df['Konum'] == location])
+    features = pd.DataFrame([[location_encoded] + store.features(location)], columns=FEATURES)
 
     magnitude_pred = magnitude_model.predict(features)[0]
     time_category = time_model.predict(features)[0]
@@ -134,22 +399,577 @@ def predict_next_earthquake(magnitude_model, time_model, location, df):
     }
     return magnitude_pred, time_ranges[time_category]
 
+def _artimli_hazirla(df, durum, args):
+    """
+    Artımlı eğitim için kayıtlı encoder ve modelleri yükler. Artımlı eğitim
+    mümkün değilse nedenini ValueError ile bildirir.
+    """
+    if durum is None:
+        raise ValueError('eğitim durumu bulunamadı')
+    try:
+        le = load_pickle(get_model_path('label_encoder'))
+        magnitude_model = load_pickle(get_model_path('magnitude_model'))
+        time_model = load_pickle(get_model_path('time_model'))
+    except OSError as e:
+        raise ValueError(f'kayıtlı model okunamadı: {e}')
+    if magnitude_model.n_estimators + args.yeni_agac > args.max_agac:
+        raise ValueError(f'ağaç sayısı {args.max_agac} sınırını aşacak')
+    encode_locations(df, le)
+    return le, magnitude_model, time_model
+
+def modelleri_kaydet(le, magnitude_model, time_model):
+    save_pickle(le, get_model_path('label_encoder'))
+    save_pickle(magnitude_model, get_model_path('magnitude_model'))
+    save_pickle(time_model, get_model_path('time_model'))
+    # API'nin bellek eşlemeli yüklediği düz dizi formatı
+    compact_model.export_forest(magnitude_model, 'magnitude_model')
+    compact_model.export_forest(time_model, 'time_model')
+    compact_model.export_encoder(le)
+
+def _durumu_kaydet(watermark, rows, mod, magnitude_model, rapor):
+    atomic_write_json(state_path, {
+        'watermark': watermark.strftime('%Y-%m-%d %H:%M:%S'),
+        'rows': rows,
+        'mode': mod,
+        'n_estimators': magnitude_model.n_estimators,
+        'report': rapor,
+    })
+
+def akis_egitimi(filepath, args, olcum):
+    """
+    Tam eğitimin akış modu: özellikler ve hedefler parça parça hesaplanıp
+    diskteki dizilere yazılır, ormanlar bu diziler üzerinde eğitilir.
+    Geçici diziler models/ altında tutulur (/tmp bellekte olabilir) ve
+    eğitimden sonra silinir.
+    """
+    calisma_dizini = tempfile.mkdtemp(dir=model_dir, prefix='.akis_')
+    try:
+        with olcum.asama('ozellikler'):
+            le, store, X_train, X_test, y_mag_train, y_mag_test, y_time_train, y_time_test, \
+                rows, watermark = akis_egitim_verisi(filepath, calisma_dizini, args.bellek_siniri)
+
+        with olcum.asama('egitim'):
+            magnitude_model, time_model, X_test, y_mag_test, y_time_test = train_models(
+                None, n_jobs=args.jobs,
+                veri=(X_train, X_test, y_mag_train, y_mag_test, y_time_train, y_time_test))
+
+        with olcum.asama('degerlendirme'):
+            evaluate_models(magnitude_model, time_model, X_test, y_mag_test, y_time_test)
+
+            location = 'KAHRAMANMARAŞ'
+            if location in set(le.classes_):
+                magnitude_pred, time_pred = predict_next_earthquake(
+                    magnitude_model, time_model, location, store=store)
+                print(f"{location} için tahmin:")
+                print(f"Beklenen deprem büyüklüğü: {magnitude_pred:.1f}")
+                print(f"Tahmini gerçekleşme zamanı: {time_pred}")
+    finally:
+        shutil.rmtree(calisma_dizini, ignore_errors=True)
+
+    with olcum.asama('kaydetme'):
+        modelleri_kaydet(le, magnitude_model, time_model)
+
+    print(f"Eğitim modu: akis, ağaç sayısı: {magnitude_model.n_estimators}, "
+          f"işçi bütçesi: {is_butcesi(args.jobs)}, bellek sınırı: {args.bellek_siniri} MB "
+          f"({parca_satiri(args.bellek_siniri)} satırlık parçalar)")
+    rapor = olcum.yazdir()
+    _durumu_kaydet(watermark, rows, 'akis', magnitude_model, rapor)
+
+def _model_kur(tur, parametreler):
+    ayarlar = dict(ORMAN_PARAMETRELERI, n_estimators=AGAC_SAYISI)
+    ayarlar.update(parametreler)
+    if tur == 'magnitude':
+        return RandomForestRegressor(**ayarlar)
+    return RandomForestClassifier(class_weight='balanced', **ayarlar)
+
+def _skor(tur, y, tahmin):
+    """Büyüklük için MSE (düşük iyi), zaman için doğruluk (yüksek iyi)"""
+    if tur == 'magnitude':
+        return mean_squared_error(y, tahmin)
+    return accuracy_score(y, tahmin)
+
+# İşçi süreçlerin bellek eşlemeli açtığı diziler; görevlerle birlikte
+# yalnızca model türü, parametreler ve katman sınırları gönderilir
+_arama_verisi = None
+
+def _isci_baslat(dizin):
+    global _arama_verisi
+    _arama_verisi = {ad: np.load(os.path.join(dizin, f'{ad}.npy'), mmap_mode='r')
+                     for ad in ('X', 'y_magnitude', 'y_time')}
+
+def _katman_degerlendir(gorev):
+    tur, parametreler, _, egitim_sonu, test_sonu = gorev
+    X = _arama_verisi['X']
+    y = _arama_verisi['y_magnitude' if tur == 'magnitude' else 'y_time']
+    model = _model_kur(tur, parametreler)
+    model.set_params(n_jobs=1)
+
+    t0 = time.perf_counter()
+    model.fit(X[:egitim_sonu], y[:egitim_sonu])
+    t1 = time.perf_counter()
+    tahmin = model.predict(X[egitim_sonu:test_sonu])
+    t2 = time.perf_counter()
+    return {
+        'score': float(_skor(tur, y[egitim_sonu:test_sonu], tahmin)),
+        'train_rows': int(egitim_sonu),
+        'test_rows': int(test_sonu - egitim_sonu),
+        'fit_sn': round(t1 - t0, 3),
+        'predict_sn': round(t2 - t1, 3),
+    }
+
+def _gorev_anahtari(tur, parametreler, katman):
+    """Varsayılan ayarlar değişirse eski katman sonuçları kullanılmaz"""
+    ayarlar = dict(ORMAN_PARAMETRELERI, n_estimators=AGAC_SAYISI)
+    ayarlar.update(parametreler)
+    metin = json.dumps([tur, ayarlar, katman], sort_keys=True)
+    return hashlib.sha1(metin.encode('utf-8')).hexdigest()[:16]
+
+def _veri_anahtari(filepath):
+    """Katalog dosyası (ya da sütunlu katalog manifesti) değişince değişen anahtar"""
+    yol = os.path.join(filepath, 'manifest.json') if os.path.isdir(filepath) else filepath
+    bilgi = os.stat(yol)
+    return hashlib.sha1(f'{yol}:{bilgi.st_size}:{bilgi.st_mtime_ns}'.encode('utf-8')).hexdigest()[:12]
+
+def _arama_verisini_hazirla(filepath, bellek_mb):
+    """
+    Özellikleri katalog başına bir kez, zaman sırasıyla models/tuning/veri_<anahtar>/
+    altına yazar. Katalog değişmediyse önceki çalışmanın dizileri (ve
+    tamamlanmış katmanları) kullanılır; eski kataloglarınki silinir.
+    """
+    dizin = os.path.join(tuning_dir, f'veri_{_veri_anahtari(filepath)}')
+    veri = read_json(os.path.join(dizin, 'veri.json'))
+    if veri is not None:
+        print(f"Özellikler önbellekten okunuyor ({veri['rows']} satır).")
+        return dizin, veri
+
+    if os.path.isdir(tuning_dir):
+        for ad in os.listdir(tuning_dir):
+            if ad.startswith('veri_'):
+                shutil.rmtree(os.path.join(tuning_dir, ad), ignore_errors=True)
+    os.makedirs(dizin)
+    le, _, X, _, _, son = ozellik_dizileri(filepath, dizin, bellek_mb)
+    save_pickle(le, os.path.join(dizin, 'label_encoder.pkl'))
+    veri = {'rows': len(X), 'watermark': son.strftime('%Y-%m-%d %H:%M:%S')}
+    atomic_write_json(os.path.join(dizin, 'veri.json'), veri)
+    return dizin, veri
+
+def _adaylari_ozetle(gorevler, sonuclar):
+    """Her aday için katman skorları, ortalama ve toplam süre; türe göre en iyi aday"""
+    adaylar = {}
+    for tur, parametreler, katman, _, _ in gorevler:
+        aday = adaylar.setdefault((tur, json.dumps(parametreler, sort_keys=True)), {
+            'model': tur, 'params': parametreler, 'scores': [], 'fit_sn': 0.0})
+        kayit = sonuclar[_gorev_anahtari(tur, parametreler, katman)]
+        aday['scores'].append(kayit['score'])
+        aday['fit_sn'] = round(aday['fit_sn'] + kayit['fit_sn'], 3)
+    en_iyi = {}
+    for aday in adaylar.values():
+        aday['mean_score'] = float(np.mean(aday['scores']))
+        aday['std_score'] = float(np.std(aday['scores']))
+        tur = aday['model']
+        onceki = en_iyi.get(tur)
+        daha_iyi = onceki is None or (aday['mean_score'] < onceki['mean_score'] if tur == 'magnitude'
+                                      else aday['mean_score'] > onceki['mean_score'])
+        if daha_iyi:
+            en_iyi[tur] = aday
+    return list(adaylar.values()), en_iyi
+
+def tune(filepath, args):
+    """
+    İki orman için ileri zincirli (TimeSeriesSplit) çapraz doğrulamayla
+    hiperparametre araması. Her (aday, katman) çifti süreç havuzunda tek
+    çekirdekle eğitilir; işçiler özellik dizilerini diskten bellek eşlemeli
+    açar, böylece veri görev başına kopyalanmaz. Biten katmanlar hemen
+    diske yazılır; yarıda kalan arama yeniden çalıştırıldığında yalnızca
+    eksik katmanlar eğitilir. En iyi adaylar tüm veriyle yeniden eğitilip
+    models/tuning/ altına rapor ile birlikte yazılır.
+    """
+    olcum = Olcum()
+    with olcum.asama('ozellikler'):
+        dizin, veri = _arama_verisini_hazirla(filepath, args.bellek_siniri)
+
+    n = veri['rows']
+    sinirlar = [(int(egitim[-1]) + 1, int(test[-1]) + 1)
+                for egitim, test in TimeSeriesSplit(n_splits=args.folds).split(np.zeros((n, 1)))]
+    izgara = read_json(args.grid) if args.grid else ARAMA_IZGARASI
+    gorevler = [(tur, dict(parametreler), katman, egitim_sonu, test_sonu)
+                for tur in ('magnitude', 'time')
+                for parametreler in ParameterGrid(izgara[tur])
+                for katman, (egitim_sonu, test_sonu) in enumerate(sinirlar)]
+
+    katman_dizini = os.path.join(dizin, f'folds_{args.folds}')
+    os.makedirs(katman_dizini, exist_ok=True)
+    sonuclar = {}
+    bekleyen = []
+    for gorev in gorevler:
+        anahtar = _gorev_anahtari(gorev[0], gorev[1], gorev[2])
+        kayit = read_json(os.path.join(katman_dizini, f'{anahtar}.json'))
+        if kayit is not None:
+            sonuclar[anahtar] = kayit
+        else:
+            bekleyen.append(gorev)
+    onbellekten = len(gorevler) - len(bekleyen)
+    print(f"{len(gorevler)} katman görevi ({args.folds} katman), {onbellekten} tanesi önbellekten.")
+
+    # Uzun görevler önce: havuzun sonunda tek bir büyük görev beklenmez
+    bekleyen.sort(key=lambda g: g[3] * g[1].get('n_estimators', AGAC_SAYISI), reverse=True)
+    with olcum.asama('arama'):
+        if bekleyen:
+            havuz = ProcessPoolExecutor(max_workers=min(is_butcesi(args.jobs), len(bekleyen)),
+                                        initializer=_isci_baslat, initargs=(dizin,))
+            try:
+                isler = {havuz.submit(_katman_degerlendir, gorev): gorev for gorev in bekleyen}
+                for i, is_ in enumerate(as_completed(isler), 1):
+                    tur, parametreler, katman, _, _ = isler[is_]
+                    anahtar = _gorev_anahtari(tur, parametreler, katman)
+                    kayit = dict(model=tur, params=parametreler, fold=katman, **is_.result())
+                    atomic_write_json(os.path.join(katman_dizini, f'{anahtar}.json'), kayit)
+                    sonuclar[anahtar] = kayit
+                    print(f"[{i}/{len(bekleyen)}] {tur} {parametreler} katman {katman}: "
+                          f"{kayit['score']:.4f} ({kayit['fit_sn']:.1f} sn)")
+            finally:
+                havuz.shutdown(wait=True, cancel_futures=True)
+
+    adaylar, en_iyi = _adaylari_ozetle(gorevler, sonuclar)
+    for tur, aday in en_iyi.items():
+        olcut = 'MSE' if tur == 'magnitude' else 'Doğruluk'
+        print(f"En iyi {tur} modeli: {aday['params']} ({olcut} {aday['mean_score']:.4f} "
+              f"± {aday['std_score']:.4f})")
+
+    with olcum.asama('egitim'):
+        X = np.load(os.path.join(dizin, 'X.npy'), mmap_mode='r')
+        magnitude_model = _model_kur('magnitude', en_iyi['magnitude']['params'])
+        time_model = _model_kur('time', en_iyi['time']['params'])
+        fit_models([magnitude_model, time_model], X,
+                   [np.load(os.path.join(dizin, 'y_magnitude.npy'), mmap_mode='r'),
+                    np.load(os.path.join(dizin, 'y_time.npy'), mmap_mode='r')], args.jobs)
+
+    with olcum.asama('kaydetme'):
+        save_pickle(magnitude_model, os.path.join(tuning_dir, 'magnitude_model.pkl'))
+        save_pickle(time_model, os.path.join(tuning_dir, 'time_model.pkl'))
+        shutil.copyfile(os.path.join(dizin, 'label_encoder.pkl'), os.path.join(tuning_dir, 'label_encoder.pkl'))
+
+    rapor = olcum.yazdir()
+    atomic_write_json(os.path.join(tuning_dir, 'report.json'), {
+        'data': veri,
+        'folds': args.folds,
+        'fold_bounds': sinirlar,
+        'tasks': len(gorevler),
+        'cached_tasks': onbellekten,
+        'workers': is_butcesi(args.jobs),
+        'best': {tur: {'params': aday['params'], 'mean_score': aday['mean_score']}
+                 for tur, aday in en_iyi.items()},
+        'candidates': sorted(adaylar, key=lambda a: (a['model'], a['mean_score'])),
+        'report': rapor,
+    })
+
+def tahminci_yukle(model_dizini=None):
+    """
+    (encoder, büyüklük modeli, zaman modeli). model_dizini verilirse oradaki
+    pickle'lar (ör. models/tuning), yoksa API gibi varsa kompakt formatlar
+    kullanılır.
+    """
+    if model_dizini:
+        return tuple(load_pickle(os.path.join(model_dizini, f'{ad}.pkl'))
+                     for ad in ('label_encoder', 'magnitude_model', 'time_model'))
+    if compact_model.exists(compact_model.ENCODER):
+        encoder = compact_model.load_encoder(compact_model.manifest_path(compact_model.ENCODER))
+    else:
+        encoder = load_pickle(get_model_path('label_encoder'))
+    modeller = [compact_model.load_forest(compact_model.manifest_path(ad)) if compact_model.exists(ad)
+                else load_pickle(get_model_path(ad)) for ad in ('magnitude_model', 'time_model')]
+    return (encoder,) + tuple(modeller)
+
+def il_adimlari(zamanlar, buyuklukler, adimlar):
+    """
+    Tek ilin depremleri (ns, zamana göre artan) için her adım anında
+    servisin göreceği SonAy_* özellikleri (o ana kadarki son depremden
+    sonraki durum) ve o andan sonraki ilk deprem. Öncesinde ya da sonrasında
+    deprem olmayan adımlar atlanır. (adım sırası, özellikler, sonraki
+    büyüklük, sonraki depreme kadar saat) döndürür.
+    """
+    durum = ProvinceState()
+    ozellikler = np.array([durum.update(t, m)[0] for t, m in zip(zamanlar.tolist(), buyuklukler.tolist())],
+                          dtype=np.float64).reshape(-1, len(SONAY_OZELLIKLERI))
+    son = np.searchsorted(zamanlar, adimlar, side='right') - 1
+    sira = np.flatnonzero((son >= 0) & (son + 1 < len(zamanlar)))
+    i = son[sira]
+    saat = (zamanlar[i + 1] - adimlar[sira]) / 3.6e12
+    return sira, np.nan_to_num(ozellikler[i], nan=0.0), buyuklukler[i + 1], saat
+
+# İşçi süreçlerde bir kez yüklenen (encoder, büyüklük modeli, zaman modeli);
+# kompakt ormanlar bellek eşlemeli açıldığı için işçiler sayfaları paylaşır
+_tahminci = None
+
+def _tahminci_baslat(model_dizini, tahminci=None):
+    global _tahminci
+    _tahminci = tahminci if tahminci is not None else tahminci_yukle(model_dizini)
+
+def _il_geriye_donuk(gorev):
+    """Bir ilin tüm adımlarını tek model çağrısında tahmin eder"""
+    konum, zamanlar, buyuklukler, adimlar = gorev
+    encoder, magnitude_model, time_model = _tahminci
+    sira, X, sonraki, saat = il_adimlari(zamanlar, buyuklukler, adimlar)
+    if len(sira) == 0:
+        return None
+    X = pd.DataFrame(np.column_stack([np.full(len(sira), encoder.transform([konum])[0], dtype=np.float64), X]),
+                     columns=FEATURES)
+    return pd.DataFrame({
+        'Konum': konum,
+        'sira': sira,
+        'gercek_buyukluk': sonraki,
+        'tahmin_buyukluk': magnitude_model.predict(X),
+        # Son 30 günün ortalaması: karşılaştırma için basit tahmin
+        'taban_buyukluk': X['SonAy_OrtBuyukluk'].to_numpy(),
+        'gercek_kategori': np.searchsorted(ZAMAN_SINIRLARI, saat, side='left'),
+        'tahmin_kategori': time_model.predict(X).astype(np.int64),
+    })
+
+def basari_tablosu(sonuc, anahtar):
+    """
+    Grup başına büyüklük hataları (MAE, RMSE, ortalama sapma ve 30 günlük
+    ortalamanın MAE'si) ile zaman kategorisi doğruluğu; time_majority_accuracy
+    grupta hep en sık kategoriyi söylemenin doğruluğudur
+    """
+    hata = sonuc['tahmin_buyukluk'] - sonuc['gercek_buyukluk']
+    gruplar = sonuc.assign(
+        mutlak=hata.abs(), kare=hata ** 2, sapma=hata,
+        taban_mutlak=(sonuc['taban_buyukluk'] - sonuc['gercek_buyukluk']).abs(),
+        dogru=sonuc['tahmin_kategori'] == sonuc['gercek_kategori'],
+    ).groupby(anahtar, sort=True)
+    tablo = gruplar.agg(steps=('dogru', 'size'), magnitude_mae=('mutlak', 'mean'),
+                        magnitude_rmse=('kare', 'mean'), magnitude_bias=('sapma', 'mean'),
+                        baseline_mae=('taban_mutlak', 'mean'), time_accuracy=('dogru', 'mean'))
+    tablo['magnitude_rmse'] = np.sqrt(tablo['magnitude_rmse'])
+    sayilar = sonuc.groupby([anahtar, 'gercek_kategori']).size().unstack(fill_value=0)
+    tablo['time_majority_accuracy'] = sayilar.max(axis=1) / sayilar.sum(axis=1)
+    return tablo
+
+def geriye_donuk_test(filepath, args):
+    """
+    Kataloğu zamana göre yeniden oynatır: her adım anında (--adim) her il
+    için o ana kadarki depremlerden SonAy_* özellikleri hesaplanır, modeller
+    sonraki depremin büyüklüğünü ve adımdan o depreme kadar geçen sürenin
+    kategorisini tahmin eder, tahminler gerçekleşenle karşılaştırılır. İller
+    süreç havuzunda paralel işlenir; her ilin adımları vektörel olarak
+    bulunur ve tek model çağrısında tahmin edilir. İl ve dönem (--donem)
+    bazında başarı raporları models/backtest/ altına yazılır.
+    """
+    olcum = Olcum()
+    with olcum.asama('yukleme'):
+        df = load_catalog(filepath).sort_values('Tarih_Saat', kind='mergesort')
+        tahminci = tahminci_yukle(args.model_dizini)
+        encoder = tahminci[0]
+
+    ilk = pd.Timestamp(args.baslangic) if args.baslangic else df['Tarih_Saat'].iloc[0]
+    son = pd.Timestamp(args.bitis) if args.bitis else df['Tarih_Saat'].iloc[-1]
+    adimlar = pd.date_range(ilk.normalize(), son, freq=args.adim)
+    adimlar = adimlar[adimlar >= ilk]
+    if len(adimlar) == 0:
+        raise ValueError('verilen aralıkta adım yok')
+    adim_ns = adimlar.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+    bilinen = set(encoder.classes_)
+    zamanlar = df['Tarih_Saat'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    buyuklukler = df['Buyukluk'].to_numpy(dtype=np.float64)
+    gorevler = []
+    bilinmeyen = []
+    for konum, satirlar in df.groupby('Konum', sort=False).indices.items():
+        if konum not in bilinen:
+            bilinmeyen.append(konum)
+            continue
+        gorevler.append((konum, zamanlar[satirlar], buyuklukler[satirlar], adim_ns))
+    if bilinmeyen:
+        print(f"Encoder'ın bilmediği {len(bilinmeyen)} il atlandı: {', '.join(sorted(bilinmeyen))}")
+    # Büyük iller önce: havuzun sonunda tek bir büyük il beklenmez
+    gorevler.sort(key=lambda g: len(g[1]), reverse=True)
+
+    isci = min(is_butcesi(args.jobs), max(len(gorevler), 1))
+    print(f"{len(adimlar)} adım ({args.adim}), {len(gorevler)} il, {isci} işçi.")
+    with olcum.asama('tekrar'):
+        if isci == 1:
+            _tahminci_baslat(args.model_dizini, tahminci)
+            parcalar = list(map(_il_geriye_donuk, gorevler))
+        else:
+            with ProcessPoolExecutor(max_workers=isci, initializer=_tahminci_baslat,
+                                     initargs=(args.model_dizini,)) as havuz:
+                parcalar = list(havuz.map(_il_geriye_donuk, gorevler))
+    parcalar = [p for p in parcalar if p is not None]
+    if not parcalar:
+        raise ValueError('sonrasında deprem olan adım yok')
+
+    with olcum.asama('raporlar'):
+        sonuc = pd.concat(parcalar, ignore_index=True)
+        sonuc['Donem'] = adimlar[sonuc['sira'].to_numpy()].to_period(args.donem).astype(str)
+        iller = basari_tablosu(sonuc, 'Konum')
+        donemler = basari_tablosu(sonuc, 'Donem')
+        genel = basari_tablosu(sonuc.assign(tum='tum'), 'tum').iloc[0]
+
+        # Eğitim rastgele bölmeyle tüm kataloğu kullandığından eğitimin son
+        # satırından önceki dönemler modelin gördüğü verilerdir
+        durum = None if args.model_dizini else read_json(state_path)
+        if durum is not None:
+            sinir = pd.Timestamp(durum['watermark'])
+            bitisler = pd.PeriodIndex(donemler.index, freq=args.donem).end_time
+            donemler['in_sample'] = bitisler <= sinir
+
+        os.makedirs(backtest_dir, exist_ok=True)
+        iller.round(4).to_csv(os.path.join(backtest_dir, 'provinces.csv'), index_label='province')
+        donemler.round(4).to_csv(os.path.join(backtest_dir, 'periods.csv'), index_label='period')
+        karisiklik = pd.crosstab(sonuc['gercek_kategori'], sonuc['tahmin_kategori']).reindex(
+            index=range(len(ZAMAN_SINIRLARI) + 1), columns=range(len(ZAMAN_SINIRLARI) + 1), fill_value=0)
+
+    print(f"{int(genel['steps'])} tahmin: büyüklük MAE {genel['magnitude_mae']:.3f} "
+          f"(30 günlük ortalama {genel['baseline_mae']:.3f}), zaman doğruluğu {genel['time_accuracy']:.3f} "
+          f"(en sık kategori {genel['time_majority_accuracy']:.3f})")
+    print("En düşük zaman doğruluğu olan iller:")
+    print(iller.sort_values('time_accuracy').head(5)[['steps', 'magnitude_mae', 'time_accuracy']]
+          .round(3).to_string())
+    rapor = olcum.yazdir()
+    atomic_write_json(os.path.join(backtest_dir, 'report.json'), {
+        'catalog': filepath,
+        'models': args.model_dizini or 'models',
+        'start': str(adimlar[0]),
+        'end': str(adimlar[-1]),
+        'step': args.adim,
+        'period': args.donem,
+        'steps': len(adimlar),
+        'provinces': len(gorevler),
+        'skipped_provinces': sorted(bilinmeyen),
+        'workers': isci,
+        'trained_until': None if durum is None else durum['watermark'],
+        'overall': {ad: round(float(deger), 4) for ad, deger in genel.items()},
+        'time_confusion': karisiklik.to_numpy().tolist(),
+        'report': rapor,
+    })
+
 def main():
-    filepath = 'C:/Users/alpba/Desktop/YapayZekaSon1/data/updated_earthquakes.csv'
-    df, le = load_and_preprocess_data(filepath)
-    magnitude_model, time_model, X_test, y_mag_test, y_time_test = train_models(df)
-    evaluate_models(magnitude_model, time_model, X_test, y_mag_test, y_time_test)
-
-    location = 'KAHRAMANMARAŞ'
-    magnitude_pred, time_pred = predict_next_earthquake(magnitude_model, time_model, location, df)
-    print(f"{location} için tahmin:")
-    print(f"Beklenen deprem büyüklüğü: {magnitude_pred:.1f}")
-    print(f"Tahmini gerçekleşme zamanı: {time_pred}")
-
-    with open('C:/Users/alpba/Desktop/YapayZekaSon1/models/magnitude_model.pkl', 'wb') as file:
-        pickle.dump(magnitude_model, file)
-    with open('C:/Users/alpba/Desktop/YapayZekaSon1/models/time_model.pkl', 'wb') as file:
-        pickle.dump(time_model, file)
+    parser = argparse.ArgumentParser(description='Deprem tahmin modellerini eğitir')
+    parser.add_argument('--jobs', type=int, default=-1,
+                        help='Kullanılacak çekirdek sayısı (varsayılan: tümü)')
+    parser.add_argument('--warm-start', action='store_true',
+                        help='Modelleri sıfırdan kurmak yerine yeni verilerle ağaç ekle')
+    parser.add_argument('--yeni-agac', type=int, default=20,
+                        help='Artımlı eğitimde her modele eklenecek ağaç sayısı')
+    parser.add_argument('--pencere', type=int, default=50000,
+                        help='Artımlı eğitimde yeni ağaçların eğitildiği en son satır sayısı')
+    parser.add_argument('--max-agac', type=int, default=400,
+                        help='Ağaç sayısı bu sınırı aşacaksa modeller sıfırdan eğitilir')
+    parser.add_argument('--akis', action='store_true',
+                        help='Kataloğu belleğe almadan parça parça işle (tam eğitim)')
+    parser.add_argument('--bellek-siniri', type=int, default=512,
+                        help='Akış modunda parça boyunu belirleyen bellek sınırı (MB)')
+    parser.add_argument('--tune', action='store_true',
+                        help='Zamana göre çapraz doğrulamayla hiperparametre araması yap')
+    parser.add_argument('--folds', type=int, default=5,
+                        help='Aramada ileri zincirli katman sayısı')
+    parser.add_argument('--grid', default=None,
+                        help='Arama ızgarası JSON dosyası ({"magnitude": {...}, "time": {...}})')
+    parser.add_argument('--backtest', action='store_true',
+                        help='Kayıtlı modelleri kataloğu zamana göre yeniden oynatarak sına')
+    parser.add_argument('--adim', default='1D',
+                        help='Geriye dönük testte tahmin adımı (pandas sıklığı, ör. 6h, 1D)')
+    parser.add_argument('--donem', default='M',
+                        help='Geriye dönük test raporunun dönemi (pandas dönem sıklığı, ör. M, Q, Y)')
+    parser.add_argument('--baslangic', default=None, help='Geriye dönük testin ilk adımı (tarih)')
+    parser.add_argument('--bitis', default=None, help='Geriye dönük testin son adımı (tarih)')
+    parser.add_argument('--model-dizini', default=None,
+                        help='Sınanacak pickle modellerin dizini (ör. models/tuning)')
+    args = parser.parse_args()
+    if args.warm_start and (args.akis or args.tune):
+        parser.error('--warm-start, --akis ve --tune ile birlikte kullanılamaz')
+    if args.backtest and (args.warm_start or args.akis or args.tune):
+        parser.error('--backtest eğitim seçenekleriyle birlikte kullanılamaz')
+
+    olcum = Olcum()
+
+    # Sütunlu katalog varsa tercih edilir, yoksa CSV kullanılır. Katalog,
+    # işlem durumundaki onaylanmış CSV boyutuna göre önce eşitlenir.
+    if columnar_store.exists('updated_earthquakes'):
+        csv_yolu = os.path.join(data_dir, 'updated_earthquakes.csv')
+        durum = read_json(os.path.join(data_dir, 'processing_state.json'))
+        if os.path.exists(csv_yolu):
+            boyut = durum['output_size'] if durum else os.path.getsize(csv_yolu)
+            columnar_store.sync_with_csv('updated_earthquakes', csv_yolu, boyut)
+        filepath = columnar_store.catalog_dir('updated_earthquakes')
+    else:
+        filepath = os.path.join(data_dir, 'updated_earthquakes.csv')
+
+    if args.backtest:
+        try:
+            geriye_donuk_test(filepath, args)
+        except (ValueError, OSError) as e:
+            sys.exit(f"Geriye dönük test yapılamıyor: {e}")
+        return
+
+    if args.tune:
+        try:
+            tune(filepath, args)
+        except ValueError as e:
+            sys.exit(f"Hiperparametre araması yapılamıyor: {e}")
+        return
+
+    if args.akis:
+        try:
+            akis_egitimi(filepath, args, olcum)
+        except ValueError as e:
+            sys.exit(f"Akış modunda eğitim yapılamıyor: {e}")
+        return
+
+    with olcum.asama('yukleme'):
+        df = load_catalog(filepath)
+
+    durum = read_json(state_path)
+    if args.warm_start and durum is not None and \
+            not (df['Tarih_Saat'] > pd.Timestamp(durum['watermark'])).any():
+        print("Son eğitimden sonra yeni veri yok, modeller güncel.")
+        olcum.yazdir()
+        return
+
+    mod = 'tam'
+    le = None
+    if args.warm_start:
+        try:
+            le, magnitude_model, time_model = _artimli_hazirla(df, durum, args)
+            mod = 'artimli'
+        except ValueError as e:
+            print(f"Artımlı eğitim yapılamıyor ({e}), modeller sıfırdan eğitilecek.")
+            le = None
+
+    with olcum.asama('ozellikler'):
+        le = encode_locations(df, le)
+        df = create_features(df)
+
+    with olcum.asama('egitim'):
+        sonuc = None
+        if mod == 'artimli':
+            try:
+                sonuc = warm_start_models(df, magnitude_model, time_model,
+                                          pd.Timestamp(durum['watermark']), args.yeni_agac,
+                                          args.pencere, args.jobs)
+            except ValueError as e:
+                print(f"Artımlı eğitim yapılamıyor ({e}), modeller sıfırdan eğitilecek.")
+                mod = 'tam'
+        if sonuc is None:
+            sonuc = train_models(df, n_jobs=args.jobs)
+    magnitude_model, time_model, X_test, y_mag_test, y_time_test = sonuc
+
+    with olcum.asama('degerlendirme'):
+        evaluate_models(magnitude_model, time_model, X_test, y_mag_test, y_time_test)
+
+        location = 'KAHRAMANMARAŞ'
+        magnitude_pred, time_pred = predict_next_earthquake(magnitude_model, time_model, location, df)
+        print(f"{location} için tahmin:")
+        print(f"Beklenen deprem büyüklüğü: {magnitude_pred:.1f}")
+        print(f"Tahmini gerçekleşme zamanı: {time_pred}")
+
+    with olcum.asama('kaydetme'):
+        modelleri_kaydet(le, magnitude_model, time_model)
+
+    print(f"Eğitim modu: {mod}, ağaç sayısı: {magnitude_model.n_estimators}, "
+          f"işçi bütçesi: {is_butcesi(args.jobs)}")
+    rapor = olcum.yazdir()
+    _durumu_kaydet(df['Tarih_Saat'].max(), len(df), mod, magnitude_model, rapor)
 
 if __name__ == "__main__":
     main()
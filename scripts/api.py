@@ -1,38 +1,186 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, g
 import pandas as pd
+import argparse
+import functools
+import gc
+import logging
 import os
-import pickle
+import signal
+import threading
+import time
+
+from registry import Registry, load_pickle
+import compact_model
+from catalog_index import load_catalog_index, append_catalog_index
+from spatial_index import load_spatial_index, append_spatial_index, GRUP_BIRIMLERI
+from rollup_store import GRUPLAR, TEMEL_ARALIK
+from feature_store import FEATURES
+from metrics import Metrics, SamplingProfiler
+from prediction_batcher import PredictionBatcher
+from response_cache import ResponseCache, etag
+from state_snapshot import snapshot_loader
 
 app = Flask(__name__)
 
+# Kayıtlar (api, registry, state_snapshot) süreç numarasıyla yazılır; gunicorn
+# işçilerinin çıktısı ayırt edilip düzeye göre süzülebilir. Düzey LOG_LEVEL
+# ortam değişkeniyle seçilir. preload içe aktarmada çalıştığı için burada kurulur.
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+                    format='%(asctime)s [%(process)d] %(name)s %(levelname)s: %(message)s')
+
+# Süreç içi metrikler /metrics adresinden Prometheus formatında okunur.
+# Gunicorn gibi çok süreçli sunucularda her işçinin kendi sayaçları vardır.
+metrics = Metrics(prefix='earthquake_api_')
+request_latency = metrics.histogram('request_duration_seconds', 'Uç nokta başına istek süresi',
+                                    ['endpoint', 'method'])
+request_count = metrics.counter('requests_total', 'Uç nokta ve durum koduna göre istek sayısı',
+                                ['endpoint', 'method', 'status'])
+prediction_batch_size = metrics.histogram('prediction_batch_size', 'Tek model çağrısındaki konum sayısı',
+                                          buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+
 def get_csv_path():
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(os.path.dirname(current_dir))
     return os.path.join(project_root, 'YapayZekaSon1', 'data', 'updated_earthquakes.csv')
 
+def get_raw_csv_path():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(os.path.dirname(current_dir))
+    return os.path.join(project_root, 'YapayZekaSon1', 'data', 'earthquakes.csv')
+
 def get_model_path(model_name):
-    current_dir = "C:\\Users\\alpba\\Desktop\\YapayZekaSon1"
-    model_dir = os.path.join(current_dir, 'models')
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(os.path.dirname(current_dir))
+    model_dir = os.path.join(project_root, 'YapayZekaSon1', 'models')
     return os.path.join(model_dir, f'{model_name}.pkl')
 
+# Katalog ve modeller süreç başında bir kez yüklenir (bkz. preload),
+# değiştiklerinde arka planda yeniden yüklenir; istekler sadece bellekteki
+# kopyayı okur. İndeksler anlık görüntüden açılır, CSV yalnızca görüntüden
+# sonra eklenen satırlar için okunur.
+registry = Registry()
+registry.register('catalog', get_csv_path(),
+                  metrics.timed('catalog_load', snapshot_loader('catalog', load_catalog_index,
+                                                                append_catalog_index)),
+                  metrics.timed('catalog_append', append_catalog_index))
+# Ham katalog (koordinatlarla) zaman/mekan sorguları için ayrı indekslenir
+registry.register('spatial', get_raw_csv_path(),
+                  metrics.timed('spatial_load', snapshot_loader('spatial', load_spatial_index,
+                                                                append_spatial_index)),
+                  metrics.timed('spatial_append', append_spatial_index))
+# Kompakt encoder sklearn içe aktarmadan açılır
+if compact_model.exists(compact_model.ENCODER):
+    registry.register('label_encoder', compact_model.manifest_path(compact_model.ENCODER),
+                      metrics.timed('label_encoder_load', compact_model.load_encoder))
+else:
+    registry.register('label_encoder', get_model_path('label_encoder'),
+                      metrics.timed('label_encoder_load', load_pickle))
+for model_name in compact_model.MODELLER:
+    # Düz dizi formatı varsa bellek eşlemeli açılır (süreçler arasında paylaşılır)
+    if compact_model.exists(model_name):
+        registry.register(model_name, compact_model.manifest_path(model_name),
+                          metrics.timed(f'{model_name}_load', compact_model.load_forest))
+    else:
+        registry.register(model_name, get_model_path(model_name),
+                          metrics.timed(f'{model_name}_load', load_pickle))
+
+KAYNAKLAR = ['catalog', 'label_encoder', 'magnitude_model', 'time_model']
+SORGU_KAYNAKLARI = ['spatial']
+
+# Yanıtlar (uç nokta, parametreler, kaynak sürümleri) anahtarıyla saklanır.
+# Registry yeni satırları ya da modelleri yükleyince sürüm değişir ve
+# önbellek kendiliğinden geçersiz olur.
+response_cache = ResponseCache(max_entries=1024)
+
+def onbellekli(endpoint, kaynaklar, parametreler):
+    """
+    Başarılı (200) yanıtları önbelleğe alır ve ETag ekler. If-None-Match
+    güncel ETag ile eşleşirse 304 döner. parametreler() istek
+    parametrelerini normalize eder; hata verirse istek önbelleksiz işlenir.
+    """
+    def dekorator(f):
+        @functools.wraps(f)
+        def sarici(*args, **kwargs):
+            try:
+                params = parametreler()
+            except Exception:
+                return f(*args, **kwargs)
+
+            response_cache.surumleri_kontrol_et(
+                tuple(registry.version(k) for k in KAYNAKLAR + SORGU_KAYNAKLARI))
+            anahtar = (endpoint, params, tuple(registry.version(k) for k in kaynaklar))
+            deger = etag(anahtar)
+            if request.if_none_match.contains(deger):
+                response_cache.not_modified()
+                yanit = Response(status=304)
+                yanit.set_etag(deger)
+                return yanit
+
+            kayit = response_cache.get(anahtar)
+            if kayit is None:
+                yanit = app.make_response(f(*args, **kwargs))
+                if yanit.status_code != 200:
+                    return yanit
+                response_cache.put(anahtar, (yanit.get_data(), yanit.mimetype))
+            else:
+                yanit = Response(kayit[0], mimetype=kayit[1])
+            yanit.set_etag(deger)
+            return yanit
+        return sarici
+    return dekorator
+
+MAX_K = 1000
+
+def _sorgu_parametreleri():
+    """
+    k, start ve end sorgu parametrelerini okur; hatalıysa ValueError fırlatır
+    """
+    try:
+        k = int(request.args.get('k', 5))
+    except ValueError:
+        raise ValueError('k bir tam sayı olmalı')
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f'k 1 ile {MAX_K} arasında olmalı')
+
+    sinirlar = []
+    for ad in ('start', 'end'):
+        deger = request.args.get(ad)
+        if deger:
+            try:
+                deger = pd.Timestamp(deger)
+            except ValueError:
+                raise ValueError(f'{ad} geçerli bir tarih değil')
+        sinirlar.append(deger or None)
+    return k, sinirlar[0], sinirlar[1]
+
 @app.route('/api/largest-earthquakes', methods=['GET'])
+@onbellekli('largest', ['catalog'], lambda: _sorgu_parametreleri())
 def get_largest_earthquakes():
     try:
-        csv_path = get_csv_path()
-        df = pd.read_csv(csv_path)
-        largest_earthquakes = df.nlargest(5, 'Buyukluk')[['Tarih_Saat', 'Konum', 'Buyukluk']]
-        result = largest_earthquakes.to_dict('records')
+        try:
+            k, start, end = _sorgu_parametreleri()
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
+        index = registry.get('catalog')
+        result = index.largest(k, start=start, end=end)
         return jsonify({
             'status': 'success',
             'data': result
         })
     except Exception as e:
+        app.logger.exception("%s isteğinde hata", request.path)
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
 @app.route('/api/earthquakes-by-location', methods=['GET'])
+@onbellekli('by-location', ['catalog'],
+            lambda: (request.args.get('location', '').upper(),) + _sorgu_parametreleri())
 def get_earthquakes_by_location():
     try:
         location = request.args.get('location', '').upper()
@@ -42,18 +190,22 @@ def get_earthquakes_by_location():
                 'message': 'Konum parametresi gerekli'
             }), 400
 
-        csv_path = get_csv_path()
-        df = pd.read_csv(csv_path)
-        location_earthquakes = df[df['Konum'] == location]
+        try:
+            k, start, end = _sorgu_parametreleri()
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
 
-        if len(location_earthquakes) == 0:
+        index = registry.get('catalog')
+        if location not in index:
             return jsonify({
                 'status': 'error',
                 'message': f'"{location}" konumunda deprem kaydı bulunamadı'
             }), 404
 
-        largest_in_location = location_earthquakes.nlargest(5, 'Buyukluk')[['Tarih_Saat', 'Konum', 'Buyukluk']]
-        result = largest_in_location.to_dict('records')
+        result = index.largest(k, konum=location, start=start, end=end)
 
         return jsonify({
             'status': 'success',
@@ -62,13 +214,284 @@ def get_earthquakes_by_location():
             'data': result
         })
     except Exception as e:
+        app.logger.exception("%s isteğinde hata", request.path)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+# Kandilli zamanları Türkiye saatiyle (UTC+3) yayımlanır; "son N saat"
+# sorguları bu saate göre hesaplanır
+KATALOG_SAAT_FARKI = pd.Timedelta(hours=3)
+MAX_LIMIT = 1000
+MAX_YARICAP_KM = 2000
+
+def _sayi_parametresi(ad, tip=float, alt=None, ust=None, varsayilan=None):
+    deger = request.args.get(ad)
+    if deger is None or deger == '':
+        return varsayilan
+    try:
+        deger = tip(deger)
+    except ValueError:
+        raise ValueError(f'{ad} geçerli bir sayı değil')
+    if (alt is not None and deger < alt) or (ust is not None and deger > ust):
+        raise ValueError(f'{ad} {alt} ile {ust} arasında olmalı')
+    return deger
+
+def _uzamsal_parametreler(yaricap=False):
+    """
+    Zaman/mekan sorgu parametrelerini okuyup normalize eder; hatalıysa
+    ValueError fırlatır. start/end ya da hours (son N saat), min_mag/max_mag,
+    min_lat/max_lat/min_lon/max_lon kutusu, lat/lon/km dairesi, limit,
+    offset, order (desc/asc) ve group (hour/day/month)
+    """
+    _, start, end = _sorgu_parametreleri()
+    saat = _sayi_parametresi('hours', alt=0, ust=24 * 366)
+    if saat is not None:
+        if start is not None:
+            raise ValueError('start ve hours birlikte verilemez')
+        simdi = (pd.Timestamp.now(tz='UTC').tz_localize(None) + KATALOG_SAAT_FARKI).floor('s')
+        start = simdi - pd.Timedelta(hours=saat)
+
+    kutu = [_sayi_parametresi(ad, alt=alt, ust=ust) for ad, alt, ust in
+            (('min_lat', -90, 90), ('max_lat', -90, 90), ('min_lon', -180, 180), ('max_lon', -180, 180))]
+    if any(k is not None for k in kutu):
+        if any(k is None for k in kutu):
+            raise ValueError('min_lat, max_lat, min_lon ve max_lon birlikte verilmeli')
+        bbox = tuple(kutu)
+    else:
+        bbox = None
+
+    center = radius_km = None
+    if yaricap or request.args.get('lat') or request.args.get('lon'):
+        center = (_sayi_parametresi('lat', alt=-90, ust=90), _sayi_parametresi('lon', alt=-180, ust=180))
+        radius_km = _sayi_parametresi('km', alt=0, ust=MAX_YARICAP_KM, varsayilan=100.0)
+        if None in center:
+            raise ValueError('lat ve lon parametreleri gerekli')
+
+    order = request.args.get('order', 'desc')
+    if order not in ('desc', 'asc'):
+        raise ValueError('order "desc" ya da "asc" olmalı')
+    group = request.args.get('group') or None
+    if group is not None and group not in GRUP_BIRIMLERI:
+        raise ValueError(f'group {", ".join(GRUP_BIRIMLERI)} değerlerinden biri olmalı')
+
+    return {
+        'start': start, 'end': end, 'bbox': bbox, 'center': center, 'radius_km': radius_km,
+        'min_mag': _sayi_parametresi('min_mag', alt=-2, ust=10),
+        'max_mag': _sayi_parametresi('max_mag', alt=-2, ust=10),
+        'limit': _sayi_parametresi('limit', int, 1, MAX_LIMIT, varsayilan=100),
+        'offset': _sayi_parametresi('offset', int, 0, varsayilan=0),
+        'order': order, 'group': group,
+    }
+
+def _uzamsal_sorgu(yaricap=False):
+    params = _uzamsal_parametreler(yaricap)
+    index = registry.get('spatial')
+    with metrics.span('spatial_query'):
+        konumlar, uzakliklar = index.query(params['start'], params['end'], params['bbox'],
+                                           params['center'], params['radius_km'],
+                                           params['min_mag'], params['max_mag'])
+    return params, index, konumlar, uzakliklar
+
+def _uzamsal_olaylar(yaricap):
+    try:
+        try:
+            params, index, konumlar, uzakliklar = _uzamsal_sorgu(yaricap)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
+        data = index.events(konumlar, uzakliklar, params['limit'], params['offset'],
+                            newest_first=params['order'] == 'desc')
+        return jsonify({
+            'status': 'success',
+            'total': int(len(konumlar)),
+            'offset': params['offset'],
+            'limit': params['limit'],
+            'count': len(data),
+            'data': data
+        })
+    except Exception as e:
+        app.logger.exception("%s isteğinde hata", request.path)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+def _uzamsal_anahtar(yaricap=False):
+    return tuple(sorted(_uzamsal_parametreler(yaricap).items()))
+
+@app.route('/api/earthquakes/range', methods=['GET'])
+@onbellekli('range', SORGU_KAYNAKLARI, lambda: _uzamsal_anahtar())
+def get_earthquakes_in_range():
+    """
+    Zaman aralığı ve isteğe bağlı kutu/büyüklük filtresiyle ham katalog
+    kayıtları; en yeniden eskiye sayfalanır
+    """
+    return _uzamsal_olaylar(yaricap=False)
+
+@app.route('/api/earthquakes/radius', methods=['GET'])
+@onbellekli('radius', SORGU_KAYNAKLARI, lambda: _uzamsal_anahtar(yaricap=True))
+def get_earthquakes_in_radius():
+    """
+    lat/lon noktasına km uzaklık içindeki kayıtlar (ör. son 72 saatte
+    100 km içindeki M4+: ?lat=38.4&lon=27.1&km=100&hours=72&min_mag=4)
+    """
+    return _uzamsal_olaylar(yaricap=True)
+
+@app.route('/api/earthquakes/count', methods=['GET'])
+@onbellekli('count', SORGU_KAYNAKLARI, lambda: _uzamsal_anahtar())
+def get_earthquake_counts():
+    """
+    Aynı filtrelerle toplam sayı ve en büyük büyüklük; group=hour/day/month
+    ile zaman grubu başına sayılar
+    """
+    try:
+        try:
+            params, index, konumlar, _ = _uzamsal_sorgu()
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
+        return jsonify(dict({'status': 'success'}, **index.summarize(konumlar, params['group'])))
+    except Exception as e:
+        app.logger.exception("%s isteğinde hata", request.path)
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
+def _ozet_parametreleri():
+    """
+    location, start, end, group (day/location/location_day) ve bin
+    (büyüklük histogramı aralığı, 0.1'in katı) parametreleri
+    """
+    _, start, end = _sorgu_parametreleri()
+    location = request.args.get('location', '').upper() or None
+    group = request.args.get('group') or None
+    if group is not None and group not in GRUPLAR:
+        raise ValueError(f'group {", ".join(GRUPLAR)} değerlerinden biri olmalı')
+    bin_width = _sayi_parametresi('bin', alt=TEMEL_ARALIK, ust=10)
+    if bin_width is not None:
+        katsayi = bin_width / TEMEL_ARALIK
+        if abs(katsayi - round(katsayi)) > 1e-9:
+            raise ValueError(f'bin {TEMEL_ARALIK} değerinin katı olmalı')
+        bin_width = round(round(katsayi) * TEMEL_ARALIK, 1)
+    return location, start, end, group, bin_width
+
+@app.route('/api/aggregates', methods=['GET'])
+@onbellekli('aggregates', ['catalog'], _ozet_parametreleri)
+def get_aggregates():
+    """
+    Önceden hesaplanmış il × gün × büyüklük özetlerinden sayı, en büyük
+    büyüklük ve isteğe bağlı büyüklük histogramı (ör.
+    ?location=IZMIR&start=2024-12-01&end=2024-12-31&group=day&bin=0.5)
+    """
+    try:
+        try:
+            location, start, end, group, bin_width = _ozet_parametreleri()
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
+        index = registry.get('catalog')
+        rollups = index.extensions['rollups']
+        if location is not None and location not in rollups:
+            return jsonify({
+                'status': 'error',
+                'message': f'"{location}" konumunda deprem kaydı bulunamadı'
+            }), 404
+
+        with metrics.span('rollup_query'):
+            sonuc = rollups.query(location, start, end, group, bin_width)
+        return jsonify(dict({'status': 'success', 'location': location}, **sonuc))
+    except Exception as e:
+        app.logger.exception("%s isteğinde hata", request.path)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+TIME_RANGES = {
+    0: "0-6 saat içinde",
+    1: "6-12 saat içinde",
+    2: "12-24 saat içinde",
+    3: "1-3 gün içinde",
+    4: "3+ gün içinde"
+}
+
+def build_features(index, encoder, locations):
+    """
+    Verilen konumlar için tek bir özellik matrisi oluşturur (konum başına bir satır).
+    Özellikler il bazındaki kayan durumdan okunur, katalog taranmaz.
+    """
+    store = index.extensions['features']
+    encoded = encoder.transform(locations)
+    satirlar = [[location_encoded] + store.features(location)
+                for location, location_encoded in zip(locations, encoded)]
+    return pd.DataFrame(satirlar, columns=FEATURES)
+
+def predict_locations(locations):
+    """
+    Konum listesi için tahmin yapar; iki model de tüm konumlar için tek
+    seferde çalıştırılır. Tanımsız konumlar hata kaydı olarak döner.
+    """
+    index = registry.get('catalog')
+    encoder = registry.get('label_encoder')
+    magnitude_model = registry.get('magnitude_model')
+    time_model = registry.get('time_model')
+
+    bilinen = set(encoder.classes_)
+    gecerli = [location for location in locations if location in bilinen]
+    prediction_batch_size.observe(len(locations))
+
+    tahminler = {}
+    if gecerli:
+        with metrics.span('build_features'):
+            features = build_features(index, encoder, gecerli)
+        with metrics.span('predict_magnitude'):
+            magnitude_preds = magnitude_model.predict(features)
+        with metrics.span('predict_time'):
+            time_categories = time_model.predict(features)
+        for location, magnitude_pred, time_category in zip(gecerli, magnitude_preds, time_categories):
+            tahminler[location] = {
+                'status': 'success',
+                'location': location,
+                'predicted_magnitude': round(float(magnitude_pred), 2),
+                'predicted_time_range': TIME_RANGES[time_category]
+            }
+
+    return [
+        tahminler.get(location, {
+            'status': 'error',
+            'location': location,
+            'message': f'"{location}" konumu tanımlı değil'
+        })
+        for location in locations
+    ]
+
+# Eşzamanlı tahmin istekleri birkaç milisaniyelik pencerede tek model
+# çağrısında toplanır; aynı konum için bekleyen istekler tek hesaplamayı paylaşır
+batcher = PredictionBatcher(predict_locations)
+PREDICT_TIMEOUT = 30
+
+def _tahmin_parametreleri():
+    locations = (request.get_json(silent=True) or {}).get('locations')
+    if isinstance(locations, list):
+        return tuple(dict.fromkeys(str(k).upper() for k in locations))
+    return str(locations).upper()
+
 @app.route('/api/predict-next-earthquake', methods=['POST'])
 @app.route('/api/predict-next-earthquake', methods=['POST'])
+@onbellekli('predict', KAYNAKLAR,
+            lambda: (request.get_json(silent=True) or {}).get('location', '').upper())
 def predict_next_earthquake():
     try:
         data = request.get_json()
@@ -80,80 +503,257 @@ def predict_next_earthquake():
                 'message': 'Konum bilgisi gerekli'
             }), 400
 
-        csv_path = get_csv_path()
-        df = pd.read_csv(csv_path)
-        df['Tarih_Saat'] = pd.to_datetime(df['Tarih_Saat'], format='%Y-%m-%d %H:%M:%S')
-
-        # LabelEncoder'ı yükle
-        with open('C:/Users/alpba/Desktop/YapayZekaSon1/models/label_encoder.pkl', 'rb') as file:
-            encoder = pickle.load(file)
-
-        if location not in encoder.classes_:
+        sonuc = batcher.predict([location], PREDICT_TIMEOUT)[0]
+        if sonuc['status'] != 'success':
             return jsonify({
                 'status': 'error',
-                'message': f'"{location}" konumu tanımlı değil'
+                'message': sonuc['message']
             }), 404
 
-        location_encoded = encoder.transform([location])[0]
-        last_month = df[df['Konum'] == location].tail(30)
-
-        # DepremAraligi sütununu oluştur
-        last_month['OncekiDepremZamani'] = last_month['Tarih_Saat'].shift(1)
-        last_month['DepremAraligi'] = (last_month['Tarih_Saat'] - last_month['OncekiDepremZamani']).dt.total_seconds() / 3600
-        print("Step 10: DepremAraligi sütunu oluşturuldu:", last_month[['Tarih_Saat', 'DepremAraligi']])
-
-        # Özellikleri oluştur
-        features = pd.DataFrame({
-            'Konum_Encoded': [location_encoded],
-            'SonAy_DepremSayisi': [len(last_month)],
-            'SonAy_OrtBuyukluk': [last_month['Buyukluk'].mean()],
-            'SonAy_MaxBuyukluk': [last_month['Buyukluk'].max()],
-            'SonAy_MinBuyukluk': [last_month['Buyukluk'].min()],
-            'SonAy_StdBuyukluk': [last_month['Buyukluk'].std()],
-            'SonAy_OrtAralik': [last_month['DepremAraligi'].mean()],
-            'SonAy_MaxAralik': [last_month['DepremAraligi'].max()],
-            'SonAy_MinAralik': [last_month['DepremAraligi'].min()]
-        }).fillna(0)
-        print("Step 11: Özellikler oluşturuldu:", features)
-
-        # Model dosyalarını yükle
-        magnitude_model_path = get_model_path('magnitude_model')
-        time_model_path = get_model_path('time_model')
-
-        with open(magnitude_model_path, 'rb') as file:
-            magnitude_model = pickle.load(file)
-        with open(time_model_path, 'rb') as file:
-            time_model = pickle.load(file)
-
-        # Tahmin yap
-        magnitude_pred = magnitude_model.predict(features)[0]
-        time_category = time_model.predict(features)[0]
-        print("Step 12: Tahminler yapıldı - Magnitude:", magnitude_pred, "Time Category:", time_category)
-
-        time_ranges = {
-            0: "0-6 saat içinde",
-            1: "6-12 saat içinde",
-            2: "12-24 saat içinde",
-            3: "1-3 gün içinde",
-            4: "3+ gün içinde"
-        }
+        return jsonify(sonuc)
+
+    except Exception as e:
+        app.logger.exception("%s isteğinde hata", request.path)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/predict-next-earthquakes', methods=['POST'])
+@onbellekli('predict-batch', KAYNAKLAR, _tahmin_parametreleri)
+def predict_next_earthquakes():
+    """
+    Toplu tahmin: {"locations": ["IZMIR", ...]} ya da {"locations": "all"}
+    """
+    try:
+        data = request.get_json() or {}
+        locations = data.get('locations')
+
+        if locations == 'all' or locations == 'ALL':
+            encoder = registry.get('label_encoder')
+            locations = [k for k in encoder.classes_ if k != 'BELIRSIZ']
+        elif isinstance(locations, list) and locations:
+            locations = list(dict.fromkeys(str(k).upper() for k in locations))
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': 'Konum listesi ya da "all" gerekli'
+            }), 400
 
+        sonuclar = batcher.predict(locations, PREDICT_TIMEOUT)
         return jsonify({
             'status': 'success',
-            'location': location,
-            'predicted_magnitude': round(magnitude_pred, 2),
-            'predicted_time_range': time_ranges[time_category]
+            'count': len(sonuclar),
+            'data': sonuclar
         })
 
     except Exception as e:
-        print("Hata oluştu:", str(e))  # Hata mesajını logla
+        app.logger.exception("%s isteğinde hata", request.path)
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
+@app.route('/api/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Yanıt önbelleği ve tahmin toplayıcı sayaçları"""
+    return jsonify({
+        'status': 'success',
+        'cache': response_cache.status(),
+        'batcher': dict(getattr(batcher, 'stats', {})),
+    })
+
+@app.before_request
+def _istek_baslangici():
+    g.istek_baslangici = time.perf_counter()
+
+@app.after_request
+def _istek_sonu(response):
+    baslangic = g.get('istek_baslangici')
+    if baslangic is not None:
+        # Yol şablonu kullanılır; ham URL etiket sayısını sınırsız büyütür
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'other'
+        request_latency.observe(time.perf_counter() - baslangic, endpoint, request.method)
+        request_count.inc(endpoint, request.method, str(response.status_code))
+    return response
+
+@metrics.collector
+def _sayaclar():
+    """Önbellek, registry ve tahmin toplayıcıda tutulan sayaçlar"""
+    cache = response_cache.status()
+    batcher_stats = dict(getattr(batcher, 'stats', {}))
+    kaynaklar = registry.status()
+    return [
+        ('response_cache_events_total', 'counter', 'Yanıt önbelleği olayları',
+         [({'event': ad}, cache[ad]) for ad in ('hits', 'misses', 'evictions', 'invalidations', 'not_modified')]),
+        ('response_cache_entries', 'gauge', 'Önbellekteki yanıt sayısı', [({}, cache['entries'])]),
+        ('batcher_events_total', 'counter', 'Tahmin toplayıcı sayaçları',
+         [({'event': ad}, deger) for ad, deger in batcher_stats.items()]),
+        ('resource_reloads_total', 'counter', 'Kaynağın tamamen yeniden yüklenme sayısı',
+         [({'resource': ad}, durum['reloads']) for ad, durum in kaynaklar.items()]),
+        ('resource_appends_total', 'counter', 'Kataloğa artımlı eklenen parça sayısı',
+         [({'resource': ad}, durum['appends']) for ad, durum in kaynaklar.items()]),
+        ('resource_error', 'gauge', 'Son yükleme hatalıysa 1',
+         [({'resource': ad}, int(durum['error'] is not None)) for ad, durum in kaynaklar.items()]),
+        ('profiler_running', 'gauge', 'Örnekleyici profilleyici açıksa 1', [({}, int(profiler.running))]),
+    ]
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
+# Örnekleyici profilleyici varsayılan olarak kapalıdır. Çalışırken
+# /api/profiler ile (yalnızca yerel istemciler) ya da PROFIL_SINYALI ile
+# açılıp kapatılır. gunicorn USR1/USR2/HUP/WINCH/TTIN/TTOU sinyallerini
+# kullanır ve işçilerde bunları varsayılana döndürür (USR2 işçiyi öldürür,
+# ana süreçte yeniden başlatmadır). SIGURG'e dokunmaz; varsayılan eylemi yok
+# saymak olduğu için yanlışlıkla ana sürece gönderilse de zararsızdır.
+# --preload ile içe aktarma sırasında kurulan işleyici fork'ta işçilere geçer.
+PROFIL_SINYALI = getattr(signal, 'SIGURG', None)
+profiler = SamplingProfiler()
+YEREL_ADRESLER = {'127.0.0.1', '::1'}
+
+def _profiler_sinyali(signum, frame):
+    # Sinyal ana iş parçacığında işlenir; join beklememek için ayrı iş parçacığı
+    threading.Thread(target=profiler.toggle, daemon=True).start()
+
+if PROFIL_SINYALI is not None and threading.current_thread() is threading.main_thread():
+    signal.signal(PROFIL_SINYALI, _profiler_sinyali)
+
+@app.route('/api/profiler', methods=['GET', 'POST'])
+def profiler_control():
+    """
+    GET: durum ve en çok örneklenen fonksiyonlar (?format=folded ile
+    flamegraph için katlanmış yığınlar). POST: {"action": "start"|"stop",
+    "interval": 0.01}
+    """
+    if request.remote_addr not in YEREL_ADRESLER:
+        return jsonify({
+            'status': 'error',
+            'message': 'Profilleyici yalnızca yerel istemcilere açık'
+        }), 403
+
+    if request.method == 'GET':
+        if request.args.get('format') == 'folded':
+            return Response(profiler.folded(), mimetype='text/plain')
+        return jsonify({
+            'status': 'success',
+            'profiler': profiler.status(),
+            'top': profiler.top(request.args.get('n', 20, type=int)),
+        })
+
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action == 'start':
+        try:
+            interval = float(data.get('interval', 0.01))
+        except (TypeError, ValueError):
+            interval = 0.0
+        if not 0.001 <= interval <= 10:
+            return jsonify({
+                'status': 'error',
+                'message': 'interval 0.001 ile 10 saniye arasında olmalı'
+            }), 400
+        profiler.start(interval)
+    elif action == 'stop':
+        profiler.stop()
+    else:
+        return jsonify({
+            'status': 'error',
+            'message': 'action "start" ya da "stop" olmalı'
+        }), 400
+    return jsonify({'status': 'success', 'profiler': profiler.status()})
+
+@app.route('/api/refresh', methods=['POST'])
+def refresh():
+    """
+    Veri alma servisinin (ingest_daemon) bildirimi. Gövdede verilen eklemeler
+    ({"catalog": {"offset": bayt, "data": "başlıksız CSV satırları"}}) dosya
+    okunmadan indekse ve özellik durumuna işlenir; ardından diğer kaynaklar
+    kontrol edilir. Sürümler değiştiği için önbellek kendiliğinden yenilenir.
+    Yalnızca yerel istemcilere açıktır.
+    """
+    if request.remote_addr not in YEREL_ADRESLER:
+        return jsonify({
+            'status': 'error',
+            'message': 'Yenileme yalnızca yerel istemcilere açık'
+        }), 403
+
+    data = request.get_json(silent=True) or {}
+    eklemeler = {}
+    for name, ek in data.items():
+        try:
+            eklemeler[name] = (int(ek['offset']), ek['data'].encode('utf-8'))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return jsonify({
+                'status': 'error',
+                'message': f'"{name}" için offset ve data gerekli'
+            }), 400
+        if name not in KAYNAKLAR + SORGU_KAYNAKLARI:
+            return jsonify({
+                'status': 'error',
+                'message': f'"{name}" tanımlı bir kaynak değil'
+            }), 400
+
+    with metrics.span('refresh'):
+        eklenenler = [name for name, (offset, veri) in eklemeler.items()
+                      if registry.push(name, offset, veri)]
+        yenilenenler = registry.check()
+    return jsonify({
+        'status': 'success',
+        'pushed': eklenenler,
+        'refreshed': yenilenenler,
+        'versions': {name: registry.version(name) for name in KAYNAKLAR + SORGU_KAYNAKLARI},
+    })
+
+def _isit():
+    """İlk tahmin isteğinin ödeyeceği tek seferlik maliyetleri (model sayfaları vb.) öder"""
+    try:
+        encoder = registry.get('label_encoder')
+        features = build_features(registry.get('catalog'), encoder, list(encoder.classes_[:1]))
+        registry.get('magnitude_model').predict(features)
+        registry.get('time_model').predict(features)
+    except Exception as e:
+        app.logger.warning("Isınma atlandı: %s", e)
+
+def preload():
+    """
+    Katalog, indeksler ve modelleri yükleyip ısıtır. Modül içe aktarılırken
+    çağrılır; gunicorn --preload ile bu ana süreçte, fork'tan önce olur ve
+    işçiler yüklenen sayfaları paylaşır (izleyici her işçide yeniden başlar).
+    """
+    registry.load_all()
+    _isit()
+    # Yüklenen nesneler kalıcı nesle alınır; çöp toplayıcı işçilerde onlara
+    # dokunup paylaşılan sayfaları kopyalatmaz
+    gc.freeze()
+    registry.start_watcher()
+
+preload()
+
+def main():
+    parser = argparse.ArgumentParser(description='Deprem tahmin API sunucusu')
+    parser.add_argument('--serve', action='store_true',
+                        help='Üretim modu: debug kapalı, çok iş parçacıklı sunucu')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=16,
+                        help='Üretim modunda eşzamanlı istek iş parçacığı sayısı')
+    args = parser.parse_args()
+
+    if not args.serve:
+        app.run(debug=True, port=args.port)
+        return
+
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    if serve is not None:
+        serve(app, host=args.host, port=args.port, threads=args.threads)
+    else:
+        # waitress kurulu değilse Werkzeug'un çok iş parçacıklı sunucusu
+        app.run(host=args.host, port=args.port, debug=False, threaded=True)
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+
+
+def atomic_write_bytes(path, veri):
+    """
+    Veriyi aynı dizindeki geçici dosyaya yazıp os.replace ile yerine taşır.
+    Yarıda kalan bir yazım hedef dosyayı asla bozmaz.
+    """
+    dizin = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dizin, exist_ok=True)
+    fd, gecici = tempfile.mkstemp(dir=dizin, prefix='.' + os.path.basename(path) + '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(veri)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(gecici, path)
+    except BaseException:
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        raise
+
+
+def atomic_write_json(path, nesne):
+    atomic_write_bytes(path, json.dumps(nesne, ensure_ascii=False, indent=2).encode('utf-8'))
+
+
+def read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def append_bytes(path, veri):
+    """
+    Veriyi dosyanın sonuna tek seferde yazar ve diske zorlar.
+    Yeni dosya boyutunu döndürür.
+    """
+    with open(path, 'ab') as f:
+        f.write(veri)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def rollback_append(path, boyut):
+    """
+    Durum dosyasına işlenmeden yarıda kalan eklemeleri geri alır: dosya
+    kayıtlı boyuttan büyükse o boyuta kırpılır. Kırpma yapıldıysa True döner.
+    """
+    if boyut is None or not os.path.exists(path):
+        return False
+    if os.path.getsize(path) > boyut:
+        with open(path, 'r+b') as f:
+            f.truncate(boyut)
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+    return False
+
+
+def atomic_truncate(path, boyut, parca=1 << 20):
+    """
+    Dosyanın ilk boyut baytını aynı dizindeki geçici dosyaya kopyalayıp
+    os.replace ile yerine taşır. Yerinde kırpmadan farkı dosyanın yeni bir
+    inode olmasıdır: dosyayı izleyenler (registry) kuyruğu yeniden yazılıp
+    aynı boyuta yeniden büyüyen dosyayı bir ekleme sanmaz.
+    """
+    dizin = os.path.dirname(os.path.abspath(path))
+    fd, gecici = tempfile.mkstemp(dir=dizin, prefix='.' + os.path.basename(path) + '.')
+    try:
+        with open(path, 'rb') as kaynak, os.fdopen(fd, 'wb') as f:
+            kalan = boyut
+            while kalan > 0:
+                veri = kaynak.read(min(kalan, parca))
+                if not veri:
+                    break
+                f.write(veri)
+                kalan -= len(veri)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(gecici, path)
+    except BaseException:
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        raise
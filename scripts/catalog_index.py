@@ -0,0 +1,244 @@
+import heapq
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+
+from registry import load_catalog
+from feature_store import FeatureStore
+from rollup_store import RollupStore
+
+TARIH_FORMATI = '%Y-%m-%d %H:%M:%S'
+
+
+class _Blok:
+    """
+    Zamana göre sıralı, sonuna ekleme yapılabilen satır bloğu.
+    Diziler kapasiteyi ikiye katlayarak büyür; sıralı eklemeler O(yeni satır).
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.times = np.empty(0, dtype=np.int64)
+        self.mags = np.empty(0, dtype=np.float64)
+        self.seqs = np.empty(0, dtype=np.int64)
+        self.konum = np.empty(0, dtype=np.int32)
+
+    def _kapasite(self, gereken):
+        if gereken <= len(self.times):
+            return
+        yeni = max(gereken, 2 * len(self.times), 16)
+        for ad in ('times', 'mags', 'seqs', 'konum'):
+            eski = getattr(self, ad)
+            dizi = np.empty(yeni, dtype=eski.dtype)
+            dizi[:self.n] = eski[:self.n]
+            setattr(self, ad, dizi)
+
+    def ekle(self, times, mags, seqs, konum):
+        """Satırlar (zaman, sıra) düzeninde gelmelidir"""
+        m = len(times)
+        if m == 0:
+            return
+        self._kapasite(self.n + m)
+
+        if self.n and times[0] < self.times[self.n - 1]:
+            # Geç gelen kayıtlar: birleştirip kararlı şekilde yeniden sırala
+            t = np.concatenate([self.times[:self.n], times])
+            s = np.concatenate([self.seqs[:self.n], seqs])
+            sira = np.lexsort((s, t))
+            self.mags[:self.n + m] = np.concatenate([self.mags[:self.n], mags])[sira]
+            self.konum[:self.n + m] = np.concatenate([self.konum[:self.n], konum])[sira]
+            self.times[:self.n + m] = t[sira]
+            self.seqs[:self.n + m] = s[sira]
+        else:
+            self.times[self.n:self.n + m] = times
+            self.mags[self.n:self.n + m] = mags
+            self.seqs[self.n:self.n + m] = seqs
+            self.konum[self.n:self.n + m] = konum
+        self.n += m
+
+    def aralik(self, start_ns=None, end_ns=None):
+        times = self.times[:self.n]
+        lo = 0 if start_ns is None else int(np.searchsorted(times, start_ns, side='left'))
+        hi = self.n if end_ns is None else int(np.searchsorted(times, end_ns, side='right'))
+        return lo, max(lo, hi)
+
+
+class CatalogIndex:
+    """
+    updated_earthquakes.csv üzerinde bellek içi indeks.
+
+    Her il için zamana göre sıralı bir blok, ayrıca tüm katalog için genel bir
+    blok tutulur. Genel ve il bazında en büyük top_k deprem min-heap'lerde
+    saklanır; böylece en büyük k deprem sorguları katalog boyutundan bağımsız
+    O(K) maliyetle cevaplanır. Yeni satırlar append() ile eklenir.
+
+    extensions: append(df, index) metodu olan ve her eklemede yeni
+    satırlarla güncellenen ek yapılar (ör. özellik deposu).
+    """
+
+    def __init__(self, df=None, top_k=100, extensions=None):
+        self.top_k = top_k
+        self.extensions = extensions or {}
+        self._lock = threading.Lock()
+        self._konumlar = []
+        self._konum_kodu = {}
+        self._genel = _Blok()
+        self._bloklar = {}
+        self._genel_heap = []
+        self._heapler = {}
+        self._parcalar = []
+        self._frame = None
+        self._sonraki_seq = 0
+        if df is not None:
+            self.append(df)
+
+    def __getstate__(self):
+        # Kilit pickle edilemez; anlık görüntüden açılınca yenisi oluşturulur
+        with self._lock:
+            durum = self.__dict__.copy()
+        del durum['_lock']
+        return durum
+
+    def __setstate__(self, durum):
+        self.__dict__.update(durum)
+        self._lock = threading.Lock()
+
+    def _kod(self, konum):
+        kod = self._konum_kodu.get(konum)
+        if kod is None:
+            kod = len(self._konumlar)
+            self._konum_kodu[konum] = kod
+            self._konumlar.append(konum)
+            self._bloklar[konum] = _Blok()
+            self._heapler[konum] = []
+        return kod
+
+    def _heap_ekle(self, heap, oge):
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, oge)
+        elif oge > heap[0]:
+            heapq.heapreplace(heap, oge)
+
+    def append(self, df):
+        """Yeni satırları indekse ekler; mevcut indeks yeniden kurulmaz"""
+        if len(df) == 0:
+            return
+        times = df['Tarih_Saat'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        mags = df['Buyukluk'].to_numpy(dtype=np.float64)
+        konumlar = df['Konum'].astype(str).to_numpy()
+
+        with self._lock:
+            seqs = np.arange(self._sonraki_seq, self._sonraki_seq + len(df), dtype=np.int64)
+            self._sonraki_seq += len(df)
+            kodlar = np.fromiter((self._kod(k) for k in konumlar), dtype=np.int32, count=len(df))
+
+            sira = np.lexsort((seqs, times))
+            self._genel.ekle(times[sira], mags[sira], seqs[sira], kodlar[sira])
+
+            # İl bloklarına kod sırasıyla gruplanmış olarak ekle
+            il_sira = np.lexsort((seqs, times, kodlar))
+            sinirlar = np.flatnonzero(np.diff(kodlar[il_sira])) + 1
+            for grup in np.split(il_sira, sinirlar):
+                kod = kodlar[grup[0]]
+                self._bloklar[self._konumlar[kod]].ekle(times[grup], mags[grup], seqs[grup], kodlar[grup])
+
+            # Heap öğesi: büyüklük eşitse önce gelen satır (küçük seq) öncelikli
+            for t, m, s, kod in zip(times, mags, seqs, kodlar):
+                oge = (m, -s, t, kod)
+                self._heap_ekle(self._genel_heap, oge)
+                self._heap_ekle(self._heapler[self._konumlar[kod]], oge)
+
+            self._parcalar.append(df)
+            self._frame = None
+
+        for eklenti in self.extensions.values():
+            eklenti.append(df, self)
+
+    @property
+    def frame(self):
+        """İndekslenen satırların DataFrame hali (ilk erişimde birleştirilir)"""
+        with self._lock:
+            if self._frame is None:
+                if len(self._parcalar) == 1:
+                    self._frame = self._parcalar[0]
+                else:
+                    self._frame = pd.concat(self._parcalar, ignore_index=True)
+                    self._parcalar = [self._frame]
+            return self._frame
+
+    def __contains__(self, konum):
+        return konum in self._bloklar
+
+    def __len__(self):
+        return self._genel.n
+
+    def count(self, konum=None, start=None, end=None):
+        blok = self._genel if konum is None else self._bloklar.get(konum)
+        if blok is None:
+            return 0
+        lo, hi = blok.aralik(_ns(start), _ns(end))
+        return hi - lo
+
+    def _kayit(self, t, m, kod):
+        return {
+            'Tarih_Saat': pd.Timestamp(int(t)).strftime(TARIH_FORMATI),
+            'Konum': self._konumlar[kod],
+            'Buyukluk': float(m),
+        }
+
+    def largest(self, k=5, konum=None, start=None, end=None):
+        """
+        En büyük k depremi büyüklüğe göre azalan sırada döndürür.
+        Eşit büyüklükte katalogda önce gelen kayıt öne alınır (nlargest gibi).
+        """
+        start_ns, end_ns = _ns(start), _ns(end)
+        with self._lock:
+            if konum is None:
+                blok, heap = self._genel, self._genel_heap
+            elif konum in self._bloklar:
+                blok, heap = self._bloklar[konum], self._heapler[konum]
+            else:
+                return []
+
+            # Önce heap: aralıktaki ilk k öğe heap içindeyse O(K) yeterli
+            secilen = []
+            for m, neg_s, t, kod in sorted(heap, reverse=True):
+                if (start_ns is None or t >= start_ns) and (end_ns is None or t <= end_ns):
+                    secilen.append(self._kayit(t, m, kod))
+                    if len(secilen) == k:
+                        return secilen
+            if len(heap) < self.top_k:
+                # Heap bloğun tamamını içeriyor, başka aday yok
+                return secilen
+
+            # Heap yetmedi: zaman aralığındaki dilim üzerinde seçim
+            lo, hi = blok.aralik(start_ns, end_ns)
+            mags = blok.mags[lo:hi]
+            seqs = blok.seqs[lo:hi]
+            if len(mags) > k:
+                esik = np.partition(mags, len(mags) - k)[len(mags) - k]
+                aday = np.flatnonzero(mags >= esik)
+            else:
+                aday = np.arange(len(mags))
+            aday = aday[np.lexsort((seqs[aday], -mags[aday]))][:k] + lo
+            return [self._kayit(blok.times[i], blok.mags[i], blok.konum[i]) for i in aday]
+
+
+def _ns(deger):
+    if deger is None:
+        return None
+    return pd.Timestamp(deger).value
+
+
+def load_catalog_index(path):
+    return CatalogIndex(load_catalog(path), extensions={'features': FeatureStore(), 'rollups': RollupStore()})
+
+
+def append_catalog_index(index, data):
+    """Registry'den gelen yeni CSV satırlarını (başlık dahil) indekse ekler"""
+    df = pd.read_csv(io.BytesIO(data))
+    df['Tarih_Saat'] = pd.to_datetime(df['Tarih_Saat'], format=TARIH_FORMATI)
+    index.append(df)
+    return index
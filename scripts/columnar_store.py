@@ -0,0 +1,376 @@
+import argparse
+import io
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from atomic_io import atomic_write_json, read_json
+
+# Dosya yollarını düzgün şekilde oluştur
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+data_dir = os.path.join(project_root, 'YapayZekaSon1', 'data')
+store_root = os.path.join(data_dir, 'columnar')
+
+TARIH_FORMATI = '%Y-%m-%d %H:%M:%S'
+
+# Katalog şemaları: sütun -> tip. 'category' sütunları int kodlar olarak,
+# kategoriler manifest içinde saklanır. append_only kataloglarda CSV'ye
+# yalnızca sonuna satır eklenir (kuyruk yeniden yazılmaz). Ondalık sütunlar
+# float64 tutulur: float32'de 2.3 gibi değerler 2.2999999523 olarak döner ve
+# CSV'den okunan katalogla birebir aynı olmaz.
+SEMALAR = {
+    'earthquakes': {
+        'time': 'Tarih',
+        'append_only': False,
+        'columns': {
+            'Tarih': 'datetime64[ns]',
+            'Enlem': 'float64',
+            'Boylam': 'float64',
+            'Derinlik': 'float64',
+            'Buyukluk': 'float64',
+            'Yer': 'category',
+        },
+    },
+    'updated_earthquakes': {
+        'time': 'Tarih_Saat',
+        'append_only': True,
+        'columns': {
+            'Tarih_Saat': 'datetime64[ns]',
+            'Konum': 'category',
+            'Buyukluk': 'float64',
+        },
+    },
+}
+
+
+def catalog_dir(name):
+    return os.path.join(store_root, name)
+
+
+def _manifest_yolu(name):
+    return os.path.join(catalog_dir(name), 'manifest.json')
+
+
+def exists(name):
+    return os.path.exists(_manifest_yolu(name))
+
+
+def _bos_manifest(name):
+    return {
+        'schema': SEMALAR[name]['columns'],
+        'categories': {c: [] for c, t in SEMALAR[name]['columns'].items() if t == 'category'},
+        'partitions': {},
+        'version': 0,
+        # Kataloğun yansıttığı CSV boyutu; bilinmiyorsa None
+        'source_size': None,
+    }
+
+
+def _kodla(manifest, sutun, degerler):
+    """
+    Kategorik değerleri manifestteki kategori listesine göre koda çevirir.
+    Yeni kategoriler listenin sonuna eklenir; eski kodlar geçerli kalır.
+    """
+    kategoriler = manifest['categories'][sutun]
+    kod = {k: i for i, k in enumerate(kategoriler)}
+    degerler = pd.Series(degerler).astype(str)
+    for yeni in pd.unique(degerler):
+        if yeni not in kod:
+            kod[yeni] = len(kategoriler)
+            kategoriler.append(yeni)
+    kod_tipi = np.int16 if len(kategoriler) < 2**15 else np.int32
+    return degerler.map(kod).to_numpy(dtype=kod_tipi)
+
+
+def _bolum_yaz(name, manifest, ay, df):
+    """
+    Tek bir aylık bölümü yeni sürüm dizinine yazar. Eski sürüm, manifest
+    güncellendikten sonra silinir; böylece okuyucular yarım bölüm görmez.
+    """
+    sema = manifest['schema']
+    zaman = SEMALAR[name]['time']
+    df = df.sort_values(zaman, kind='mergesort')
+    dizin_adi = f"{ay}.v{manifest['version']}"
+    dizin = os.path.join(catalog_dir(name), dizin_adi)
+    os.makedirs(dizin, exist_ok=True)
+
+    for sutun, tip in sema.items():
+        if tip == 'category':
+            dizi = _kodla(manifest, sutun, df[sutun])
+        elif tip.startswith('datetime64'):
+            dizi = pd.to_datetime(df[sutun]).to_numpy(dtype=tip)
+        else:
+            dizi = df[sutun].to_numpy(dtype=tip)
+        np.save(os.path.join(dizin, f'{sutun}.npy'), np.ascontiguousarray(dizi))
+
+    return {'dir': dizin_adi, 'rows': len(df),
+            'min': str(df[zaman].min()), 'max': str(df[zaman].max())}
+
+
+def _manifesti_kaydet(name, manifest, eski_dizinler):
+    atomic_write_json(_manifest_yolu(name), manifest)
+    for dizin in eski_dizinler:
+        shutil.rmtree(os.path.join(catalog_dir(name), dizin), ignore_errors=True)
+
+
+def _aylara_bol(name, df):
+    zaman = pd.to_datetime(df[SEMALAR[name]['time']])
+    return df.groupby(zaman.dt.strftime('%Y-%m').to_numpy(), sort=True)
+
+
+def write_catalog(name, df, source_size=None):
+    """
+    Kataloğu sıfırdan aylık bölümler halinde yazar. source_size, kataloğun
+    karşılığı olan CSV'nin bayt boyutudur (bkz. sync_with_csv).
+    """
+    eski = read_json(_manifest_yolu(name))
+    manifest = _bos_manifest(name)
+    manifest['version'] = (eski['version'] + 1) if eski else 1
+    manifest['source_size'] = source_size
+    for ay, grup in _aylara_bol(name, df):
+        manifest['partitions'][ay] = _bolum_yaz(name, manifest, ay, grup)
+    eski_dizinler = [b['dir'] for b in eski['partitions'].values()] if eski else []
+    _manifesti_kaydet(name, manifest, eski_dizinler)
+    return manifest
+
+
+def append_catalog(name, df, source_size=None):
+    """
+    Yeni satırları ekler; yalnızca satırların düştüğü aylık bölümler
+    yeniden yazılır
+    """
+    manifest = read_json(_manifest_yolu(name))
+    if manifest is None:
+        return write_catalog(name, df, source_size)
+    if len(df) == 0:
+        return mark_source(name, source_size)
+
+    manifest['version'] += 1
+    manifest['source_size'] = source_size
+    eski_dizinler = []
+    for ay, grup in _aylara_bol(name, df):
+        eski = manifest['partitions'].get(ay)
+        if eski is not None:
+            mevcut = read_catalog(name, partitions=[ay], mmap=False, manifest=manifest)
+            grup = pd.concat([mevcut, grup[list(manifest['schema'])]], ignore_index=True)
+            eski_dizinler.append(eski['dir'])
+        manifest['partitions'][ay] = _bolum_yaz(name, manifest, ay, grup)
+    _manifesti_kaydet(name, manifest, eski_dizinler)
+    return manifest
+
+
+def replace_tail(name, start, df, source_size=None):
+    """
+    start anından (dahil) sonraki tüm satırları df ile değiştirir. start'tan
+    önceki aylık bölümlere dokunulmaz; start'ın düştüğü bölümde önceki
+    satırlar korunur.
+    """
+    manifest = read_json(_manifest_yolu(name))
+    if manifest is None:
+        return write_catalog(name, df, source_size)
+
+    zaman = SEMALAR[name]['time']
+    start = pd.Timestamp(start)
+    ilk_ay = start.strftime('%Y-%m')
+    yeni_bolumler = dict(list(_aylara_bol(name, df))) if len(df) else {}
+    aylar = sorted({ay for ay in manifest['partitions'] if ay >= ilk_ay} | set(yeni_bolumler))
+
+    manifest['version'] += 1
+    manifest['source_size'] = source_size
+    eski_dizinler = []
+    for ay in aylar:
+        parcalar = []
+        eski = manifest['partitions'].get(ay)
+        if eski is not None:
+            if ay == ilk_ay:
+                mevcut = read_catalog(name, partitions=[ay], mmap=False, manifest=manifest)
+                parcalar.append(mevcut[mevcut[zaman] < start])
+            eski_dizinler.append(eski['dir'])
+        if ay in yeni_bolumler:
+            parcalar.append(yeni_bolumler[ay][list(manifest['schema'])])
+        grup = pd.concat(parcalar, ignore_index=True) if parcalar else None
+        if grup is not None and len(grup):
+            manifest['partitions'][ay] = _bolum_yaz(name, manifest, ay, grup)
+        else:
+            manifest['partitions'].pop(ay, None)
+    _manifesti_kaydet(name, manifest, eski_dizinler)
+    return manifest
+
+
+def read_catalog(name, start=None, end=None, konum=None, columns=None,
+                 mmap=True, partitions=None, manifest=None):
+    """
+    Kataloğu okur. start/end verilirse yalnızca ilgili aylık bölümler açılır
+    ve bölüm içinde ikili arama ile dilimlenir; konum (tek değer ya da liste)
+    kategori kodları üzerinden süzülür. mmap=True iken diziler bellek
+    eşlemeli açılır, filtre yoksa kopyalanmaz.
+    """
+    manifest = manifest or read_json(_manifest_yolu(name))
+    if manifest is None:
+        raise FileNotFoundError(f'"{name}" için sütunlu katalog bulunamadı')
+
+    sema = manifest['schema']
+    zaman = SEMALAR[name]['time']
+    columns = list(columns or sema)
+    okunacak = list(dict.fromkeys(columns + ([zaman] if start is not None or end is not None else [])))
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    if partitions is None:
+        partitions = sorted(manifest['partitions'])
+        if start is not None:
+            partitions = [ay for ay in partitions if ay >= start.strftime('%Y-%m')]
+        if end is not None:
+            partitions = [ay for ay in partitions if ay <= end.strftime('%Y-%m')]
+
+    konum_kodlari = None
+    if konum is not None:
+        konumlar = [konum] if isinstance(konum, str) else list(konum)
+        kategoriler = manifest['categories'].get('Konum', [])
+        konum_kodlari = [i for i, k in enumerate(kategoriler) if k in set(konumlar)]
+        if 'Konum' not in okunacak:
+            okunacak.append('Konum')
+
+    parcalar = {sutun: [] for sutun in okunacak}
+    for ay in partitions:
+        dizin = os.path.join(catalog_dir(name), manifest['partitions'][ay]['dir'])
+        diziler = {sutun: np.load(os.path.join(dizin, f'{sutun}.npy'), mmap_mode='r' if mmap else None)
+                   for sutun in okunacak}
+
+        secim = slice(None)
+        if start is not None or end is not None:
+            t = diziler[zaman]
+            lo = 0 if start is None else np.searchsorted(t, start.to_datetime64(), side='left')
+            hi = len(t) if end is None else np.searchsorted(t, end.to_datetime64(), side='right')
+            secim = slice(lo, hi)
+        if konum_kodlari is not None:
+            maske = np.isin(diziler['Konum'][secim], konum_kodlari)
+            baslangic = secim.start or 0
+            secim = np.flatnonzero(maske) + baslangic
+
+        for sutun in okunacak:
+            parcalar[sutun].append(diziler[sutun][secim])
+
+    veri = {}
+    for sutun in columns:
+        if parcalar[sutun]:
+            dizi = parcalar[sutun][0] if len(parcalar[sutun]) == 1 else np.concatenate(parcalar[sutun])
+        else:
+            dizi = np.empty(0, dtype=np.int16 if sema[sutun] == 'category' else sema[sutun])
+        if sema[sutun] == 'category':
+            dizi = pd.Categorical.from_codes(np.asarray(dizi), categories=manifest['categories'][sutun])
+        veri[sutun] = dizi
+    return pd.DataFrame(veri, copy=False)
+
+
+def iter_partitions(name, columns=None, mmap=True):
+    """
+    Aylık bölümleri zamana göre artan sırada birer DataFrame olarak üretir;
+    tüm katalog belleğe alınmadan baştan sona okunabilir
+    """
+    manifest = read_json(_manifest_yolu(name))
+    if manifest is None:
+        raise FileNotFoundError(f'"{name}" için sütunlu katalog bulunamadı')
+    for ay in sorted(manifest['partitions']):
+        yield read_catalog(name, columns=columns, mmap=mmap, partitions=[ay], manifest=manifest)
+
+
+def export_csv(name, path):
+    """Sütunlu kataloğu eski CSV formatında dışa aktarır"""
+    df = read_catalog(name, mmap=False)
+    df.to_csv(path, index=False, date_format=TARIH_FORMATI, encoding='utf-8')
+    return len(df)
+
+
+def _csv_oku(name, veri):
+    df = pd.read_csv(io.BytesIO(veri))
+    zaman = SEMALAR[name]['time']
+    df[zaman] = pd.to_datetime(df[zaman], format=TARIH_FORMATI)
+    return df
+
+
+def build_from_csv(name, path=None, size=None):
+    """Kataloğu CSV'nin ilk size baytından (verilmezse tamamından) kurar"""
+    path = path or os.path.join(data_dir, f'{name}.csv')
+    with open(path, 'rb') as f:
+        veri = f.read() if size is None else f.read(size)
+    return write_catalog(name, _csv_oku(name, veri), source_size=len(veri))
+
+
+def source_size(name):
+    """Kataloğun yansıttığı CSV boyutu; katalog yoksa ya da bilinmiyorsa None"""
+    manifest = read_json(_manifest_yolu(name))
+    return manifest.get('source_size') if manifest else None
+
+
+def mark_source(name, size):
+    """
+    Manifestteki kaynak boyutunu günceller. CSV yeniden yazılmadan önce
+    None ile çağrılır; yazım ile katalog güncellemesi arasında kalan bir
+    kesinti sonraki eşitlemede tam yeniden kurulumla onarılır.
+    """
+    manifest = read_json(_manifest_yolu(name))
+    if manifest is None:
+        return None
+    manifest['source_size'] = size
+    atomic_write_json(_manifest_yolu(name), manifest)
+    return manifest
+
+
+def sync_with_csv(name, path, size):
+    """
+    Kataloğu CSV'nin onaylanmış ilk size baytıyla eşitler. CSV ve durum
+    dosyası yazıldıktan sonra katalog güncellenemediyse (hata ya da süreç
+    sonlanması) manifestteki kaynak boyutu geride kalır. append_only bir
+    katalog CSV'nin o önekini satır sayısıyla da tutarlı yansıtıyorsa yalnızca
+    eksik satırlar eklenir; aksi halde katalog CSV'den yeniden kurulur.
+    Şeması güncel şemadan farklı (ör. float32 sütunlu) kataloglar da yeniden
+    kurulur. Eşitleme yapıldıysa True döner.
+    """
+    manifest = read_json(_manifest_yolu(name))
+    guncel = manifest is not None and manifest['schema'] == SEMALAR[name]['columns']
+    if manifest is None or (guncel and manifest.get('source_size') == size):
+        return False
+
+    kaynak = manifest.get('source_size')
+    if guncel and SEMALAR[name]['append_only'] and kaynak is not None and kaynak < size:
+        with open(path, 'rb') as f:
+            baslik = f.readline()
+            onek = f.read(kaynak - len(baslik))
+            satir = sum(b['rows'] for b in manifest['partitions'].values())
+            if len(onek) == kaynak - len(baslik) and onek.count(b'\n') == satir:
+                eksik = _csv_oku(name, baslik + f.read(size - kaynak))
+                append_catalog(name, eksik, source_size=size)
+                print(f"{name}: sütunlu katalogda eksik kalan {len(eksik)} satır eklendi.")
+                return True
+
+    build_from_csv(name, path, size)
+    print(f"{name}: sütunlu katalog CSV ile uyuşmuyordu, yeniden kuruldu.")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sütunlu (aylık bölümlü) deprem kataloğu')
+    alt = parser.add_subparsers(dest='komut', required=True)
+    build = alt.add_parser('build', help='CSV dosyalarından sütunlu katalog oluştur')
+    build.add_argument('names', nargs='*', default=list(SEMALAR))
+    export = alt.add_parser('export', help='Sütunlu kataloğu CSV olarak dışa aktar')
+    export.add_argument('name', choices=list(SEMALAR))
+    export.add_argument('path')
+    args = parser.parse_args()
+
+    if args.komut == 'build':
+        for name in args.names:
+            manifest = build_from_csv(name)
+            toplam = sum(b['rows'] for b in manifest['partitions'].values())
+            print(f"{name}: {toplam} satır, {len(manifest['partitions'])} bölüm yazıldı.")
+    else:
+        sayi = export_csv(args.name, args.path)
+        print(f"{sayi} satır '{args.path}' dosyasına aktarıldı.")
+
+
+if __name__ == "__main__":
+    main()
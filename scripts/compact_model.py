@@ -0,0 +1,298 @@
+import argparse
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+
+from atomic_io import atomic_write_json, read_json
+
+# Dosya yollarını düzgün şekilde oluştur
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+model_dir = os.path.join(project_root, 'YapayZekaSon1', 'models')
+compact_root = os.path.join(model_dir, 'compact')
+
+MODELLER = ['magnitude_model', 'time_model']
+ENCODER = 'label_encoder'
+
+# Aynı anda kaç sürüm tutulur: yeni sürüm yayınlanırken eski sürümü
+# eşlemiş süreçler dosyalarını kaybetmesin
+SAKLANAN_SURUM = 2
+
+# Tek seferde işlenecek (ağaç x örnek) hücre sayısı; bellek tavanı
+PARCA_HUCRE = 4_000_000
+
+
+def manifest_path(name):
+    return os.path.join(compact_root, f'{name}.json')
+
+
+def exists(name):
+    return os.path.exists(manifest_path(name))
+
+
+def _duz_diziler(model):
+    """
+    Ormandaki tüm ağaçların düğümlerini tek düz dizilere toplar. Çocuk
+    indeksleri genel indekse çevrilir; yapraklar kendilerini gösterir, böylece
+    gezinme döngüsü maske gerektirmeden en derin ağaç kadar adım atar.
+    """
+    import sklearn
+
+    siniflandirici = hasattr(model, 'classes_')
+    # sklearn 1.4'ten itibaren sınıflandırıcı ağaçları düğümde sınıf oranlarını saklar
+    oran_saklanir = tuple(int(p) for p in sklearn.__version__.split('.')[:2]) >= (1, 4)
+    parcalar = {ad: [] for ad in ('feature', 'threshold', 'left', 'right', 'missing_left', 'value')}
+    roots = []
+    derinlik = 0
+    kayma = 0
+
+    for agac in model.estimators_:
+        t = agac.tree_
+        n = t.node_count
+        indeks = np.arange(n) + kayma
+        yaprak = t.children_left == -1
+
+        parcalar['feature'].append(np.where(yaprak, 0, t.feature))
+        parcalar['threshold'].append(t.threshold)
+        parcalar['left'].append(np.where(yaprak, indeks, t.children_left + kayma))
+        parcalar['right'].append(np.where(yaprak, indeks, t.children_right + kayma))
+        eksik = getattr(t, 'missing_go_to_left', None)
+        parcalar['missing_left'].append(np.zeros(n, dtype=bool) if eksik is None else eksik.astype(bool))
+
+        if siniflandirici:
+            deger = t.value[:, 0, :model.n_classes_]
+            if not oran_saklanir:
+                # Eski sürümlerdeki DecisionTreeClassifier.predict_proba normalizasyonu
+                deger = deger.copy()
+                bolen = deger.sum(axis=1)[:, np.newaxis]
+                bolen[bolen == 0.0] = 1.0
+                deger /= bolen
+        else:
+            deger = t.value[:, 0, :1]
+        parcalar['value'].append(deger)
+
+        roots.append(kayma)
+        derinlik = max(derinlik, t.max_depth)
+        kayma += n
+
+    diziler = {
+        'feature': np.concatenate(parcalar['feature']).astype(np.int32),
+        'threshold': np.concatenate(parcalar['threshold']).astype(np.float64),
+        'left': np.concatenate(parcalar['left']).astype(np.int32),
+        'right': np.concatenate(parcalar['right']).astype(np.int32),
+        'missing_left': np.concatenate(parcalar['missing_left']),
+        'value': np.concatenate(parcalar['value']).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+    }
+    meta = {
+        'type': 'classifier' if siniflandirici else 'regressor',
+        'n_trees': len(model.estimators_),
+        'n_nodes': kayma,
+        'n_features': int(model.n_features_in_),
+        'max_depth': int(derinlik),
+        'classes': model.classes_.tolist() if siniflandirici else None,
+    }
+    return diziler, meta
+
+
+def export_forest(model, name):
+    """
+    Modeli models/compact/<name>.vN dizinine düz .npy dizileri olarak yazar ve
+    manifest dosyasını atomik olarak günceller. Manifest yolunu döndürür.
+    """
+    diziler, meta = _duz_diziler(model)
+    eski = read_json(manifest_path(name))
+    surum = (eski['version'] + 1) if eski else 1
+    dizin_adi = f'{name}.v{surum}'
+    dizin = os.path.join(compact_root, dizin_adi)
+    os.makedirs(dizin, exist_ok=True)
+    for ad, dizi in diziler.items():
+        np.save(os.path.join(dizin, f'{ad}.npy'), np.ascontiguousarray(dizi))
+
+    meta.update({'version': surum, 'dir': dizin_adi})
+    atomic_write_json(manifest_path(name), meta)
+
+    # Son SAKLANAN_SURUM sürüm dışındakileri temizle
+    for ad in os.listdir(compact_root):
+        if ad.startswith(name + '.v') and os.path.isdir(os.path.join(compact_root, ad)):
+            eski_surum = ad[len(name) + 2:]
+            if eski_surum.isdigit() and int(eski_surum) <= surum - SAKLANAN_SURUM:
+                shutil.rmtree(os.path.join(compact_root, ad), ignore_errors=True)
+    return manifest_path(name)
+
+
+class CompactForest:
+    """
+    Düz dizilerle temsil edilen orman. Diziler bellek eşlemeli açıldığında
+    aynı modeli yükleyen tüm süreçler sayfa önbelleğindeki tek kopyayı
+    paylaşır. predict/predict_proba sklearn ormanıyla birebir aynı sonucu
+    verir: girdi float32'ye çevrilir ve ağaç katkıları sırayla toplanır.
+    """
+
+    def __init__(self, meta, diziler):
+        self.meta = meta
+        self.n_estimators = meta['n_trees']
+        self.n_features_in_ = meta['n_features']
+        self.max_depth = meta['max_depth']
+        if meta['classes'] is not None:
+            self.classes_ = np.asarray(meta['classes'])
+        for ad, dizi in diziler.items():
+            setattr(self, ad, dizi)
+
+    def _yapraklar(self, X):
+        """Her ağaç ve örnek için ulaşılan yaprak düğümü, (ağaç, örnek) boyutunda"""
+        n = X.shape[0]
+        dugum = np.repeat(self.roots[:, np.newaxis], n, axis=1)
+        sutun = np.arange(n)[np.newaxis, :]
+        eksik_var = np.isnan(X).any()
+        for _ in range(self.max_depth):
+            ozellik = self.feature[dugum]
+            x = X[sutun, ozellik]
+            sola = x <= self.threshold[dugum]
+            if eksik_var:
+                sola |= np.isnan(x) & self.missing_left[dugum]
+            dugum = np.where(sola, self.left[dugum], self.right[dugum])
+        return dugum
+
+    def _topla(self, X):
+        # sklearn ile aynı: float32 girdi, ağaç sırasıyla toplama, sonra bölme
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f'{self.n_features_in_} özellikli girdi bekleniyor, gelen: {X.shape}')
+        cikti = np.zeros((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        parca = max(1, PARCA_HUCRE // max(self.n_estimators, 1))
+        for bas in range(0, X.shape[0], parca):
+            yapraklar = self._yapraklar(X[bas:bas + parca])
+            toplam = cikti[bas:bas + parca]
+            for agac_yapraklari in yapraklar:
+                toplam += self.value[agac_yapraklari]
+        cikti /= self.n_estimators
+        return cikti
+
+    def predict_proba(self, X):
+        if self.meta['type'] != 'classifier':
+            raise AttributeError('predict_proba yalnızca sınıflandırıcı için tanımlı')
+        return self._topla(X)
+
+    def predict(self, X):
+        sonuc = self._topla(X)
+        if self.meta['type'] == 'classifier':
+            return self.classes_.take(np.argmax(sonuc, axis=1), axis=0)
+        return sonuc[:, 0]
+
+
+def load_forest(path, mmap=True):
+    """Manifest dosyasından ormanı yükler; mmap=True iken diziler kopyalanmaz"""
+    meta = read_json(path)
+    if meta is None:
+        raise FileNotFoundError(f'"{path}" bulunamadı')
+    dizin = os.path.join(os.path.dirname(path), meta['dir'])
+    diziler = {
+        ad: np.load(os.path.join(dizin, f'{ad}.npy'), mmap_mode='r' if mmap else None)
+        for ad in ('feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots')
+    }
+    return CompactForest(meta, diziler)
+
+
+class CompactEncoder:
+    """
+    LabelEncoder'ın API'de kullanılan kısmı (classes_ ve transform). Sınıf
+    listesi JSON'dan okunur; yüklemek için sklearn içe aktarılmaz.
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self._kodlar = {k: i for i, k in enumerate(classes)}
+
+    def transform(self, degerler):
+        bilinmeyen = [d for d in degerler if d not in self._kodlar]
+        if bilinmeyen:
+            raise ValueError(f'bilinmeyen etiketler: {sorted(set(bilinmeyen))}')
+        return np.fromiter((self._kodlar[d] for d in degerler), dtype=np.int64, count=len(degerler))
+
+
+def export_encoder(encoder, name=ENCODER):
+    """LabelEncoder sınıflarını models/compact/<name>.json dosyasına yazar"""
+    os.makedirs(compact_root, exist_ok=True)
+    atomic_write_json(manifest_path(name), {'type': 'label_encoder',
+                                            'classes': [str(k) for k in encoder.classes_]})
+    return manifest_path(name)
+
+
+def load_encoder(path):
+    meta = read_json(path)
+    if meta is None:
+        raise FileNotFoundError(f'"{path}" bulunamadı')
+    return CompactEncoder(meta['classes'])
+
+
+def _pickle_yukle(name):
+    with open(os.path.join(model_dir, f'{name}.pkl'), 'rb') as file:
+        return pickle.load(file)
+
+
+def _katalog_ozellikleri():
+    """Doğrulama için etiketli katalogdaki tüm satırların özellik matrisi"""
+    import pandas as pd
+    from feature_store import compute_features
+    from registry import load_catalog
+
+    df = load_catalog(os.path.join(project_root, 'YapayZekaSon1', 'data', 'updated_earthquakes.csv'))
+    df = df.sort_values('Tarih_Saat', kind='mergesort')
+    encoder = _pickle_yukle('label_encoder')
+    bilinen = df['Konum'].isin(encoder.classes_)
+    df = df[bilinen]
+    ozellikler, _, _ = compute_features(df)
+    X = pd.concat([pd.Series(encoder.transform(df['Konum']), index=df.index, name='Konum_Encoded'),
+                   ozellikler], axis=1)
+    return X.fillna(0).to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Modelleri düz dizi formatına aktarır ve doğrular')
+    alt = parser.add_subparsers(dest='komut', required=True)
+    alt.add_parser('export', help='models/*.pkl dosyalarını models/compact altına aktar')
+    alt.add_parser('verify', help='Aktarılan modellerin tahminlerini pickle modellerle karşılaştır')
+    args = parser.parse_args()
+
+    if args.komut == 'export':
+        for name in MODELLER:
+            model = _pickle_yukle(name)
+            export_forest(model, name)
+            meta = read_json(manifest_path(name))
+            print(f"{name}: {meta['n_trees']} ağaç, {meta['n_nodes']} düğüm aktarıldı.")
+        encoder = _pickle_yukle(ENCODER)
+        export_encoder(encoder)
+        print(f"{ENCODER}: {len(encoder.classes_)} konum aktarıldı.")
+        return
+
+    X = _katalog_ozellikleri()
+    for name in MODELLER:
+        t0 = time.perf_counter()
+        model = _pickle_yukle(name)
+        pickle_sure = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        kompakt = load_forest(manifest_path(name))
+        kompakt_sure = time.perf_counter() - t0
+
+        beklenen = model.predict(X)
+        sonuc = kompakt.predict(X)
+        ayni = np.array_equal(beklenen, sonuc)
+        if hasattr(model, 'predict_proba'):
+            ayni = ayni and np.array_equal(model.predict_proba(X), kompakt.predict_proba(X))
+        print(f"{name}: {len(X)} satır, tahminler {'aynı' if ayni else 'FARKLI'}; "
+              f"yükleme pickle {pickle_sure * 1000:.1f} ms, kompakt {kompakt_sure * 1000:.1f} ms")
+
+    if exists(ENCODER):
+        encoder = _pickle_yukle(ENCODER)
+        kompakt = load_encoder(manifest_path(ENCODER))
+        ayni = list(encoder.classes_) == list(kompakt.classes_) and \
+            np.array_equal(encoder.transform(encoder.classes_), kompakt.transform(list(encoder.classes_)))
+        print(f"{ENCODER}: {len(encoder.classes_)} konum, kodlar {'aynı' if ayni else 'FARKLI'}")
+
+
+if __name__ == "__main__":
+    main()
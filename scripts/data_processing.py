@@ -1,78 +1,335 @@
 import pandas as pd
-import json
-from math import sqrt
+import argparse
 import os
+import tempfile
+
+from atomic_io import (atomic_write_bytes, atomic_write_json, read_json, append_bytes,
+                       rollback_append, atomic_truncate)
+import columnar_store
+import earthquake_store
+import geo_labeling
 
 # Dosya yollarını düzgün şekilde oluştur
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 
-# İl sınırlarını yükle
-json_path = os.path.join(project_root, 'YapayZekaSon1', 'data', 'turkiye_il_koordinatlari.json')
-with open(json_path, 'r', encoding='utf-8') as f:
-    il_sinirlar = json.load(f)
+input_csv_path = os.path.join(project_root, 'YapayZekaSon1', 'data', 'earthquakes.csv')
+output_csv_path = os.path.join(project_root, 'YapayZekaSon1', 'data', 'updated_earthquakes.csv')
+state_path = os.path.join(project_root, 'YapayZekaSon1', 'data', 'processing_state.json')
+
+TARIH_FORMATI = '%Y-%m-%d %H:%M:%S'
+# Akış modunda ham satır, etiketleme ve CSV metni için satır başına
+# yaklaşık bellek maliyeti (bayt)
+SATIR_BASI_BAYT = 1024
+# Çıktının sondan geriye taranmasında okunan parça boyutu (bayt)
+TARAMA_PARCASI = 1 << 20
 
-def mesafe_hesapla(lat1, lon1, lat2, lon2):
+def etiketle(df, workers=1, parca=200_000):
     """
-    İki koordinat arasındaki yaklaşık mesafeyi hesaplar
+    Ham deprem satırlarını il ile etiketleyip çıktı formatına çevirir,
+    zamana göre artan sırada döndürür. İller geo_labeling ile (haversine
+    uzaklığı ve varsa il poligonları) bulunur; workers > 1 ise parçalar
+    süreç havuzunda etiketlenir.
     """
-    return sqrt((lat1 - lat2)**2 + (lon1 - lon2)**2)
+    new_df = pd.DataFrame()
+    new_df['Tarih_Saat'] = pd.to_datetime(df['Tarih']).to_numpy()
+    new_df['Konum'] = geo_labeling.etiketle(df['Enlem'].to_numpy(), df['Boylam'].to_numpy(), workers, parca)
+    new_df['Buyukluk'] = df['Buyukluk'].to_numpy()
+    return new_df.sort_values('Tarih_Saat', kind='mergesort').reset_index(drop=True)
 
-def koordinat_ile_sehir_bul(lat, lon):
+def _filigran(df):
     """
-    Verilen koordinatların hangi ile ait olduğunu bulur
-    En yakın il merkezi ve sınır kontrolü ile belirlenir
+    İşlenen son olay anahtarı: en son Tarih ve o andaki (Enlem, Boylam) çiftleri
     """
-    olasi_iller = []
-    
-    for il, sinirlar in il_sinirlar.items():
-        if (sinirlar['lat_min'] - 1.4 <= lat <= sinirlar['lat_max'] + 1.4 and 
-            sinirlar['lon_min'] - 1.4 <= lon <= sinirlar['lon_max'] + 1.4):
-            merkez_lat = (sinirlar['lat_min'] + sinirlar['lat_max']) / 2
-            merkez_lon = (sinirlar['lon_min'] + sinirlar['lon_max']) / 2
-            mesafe = mesafe_hesapla(lat, lon, merkez_lat, merkez_lon)
-            olasi_iller.append((il, mesafe))
-    
-    if not olasi_iller:
-        return 'BELIRSIZ'
-    
-    en_yakin_il = min(olasi_iller, key=lambda x: x[1])
-    return en_yakin_il[0]
+    tarih = pd.to_datetime(df['Tarih'])
+    son = tarih.max()
+    ayni_an = df[tarih == son]
+    return {
+        'Tarih': son.strftime(TARIH_FORMATI),
+        'konumlar': ayni_an[['Enlem', 'Boylam']].values.tolist(),
+    }
 
-# Veriyi işle
-input_csv_path = os.path.join(project_root, 'YapayZekaSon1', 'data', 'earthquakes.csv')
-df = pd.read_csv(input_csv_path)
-df['Il'] = df.apply(lambda row: koordinat_ile_sehir_bul(row['Enlem'], row['Boylam']), axis=1)
+def _durumu_kaydet(df, output_size, rows, kaynak_surumu=None):
+    """kaynak_surumu: çıktının yansıttığı earthquake_store sürümü"""
+    durum = {
+        'watermark': _filigran(df),
+        'output_size': output_size,
+        'rows': rows,
+        'kaynak_surumu': kaynak_surumu,
+    }
+    atomic_write_json(state_path, durum)
+    return durum
 
-# Tarih sütununu datetime formatına çevir
-df['Tarih_Saat'] = pd.to_datetime(df['Tarih'])
+def tam_isle(workers=1, parca=200_000):
+    """Tüm kataloğu baştan etiketler ve çıktı dosyasını atomik olarak yeniden yazar"""
+    # Okuma, çekicinin kuyruk yeniden yazımıyla çakışmasın diye katalog kilidi altında
+    with earthquake_store.kilit():
+        kaynak_surumu = earthquake_store.changes_since(0)[0]
+        df = pd.read_csv(input_csv_path)
+    new_df = etiketle(df, workers, parca)
 
-# Yeni DataFrame oluştur
-new_df = pd.DataFrame()
-new_df['Tarih_Saat'] = df['Tarih_Saat']
-new_df['Konum'] = df['Il']
-new_df['Buyukluk'] = df['Buyukluk']
+    # Eğer dosya zaten varsa, mevcut veri sayısını al
+    existing_count = 0
+    if os.path.exists(output_csv_path):
+        existing_df = pd.read_csv(output_csv_path)
+        existing_count = len(existing_df)
 
-# Sonuçları kaydet
-output_csv_path = os.path.join(project_root, 'YapayZekaSon1', 'data', 'updated_earthquakes.csv')
-os.makedirs(os.path.dirname(output_csv_path), exist_ok=True)
+    # Yeni verileri kaydet; sütunlu katalog yeniden yazılana kadar geçersiz sayılır
+    columnar_store.mark_source('updated_earthquakes', None)
+    veri = new_df.to_csv(index=False, date_format=TARIH_FORMATI).encode('utf-8')
+    atomic_write_bytes(output_csv_path, veri)
+    _durumu_kaydet(df, len(veri), len(new_df), kaynak_surumu)
 
-# Eğer dosya zaten varsa, mevcut veri sayısını al
-existing_count = 0
-if os.path.exists(output_csv_path):
-    existing_df = pd.read_csv(output_csv_path)
-    existing_count = len(existing_df)
+    # Sütunlu katalog kullanılıyorsa CSV ile eşit tutulur
+    if columnar_store.exists('updated_earthquakes'):
+        columnar_store.write_catalog('updated_earthquakes', new_df, source_size=len(veri))
 
-# Yeni verileri kaydet
-new_df.to_csv(output_csv_path, index=False, encoding='utf-8')
+    # Yeni ve eski veri sayılarını karşılaştır
+    new_count = len(new_df)
+    if existing_count > 0:
+        added_records = new_count - existing_count
+        print(f"İşlem tamamlandı:")
+        print(f"Önceki veri sayısı: {existing_count}")
+        print(f"Yeni veri sayısı: {new_count}")
+        print(f"Eklenen yeni veri sayısı: {added_records}")
+    else:
+        print(f"İşlem tamamlandı. Toplam {new_count} veri eklendi.")
 
-# Yeni ve eski veri sayılarını karşılaştır
-new_count = len(new_df)
-if existing_count > 0:
-    added_records = new_count - existing_count
-    print(f"İşlem tamamlandı:")
+def akis_isle(bellek_mb, workers=1, parca=200_000):
+    """
+    tam_isle'nin akış modu: earthquakes.csv bellek sınırına sığan parçalarla
+    okunup etiketlenir ve geçici dosyaya eklenir, sonunda atomik olarak
+    yerine taşınır. Etiketleme satır bazında olduğundan çıktı tam_isle ile
+    aynıdır; bunun için girdi zamana göre artan sırada olmalıdır
+    (earthquake_store bu sırayı korur).
+    """
+    parca_satir = max(int(bellek_mb * 1024 * 1024) // SATIR_BASI_BAYT, 1000)
+    durum = read_json(state_path)
+    existing_count = durum['rows'] if durum else 0
+
+    fd, gecici = tempfile.mkstemp(dir=os.path.dirname(output_csv_path),
+                                  prefix='.' + os.path.basename(output_csv_path) + '.')
+    new_count = 0
+    son = None
+    kuyruk = None  # filigran için en son andaki ham satırlar
+    try:
+        # Akış boyunca katalog kilitli tutulur; okunan parçalar arasında kuyruk değişmez
+        with os.fdopen(fd, 'wb') as f, earthquake_store.kilit():
+            kaynak_surumu = earthquake_store.changes_since(0)[0]
+            for df in pd.read_csv(input_csv_path, chunksize=parca_satir):
+                tarih = pd.to_datetime(df['Tarih'])
+                if (son is not None and tarih.iloc[0] < son) or not tarih.is_monotonic_increasing:
+                    raise RuntimeError("earthquakes.csv zamana göre artan sırada değil; "
+                                       "akış modu olmadan --full ile işleyin")
+                son = tarih.iloc[-1]
+
+                new_df = etiketle(df, workers, parca)
+                f.write(new_df.to_csv(index=False, header=new_count == 0,
+                                      date_format=TARIH_FORMATI).encode('utf-8'))
+                new_count += len(new_df)
+
+                kuyruk = pd.concat([kuyruk, df[['Tarih', 'Enlem', 'Boylam']]]) \
+                    if kuyruk is not None else df[['Tarih', 'Enlem', 'Boylam']]
+                kuyruk = kuyruk[pd.to_datetime(kuyruk['Tarih']) == son]
+            if new_count == 0:
+                f.write(b'Tarih_Saat,Konum,Buyukluk\n')
+            f.flush()
+            os.fsync(f.fileno())
+            output_size = f.tell()
+        columnar_store.mark_source('updated_earthquakes', None)
+        os.replace(gecici, output_csv_path)
+    except BaseException:
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        raise
+    if kuyruk is not None:
+        _durumu_kaydet(kuyruk, output_size, new_count, kaynak_surumu)
+
+    # Sütunlu katalog yeni çıktıdan yine parça parça kurulur
+    if columnar_store.exists('updated_earthquakes'):
+        for i, df in enumerate(pd.read_csv(output_csv_path, chunksize=parca_satir)):
+            df['Tarih_Saat'] = pd.to_datetime(df['Tarih_Saat'], format=TARIH_FORMATI)
+            if i == 0:
+                columnar_store.write_catalog('updated_earthquakes', df)
+            else:
+                columnar_store.append_catalog('updated_earthquakes', df)
+        columnar_store.mark_source('updated_earthquakes', output_size)
+
+    print(f"İşlem tamamlandı ({parca_satir} satırlık parçalar):")
     print(f"Önceki veri sayısı: {existing_count}")
     print(f"Yeni veri sayısı: {new_count}")
-    print(f"Eklenen yeni veri sayısı: {added_records}")
-else:
-    print(f"İşlem tamamlandı. Toplam {new_count} veri eklendi.")
+
+def filigrandan_sonra(df, watermark):
+    """
+    Ham satırlardan (Tarih datetime) filigrandan sonra gelenleri, Tarih
+    metin olarak döndürür
+    """
+    son = pd.Timestamp(watermark['Tarih'])
+    gorulen = {tuple(k) for k in watermark['konumlar']}
+
+    tarih = df['Tarih']
+    ayni_an = (tarih == son) & ~pd.Series(
+        [(lat, lon) in gorulen for lat, lon in zip(df['Enlem'], df['Boylam'])],
+        index=df.index, dtype=bool)
+    df = df[(tarih > son) | ayni_an].reset_index(drop=True)
+    df['Tarih'] = df['Tarih'].dt.strftime(TARIH_FORMATI)
+    return df
+
+def yeni_satirlari_oku(watermark):
+    """
+    earthquakes.csv'den filigrandan sonraki satırları okur. Dosya zamana göre
+    artan sıradadır; anahtar dizinindeki bayt ofsetiyle yalnızca filigrandan
+    sonraki kuyruk okunur.
+    """
+    return filigrandan_sonra(earthquake_store.read_since(pd.Timestamp(watermark['Tarih'])), watermark)
+
+def islem_durumu():
+    """
+    Kayıtlı işlem durumunu okur; yoksa None. Ekleme, durum dosyasındaki boyut
+    kaydıyla günlüklenir: önceki çalışma yarıda kaldıysa dosya önce kayıtlı
+    boyuta geri kırpılır.
+    """
+    durum = read_json(state_path)
+    if durum is None or not os.path.exists(output_csv_path):
+        return None
+
+    if os.path.getsize(output_csv_path) < durum['output_size']:
+        raise RuntimeError(
+            "updated_earthquakes.csv işlem durumuyla uyuşmuyor; --full ile tam işleme yapın")
+    if rollback_append(output_csv_path, durum['output_size']):
+        print("Yarıda kalan önceki ekleme geri alındı.")
+    return durum
+
+def _kesim_noktasi(baslangic, durum):
+    """
+    Çıktıda baslangic anından (dahil) sonraki ilk satırın bayt ofseti ve
+    ondan önceki satır sayısı. Çıktı zamana göre artan sırada olduğundan
+    dosya sondan geriye doğru parça parça taranır; yalnızca kuyruk okunur.
+    """
+    hedef = baslangic.strftime(TARIH_FORMATI).encode('utf-8')
+    ofset, satir = durum['output_size'], durum['rows']
+    with open(output_csv_path, 'rb') as f:
+        baslik_sonu = len(f.readline())
+        son, artik = ofset, b''
+        while son > baslik_sonu:
+            bas = max(baslik_sonu, son - TARAMA_PARCASI)
+            f.seek(bas)
+            satirlar = (f.read(son - bas) + artik).split(b'\n')[:-1]
+            # Parçanın başındaki yarım satır bir sonraki parçaya taşınır
+            artik = satirlar.pop(0) + b'\n' if bas > baslik_sonu and satirlar else b''
+            for satir_metni in reversed(satirlar):
+                if satir_metni[:len(hedef)] < hedef:
+                    return ofset, satir
+                ofset -= len(satir_metni) + 1
+                satir -= 1
+            son = bas
+    return baslik_sonu, 0
+
+def geri_degisiklikleri_isle(durum):
+    """
+    Ham katalogda işlenen son sürümden beri filigrandan geride kalan
+    değişiklikler (geç gelen olaylar, REVIZE ile değişen büyüklük/yer)
+    varsa çıktıyı en eski değişen andan itibaren kırpar ve filigranı o
+    ana geri alır; sonraki delta okuması değişen kuyruğu yeniden etiketler.
+    Durum kırpmadan önce kaydedilir, yarıda kalan kırpma islem_durumu'nda
+    tamamlanır. Kırpılan dosya yeni bir inode olarak yazılır; API kuyruğu
+    değişen dosyayı eklemeyle karıştırmadan yeniden yükler. (durum, ham katalog sürümü, kırpıldı mı) döndürür.
+    earthquake_store.kilit() altında, delta okumasıyla birlikte çağrılmalıdır.
+    """
+    kaynak_surumu = durum.get('kaynak_surumu')
+    surum, baslangic = earthquake_store.changes_since(kaynak_surumu or 0)
+    if (kaynak_surumu is None or baslangic is None or
+            baslangic > pd.Timestamp(durum['watermark']['Tarih'])):
+        return durum, surum, False
+
+    ofset, satir = _kesim_noktasi(baslangic, durum)
+    columnar_store.mark_source('updated_earthquakes', None)
+    durum = {
+        # baslangic'tan bir saniye önce: sonraki okuma baslangic anını da kapsar
+        'watermark': {'Tarih': (baslangic - pd.Timedelta(seconds=1)).strftime(TARIH_FORMATI),
+                      'konumlar': []},
+        'output_size': ofset,
+        'rows': satir,
+        'kaynak_surumu': surum,
+    }
+    atomic_write_json(state_path, durum)
+    atomic_truncate(output_csv_path, ofset)
+    if columnar_store.exists('updated_earthquakes'):
+        columnar_store.replace_tail('updated_earthquakes', baslangic, pd.DataFrame(), source_size=ofset)
+    print(f"Ham katalog {baslangic} anından itibaren değişti; çıktı bu andan yeniden işleniyor.")
+    return durum, surum, True
+
+def delta_ekle(delta, durum, kaynak_surumu=None):
+    """
+    Filigrandan sonraki ham satırları etiketleyip çıktının sonuna ekler.
+    (etiketli satırlar, eklenen CSV baytları, yeni durum) döndürür; ekleme
+    eski durumdaki output_size baytından başlar. Sütunlu katalog CSV'den
+    sonra güncellenir; önceki bir güncelleme yarıda kaldıysa eksik satırlar
+    CSV'den tamamlanır.
+    """
+    onceki_boyut = durum['output_size']
+    new_df = etiketle(delta)
+    veri = new_df.to_csv(index=False, header=False, date_format=TARIH_FORMATI).encode('utf-8')
+    output_size = append_bytes(output_csv_path, veri)
+
+    # Filigran yeni satırlar ile eski filigranın birleşiminden hesaplanır
+    eski = pd.DataFrame(
+        [[durum['watermark']['Tarih'], lat, lon] for lat, lon in durum['watermark']['konumlar']],
+        columns=['Tarih', 'Enlem', 'Boylam'])
+    if kaynak_surumu is None:
+        kaynak_surumu = durum.get('kaynak_surumu')
+    durum = _durumu_kaydet(pd.concat([eski, delta[['Tarih', 'Enlem', 'Boylam']]], ignore_index=True),
+                           output_size, durum['rows'] + len(new_df), kaynak_surumu)
+
+    if columnar_store.exists('updated_earthquakes'):
+        if columnar_store.source_size('updated_earthquakes') == onceki_boyut:
+            columnar_store.append_catalog('updated_earthquakes', new_df, source_size=output_size)
+        else:
+            columnar_store.sync_with_csv('updated_earthquakes', output_csv_path, output_size)
+    return new_df, veri, durum
+
+def artimli_isle():
+    """
+    Sadece filigrandan sonra gelen satırları etiketleyip çıktının sonuna
+    ekler; filigrandan geride kalan değişiklikler varsa çıktı önce o ana
+    kırpılır (bkz. geri_degisiklikleri_isle)
+    """
+    durum = islem_durumu()
+    if durum is None:
+        print("İşlem durumu bulunamadı, tam işleme yapılıyor.")
+        tam_isle()
+        return
+
+    with earthquake_store.kilit():
+        durum, kaynak_surumu, _ = geri_degisiklikleri_isle(durum)
+        delta = yeni_satirlari_oku(durum['watermark'])
+    if len(delta) == 0:
+        print("İşlem tamamlandı. Yeni veri yok.")
+        return
+
+    new_df, _, _ = delta_ekle(delta, durum, kaynak_surumu)
+
+    print(f"İşlem tamamlandı:")
+    print(f"Önceki veri sayısı: {durum['rows']}")
+    print(f"Yeni veri sayısı: {durum['rows'] + len(new_df)}")
+    print(f"Eklenen yeni veri sayısı: {len(new_df)}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Deprem verilerini il bilgisiyle etiketler')
+    parser.add_argument('--full', action='store_true',
+                        help='Tüm kataloğu baştan işle (varsayılan: sadece yeni satırlar)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='--full ile etiketlemede kullanılacak süreç sayısı')
+    parser.add_argument('--bellek-siniri', type=int, default=None,
+                        help='--full ile kataloğu bu bellek sınırına (MB) sığan parçalarla işle')
+    args = parser.parse_args()
+
+    if args.full and args.bellek_siniri:
+        akis_isle(args.bellek_siniri, workers=max(args.workers, 1))
+    elif args.full:
+        tam_isle(workers=max(args.workers, 1))
+    else:
+        artimli_isle()
+
+if __name__ == "__main__":
+    main()
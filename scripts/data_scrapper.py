@@ -1,91 +1,202 @@
-import requests
-import pandas as pd
-from datetime import datetime, timedelta
+import argparse
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def get_kandilli_data():
-    # Kandilli Rasathanesi API URL'i
-    url = "http://www.koeri.boun.edu.tr/scripts/lst0.asp"
-    
-    try:
-        # Verileri çek
-        response = requests.get(url)
-        response.encoding = 'utf-8'  # Türkçe karakterler için encoding ayarı
-        
-        # Ham veriyi satırlara böl
-        lines = response.text.split("\n")
-        
-        # Veri başlangıç indeksini bul (veriler genelde 6. satırdan başlar)
-        start_index = 6
-        data = []
-        
-        # Her bir satırı işle
-        for line in lines[start_index:]:
-            if line.strip() and len(line) > 120:  # Boş olmayan ve yeterli uzunlukta satırları al
-                try:
-                    # Satırı parçalara ayır
-                    parts = line.split()
-                    
-                    # Tarih ve saat bilgisini birleştir
-                    date_str = f"{parts[0]} {parts[1]}"
-                    date = datetime.strptime(date_str, "%Y.%m.%d %H:%M:%S")
-                    
-                    # Veri sözlüğü oluştur
-                    earthquake = {
-                        'Tarih': date,
-                        'Enlem': float(parts[2]),
-                        'Boylam': float(parts[3]),
-                        'Derinlik': float(parts[4]),
-                        'Buyukluk': float(parts[6]),
-                        'Yer': ' '.join(parts[8:]).strip()
-                    }
-                    
-                    data.append(earthquake)
-                except:
-                    continue
-        
-        # Yeni verileri DataFrame'e dönüştür
-        new_df = pd.DataFrame(data)
-        
-        # CSV dosyası varsa oku, yoksa boş DataFrame oluştur
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(current_dir))
-        csv_path = os.path.join(project_root, 'YapayZekaSon1', 'data', 'earthquakes.csv')
-        
-        # Dizinin var olduğundan emin ol
-        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-        
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import columnar_store
+import earthquake_store
+from atomic_io import atomic_write_json, read_json
+
+# Kandilli Rasathanesi son depremler listesi; KANDILLI_URL ortam değişkeni
+# ile (ör. kayıtlı sayfaları sunan yerel bir sunucuya) yönlendirilebilir
+KANDILLI_URL = os.environ.get('KANDILLI_URL', "http://www.koeri.boun.edu.tr/scripts/lst0.asp")
+
+# Dosya yollarını düzgün şekilde oluştur
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+data_dir = os.path.join(project_root, 'YapayZekaSon1', 'data')
+state_path = os.path.join(data_dir, 'scraper_state.json')
+
+# Bağlantı ve okuma zaman aşımı (saniye)
+ZAMAN_ASIMI = (5, 30)
+# Veriler genelde 6. satırdan başlar; daha kısa satırlar başlık/boşluktur
+BASLANGIC_SATIRI = 6
+MIN_SATIR_UZUNLUGU = 120
+KODLAMA = 'utf-8'  # Türkçe karakterler için encoding ayarı
+
+
+def create_session(pool_size=8, retries=3, backoff=0.5):
+    """
+    Bağlantı havuzlu oturum. Bağlantı hataları ve 429/5xx cevapları üstel
+    bekleme ile yeniden denenir.
+    """
+    retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=backoff,
+                  status_forcelist=[429, 500, 502, 503, 504], allowed_methods=['GET', 'HEAD'],
+                  respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_page(session, url, onceki=None):
+    """
+    Sayfayı koşullu olarak indirir. onceki kayıttaki ETag/Last-Modified
+    başlıkları gönderilir; 304 gelirse ya da içerik özeti aynıysa sayfa
+    değişmemiş sayılır. (içerik ya da None, yeni kayıt) döndürür.
+    """
+    onceki = onceki or {}
+    basliklar = {}
+    if onceki.get('etag'):
+        basliklar['If-None-Match'] = onceki['etag']
+    if onceki.get('last_modified'):
+        basliklar['If-Modified-Since'] = onceki['last_modified']
+
+    response = session.get(url, headers=basliklar, timeout=ZAMAN_ASIMI)
+    if response.status_code == 304:
+        return None, onceki
+    response.raise_for_status()
+
+    icerik = response.content
+    kayit = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'sha1': hashlib.sha1(icerik).hexdigest(),
+    }
+    if kayit['sha1'] == onceki.get('sha1'):
+        return None, kayit
+    return icerik, kayit
+
+
+def parse_kandilli(text):
+    """
+    lst0.asp listesini vektörel olarak ayrıştırır. Tarih ve saat satırın ilk
+    19 karakterinde sabit genişliktedir; kalan alanlar boşlukla ayrılır.
+    Ayrıştırılamayan satırlar atlanır.
+    """
+    lines = pd.Series(text.split("\n")[BASLANGIC_SATIRI:], dtype=object)
+    lines = lines[(lines.str.len() > MIN_SATIR_UZUNLUGU) & (lines.str.strip() != '')].str.lstrip()
+    if lines.empty:
+        return pd.DataFrame(columns=['Tarih', 'Enlem', 'Boylam', 'Derinlik', 'Buyukluk', 'Yer'])
+
+    tarih = pd.to_datetime(lines.str[:19], format='%Y.%m.%d %H:%M:%S', errors='coerce')
+    # Enlem, Boylam, Derinlik, MD, ML, Mw ve geri kalanı (yer + çözüm tipi)
+    alanlar = lines.str[19:].str.split(n=6, expand=True).reindex(columns=range(7))
+
+    new_df = pd.DataFrame({
+        'Tarih': tarih,
+        'Enlem': pd.to_numeric(alanlar[0], errors='coerce'),
+        'Boylam': pd.to_numeric(alanlar[1], errors='coerce'),
+        'Derinlik': pd.to_numeric(alanlar[2], errors='coerce'),
+        'Buyukluk': pd.to_numeric(alanlar[4], errors='coerce'),
+        'Yer': alanlar[6].fillna('').str.split().str.join(' '),
+    })
+    gecerli = new_df[['Tarih', 'Enlem', 'Boylam', 'Derinlik', 'Buyukluk']].notna().all(axis=1)
+    return new_df[gecerli].reset_index(drop=True)
+
+
+def merge_catalog(new_df):
+    """
+    Yeni kayıtları earthquakes.csv ile birleştirir. Tekrarlar (Tarih, Enlem,
+    Boylam) anahtar dizininden ayıklanır; dosyanın yalnızca yeni kayıtların
+    düştüğü kuyruğu yeniden yazılır. Değişen kuyruğu döndürür (yoksa None).
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    with earthquake_store.kilit():
+        baslangic, kuyruk, istatistik = earthquake_store.merge(new_df)
+        print(f"Yeni kayıt: {istatistik['eklenen']}, güncellenen: {istatistik['guncellenen']}, "
+              f"zaten var: {istatistik['ayni']}")
+        if columnar_store.exists('earthquakes'):
+            if kuyruk is not None and columnar_store.source_size('earthquakes') == istatistik['onceki_boyut']:
+                columnar_store.replace_tail('earthquakes', baslangic, kuyruk, source_size=istatistik['boyut'])
+            else:
+                # Önceki bir güncelleme yarıda kaldıysa katalog CSV'den eşitlenir
+                columnar_store.sync_with_csv('earthquakes', earthquake_store.csv_path, istatistik['boyut'])
+    return kuyruk
+
+
+def fetch_all(urls, session=None, max_workers=4, durum=None):
+    """
+    Kaynakları aynı oturum üzerinden eşzamanlı indirir. Değişen sayfaların
+    içeriklerini, güncellenmiş durum kayıtlarını ve hata alan kaynakları
+    (url -> hata) döndürür; hata alan kaynaklar raporlanır ve atlanır.
+    """
+    session = session or create_session(pool_size=max(max_workers, 1))
+    durum = durum if durum is not None else {}
+
+    def indir(url):
         try:
-            if os.path.exists(csv_path):
-                existing_df = pd.read_csv(csv_path)
-                # Tarih sütununu datetime formatına çevir
-                existing_df['Tarih'] = pd.to_datetime(existing_df['Tarih'])
-                new_df['Tarih'] = pd.to_datetime(new_df['Tarih'])
-                
-                # Mevcut ve yeni verileri birleştir
-                combined_df = pd.concat([new_df, existing_df], ignore_index=True)
-                
-                # Tekrarlanan kayıtları kaldır (Tarih, Enlem, Boylam'a göre)
-                combined_df = combined_df.drop_duplicates(subset=['Tarih', 'Enlem', 'Boylam'], keep='first')
-                
-                # Tarihe göre sırala (en yeni en üstte)
-                combined_df = combined_df.sort_values('Tarih', ascending=False)
+            return url, fetch_page(session, url, durum.get(url)), None
+        except requests.RequestException as e:
+            return url, (None, durum.get(url)), e
+
+    icerikler = {}
+    hatalar = {}
+    yeni_durum = dict(durum)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as havuz:
+        for url, (icerik, kayit), hata in havuz.map(indir, urls):
+            if hata is not None:
+                print(f"Hata oluştu ({url}): {str(hata)}")
+                hatalar[url] = hata
+                continue
+            if icerik is None:
+                print(f"Değişiklik yok: {url}")
             else:
-                combined_df = new_df
-                combined_df = combined_df.sort_values('Tarih', ascending=False)
-
-            # CSV dosyasına kaydet
-            combined_df.to_csv(csv_path, index=False)
-            print(f"Veriler başarıyla 'earthquakes.csv' dosyasına eklendi.")
-            return combined_df
-            
-        except Exception as e:
-            print(f"Hata oluştu: {str(e)}")
-            return None
-        
+                icerikler[url] = icerik
+            if kayit:
+                yeni_durum[url] = kayit
+    return icerikler, yeni_durum, hatalar
+
+
+def get_kandilli_data(urls=None, max_workers=4, session=None):
+    """
+    Kaynakları indirip yeni depremleri earthquakes.csv'ye ekler. Kataloğun
+    değişen kuyruğunu döndürür; değişiklik yoksa ya da hata olursa None.
+
+    session verilirse (ör. veri alma servisi) hatalar yutulmaz, çağırana
+    iletilir: indirilemeyen kaynak varsa diğer kaynaklar yine birleştirilir,
+    ardından ilk indirme hatası yükseltilir.
+    """
+    urls = urls or [KANDILLI_URL]
+    durum = read_json(state_path, {})
+    kuyruk = None
+    try:
+        icerikler, yeni_durum, hatalar = fetch_all(urls, session, max_workers, durum)
+        if icerikler:
+            parcalar = [parse_kandilli(icerik.decode(KODLAMA, errors='replace'))
+                        for icerik in icerikler.values()]
+            new_df = pd.concat(parcalar, ignore_index=True)
+            kuyruk = merge_catalog(new_df)
     except Exception as e:
+        if session is not None:
+            raise
         print(f"Hata oluştu: {str(e)}")
         return None
 
+    # Sayfa durumları ancak veriler kaydedildikten sonra güncellenir
+    if icerikler:
+        atomic_write_json(state_path, yeni_durum)
+    if kuyruk is not None:
+        print(f"Veriler başarıyla 'earthquakes.csv' dosyasına eklendi.")
+    if hatalar and session is not None:
+        raise next(iter(hatalar.values()))
+    return kuyruk
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kandilli deprem listesini indirir')
+    parser.add_argument('--url', action='append', dest='urls',
+                        help='İndirilecek sayfa (birden fazla verilebilir, varsayılan: lst0.asp)')
+    parser.add_argument('--workers', type=int, default=4, help='Eşzamanlı indirme sayısı')
+    args = parser.parse_args()
+    get_kandilli_data(args.urls, args.workers)
+
+
 if __name__ == "__main__":
-    get_kandilli_data()
+    main()
@@ -0,0 +1,361 @@
+import io
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from atomic_io import atomic_write_bytes, atomic_write_json, read_json, append_bytes
+
+try:
+    import fcntl
+except ImportError:  # Windows: yalnızca süreç içi kilit kullanılır
+    fcntl = None
+
+# Dosya yollarını düzgün şekilde oluştur
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+data_dir = os.path.join(project_root, 'YapayZekaSon1', 'data')
+csv_path = os.path.join(data_dir, 'earthquakes.csv')
+keys_path = os.path.join(data_dir, 'earthquakes.keys')
+state_path = os.path.join(data_dir, 'earthquakes_state.json')
+journal_path = os.path.join(data_dir, 'earthquakes.journal')
+lock_path = os.path.join(data_dir, 'earthquakes.lock')
+changes_path = os.path.join(data_dir, 'earthquakes.changes')
+
+TARIH_FORMATI = '%Y-%m-%d %H:%M:%S'
+SUTUNLAR = ['Tarih', 'Enlem', 'Boylam', 'Derinlik', 'Buyukluk', 'Yer']
+# Aynı anahtarlı kayıt bu alanlardan biri değiştiyse güncellenmiş sayılır
+DEGER_SUTUNLARI = ['Derinlik', 'Buyukluk', 'Yer']
+
+# CSV'deki her satır için: zaman (saniye), paketlenmiş enlem/boylam ve
+# satırın bittiği bayt ofseti. Kayıtlar CSV ile aynı (zamana göre artan) sıradadır.
+ANAHTAR_TIPI = np.dtype([('t', '<i8'), ('ll', '<i8'), ('end', '<i8')])
+
+# Enlem/boylam 1e-6 derece hassasiyetle tamsayıya çevrilir
+KOORDINAT_OLCEGI = 1_000_000
+
+# Değişiklik kaydı bu satır sayısını aşınca eski satırlar tek satırda toplanır
+DEGISIKLIK_SINIRI = 4096
+DEGISIKLIK_KALAN = 1024
+
+
+def olay_anahtarlari(df):
+    """(Tarih, Enlem, Boylam) üçlüsünü iki int64 anahtara paketler; Tarih datetime olmalı"""
+    t = df['Tarih'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    lat = np.rint(df['Enlem'].to_numpy(dtype=np.float64) * KOORDINAT_OLCEGI).astype(np.int64)
+    lon = np.rint(df['Boylam'].to_numpy(dtype=np.float64) * KOORDINAT_OLCEGI).astype(np.int64)
+    ll = (lat + 90 * KOORDINAT_OLCEGI) * (400 * KOORDINAT_OLCEGI) + (lon + 180 * KOORDINAT_OLCEGI)
+    return t, ll
+
+
+def _csv_baytlari(df, header):
+    df = df[SUTUNLAR].copy()
+    df['Tarih'] = df['Tarih'].dt.strftime(TARIH_FORMATI)
+    return df.to_csv(index=False, header=header, lineterminator='\n').encode('utf-8')
+
+
+def _satir_sonlari(veri, baslangic):
+    """Veri içindeki her satırın bittiği mutlak bayt ofsetleri"""
+    return np.flatnonzero(np.frombuffer(veri, dtype=np.uint8) == ord('\n')) + 1 + baslangic
+
+
+def _anahtar_kayitlari(df, sonlar):
+    t, ll = olay_anahtarlari(df)
+    kayitlar = np.empty(len(df), dtype=ANAHTAR_TIPI)
+    kayitlar['t'], kayitlar['ll'], kayitlar['end'] = t, ll, sonlar
+    return kayitlar
+
+
+_kilit = threading.RLock()
+_kilit_derinligi = 0
+
+
+@contextmanager
+def kilit():
+    """
+    Katalog üzerinde özel kilit. Yazım (merge, rebuild) ve kurtarma (_hazirla)
+    yalnızca bu kilit altında çalışır; böylece başka bir iş parçacığı ya da
+    süreç, sürmekte olan bir yazımı yarıda kalmış sanıp geri almaz. Aynı iş
+    parçacığında iç içe alınabilir; dosya kilidi en dıştaki alımda tutulur.
+    """
+    global _kilit_derinligi
+    with _kilit:
+        if _kilit_derinligi == 0 and fcntl is not None:
+            os.makedirs(data_dir, exist_ok=True)
+            f = open(lock_path, 'a+b')
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f = None
+        _kilit_derinligi += 1
+        try:
+            yield
+        finally:
+            _kilit_derinligi -= 1
+            if f is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                f.close()
+
+
+def exists():
+    return os.path.exists(state_path) and os.path.exists(keys_path)
+
+
+def rebuild():
+    """
+    Anahtar dizinini CSV'den baştan kurar. Eski (en yeni en üstte) dosyalar
+    bu sırada bir kez zamana göre artan sıraya çevrilir.
+    """
+    with kilit():
+        return _yeniden_kur()
+
+
+def _yeniden_kur():
+    if os.path.exists(csv_path):
+        df = pd.read_csv(csv_path)
+        df['Tarih'] = pd.to_datetime(df['Tarih'], format=TARIH_FORMATI)
+        df = df.sort_values('Tarih', kind='mergesort').reset_index(drop=True)
+    else:
+        df = pd.DataFrame({sutun: [] for sutun in SUTUNLAR})
+        df['Tarih'] = pd.to_datetime(df['Tarih'])
+
+    govde = _csv_baytlari(df, header=False)
+    baslik = (','.join(SUTUNLAR) + '\n').encode('utf-8')
+    kayitlar = _anahtar_kayitlari(df, _satir_sonlari(govde, len(baslik)))
+
+    eski = read_json(state_path) or {}
+    if len(df):
+        # Dosya depo dışında değişmiş olabilir; okuyucular için tüm katalog değişmiş sayılır
+        _degisiklik_kaydet(eski.get('version', 0) + 1, df['Tarih'].iloc[0])
+    atomic_write_bytes(csv_path, baslik + govde)
+    atomic_write_bytes(keys_path, kayitlar.tobytes())
+    durum = _durumu_kaydet(eski.get('version', 0) + 1, len(df))
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+    return durum
+
+
+def _durumu_kaydet(version, rows):
+    """
+    Durumu CSV'nin şu anki boyutu ve mtime'ı ile kaydeder; _hazirla bunlarla
+    dosyanın depo dışında değiştirilip değiştirilmediğini anlar
+    """
+    stat = os.stat(csv_path)
+    durum = {'version': version, 'csv_size': stat.st_size, 'csv_mtime': stat.st_mtime_ns, 'rows': rows}
+    atomic_write_json(state_path, durum)
+    return durum
+
+
+def _degisiklik_kaydet(version, zaman):
+    """
+    version sürümünde zaman anından (dahil) sonraki satırların değiştiğini
+    kaydeder. Durumdan önce yazılır: yazım yarıda kalırsa kayıt fazladan
+    kalır, bu yalnızca okuyucunun gereksiz yere yeniden işlemesine yol açar.
+    """
+    append_bytes(changes_path, f"{version},{zaman.strftime(TARIH_FORMATI)}\n".encode('utf-8'))
+    with open(changes_path, 'rb') as f:
+        satirlar = f.read().splitlines()
+    if len(satirlar) > DEGISIKLIK_SINIRI:
+        # Eski satırlar en büyük sürüm ve en eski zamanla tek satıra indirgenir;
+        # bu sürümden geride kalan okuyucu en fazla gereğinden çok yeniden işler
+        eski = [s.decode('utf-8').split(',') for s in satirlar[:-DEGISIKLIK_KALAN]]
+        ozet = f"{max(int(v) for v, _ in eski)},{min(z for _, z in eski)}".encode('utf-8')
+        atomic_write_bytes(changes_path, b'\n'.join([ozet] + satirlar[-DEGISIKLIK_KALAN:]) + b'\n')
+
+
+def changes_since(version):
+    """
+    (güncel sürüm, version'dan sonraki sürümlerde değişen en eski an)
+    döndürür; değişiklik yoksa an None'dır. Okuyucular (data_processing)
+    son işledikleri sürümü saklar; böylece filigranlarından eski geç
+    gelen olaylar ve güncellemeler de fark edilir.
+    """
+    with kilit():
+        durum = read_json(state_path)
+        if durum is None:
+            return None, None
+        en_eski = None
+        if os.path.exists(changes_path):
+            with open(changes_path, encoding='utf-8') as f:
+                for satir in f:
+                    surum, zaman = satir.rstrip('\n').split(',')
+                    if int(surum) > version and (en_eski is None or zaman < en_eski):
+                        en_eski = zaman
+        return durum['version'], pd.Timestamp(en_eski) if en_eski is not None else None
+
+
+def _gunlugu_uygula(durum):
+    """
+    Yarıda kalmış bir kuyruk yeniden yazımını geri alır. Durum dosyası
+    günlükteki sürüme ulaştıysa yazım tamamlanmıştır, günlük silinir.
+    Geri alma yapıldıysa True döner.
+    """
+    with open(journal_path, 'rb') as f:
+        baslik = json.loads(f.readline())
+        csv_kuyrugu = f.read(baslik['csv_tail'])
+        anahtar_kuyrugu = f.read(baslik['keys_tail'])
+
+    geri_alindi = durum is None or durum['version'] < baslik['version']
+    if geri_alindi:
+        for path, ofset, kuyruk in ((csv_path, baslik['csv_offset'], csv_kuyrugu),
+                                    (keys_path, baslik['keys_offset'], anahtar_kuyrugu)):
+            with open(path, 'r+b') as f:
+                f.truncate(ofset)
+            append_bytes(path, kuyruk)
+        print("Yarıda kalan katalog yazımı geri alındı.")
+    os.remove(journal_path)
+    return geri_alindi
+
+
+def _hazirla():
+    """
+    Kataloğu tutarlı duruma getirir ve (durum, anahtarlar) döndürür. Yarıda
+    kalan yazımlar yalnızca günlükle geri alınır. Günlük yoksa dosyalar
+    kırpılmaz: durum ya da anahtar dosyası yoksa veya CSV'nin boyutu ya da
+    mtime'ı durumla uyuşmuyorsa (dosya depo dışında değiştirilmiş ya da
+    yerine başka bir dosya konmuş) anahtar dizini CSV'nin şu anki hâlinden yeniden kurulur.
+    kilit() altında çağrılmalıdır.
+    """
+    durum = read_json(state_path)
+    geri_alindi = False
+    if os.path.exists(journal_path):
+        geri_alindi = _gunlugu_uygula(durum)
+
+    if durum is None or not os.path.exists(keys_path) or not os.path.exists(csv_path):
+        durum = _yeniden_kur()
+    elif (os.path.getsize(csv_path) != durum['csv_size'] or
+            os.path.getsize(keys_path) != durum['rows'] * ANAHTAR_TIPI.itemsize):
+        print("Katalog anahtar dizini CSV ile uyuşmuyor, yeniden kuruluyor.")
+        durum = _yeniden_kur()
+    elif geri_alindi:
+        # Geri alınan baytlar durumla aynı; yalnızca mtime yenilenir
+        durum = _durumu_kaydet(durum['version'], durum['rows'])
+    elif os.stat(csv_path).st_mtime_ns != durum.get('csv_mtime'):
+        print("earthquakes.csv depo dışında değiştirilmiş, anahtar dizini yeniden kuruluyor.")
+        durum = _yeniden_kur()
+    return durum, np.fromfile(keys_path, dtype=ANAHTAR_TIPI, count=durum['rows'])
+
+
+def _baslik_sonu():
+    with open(csv_path, 'rb') as f:
+        return len(f.readline())
+
+
+def _kuyrugu_oku(anahtarlar, konum, csv_size):
+    """konum numaralı satırdan dosya sonuna kadar olan satırları okur"""
+    ofset = int(anahtarlar['end'][konum - 1]) if konum > 0 else _baslik_sonu()
+    with open(csv_path, 'rb') as f:
+        baslik = f.readline()
+        f.seek(ofset)
+        govde = f.read(csv_size - ofset)
+    df = pd.read_csv(io.BytesIO(baslik + govde))
+    df['Tarih'] = pd.to_datetime(df['Tarih'], format=TARIH_FORMATI)
+    return ofset, govde, df
+
+
+def read_since(start):
+    """
+    start anından (dahil) sonraki satırları okur. Anahtar dizinindeki bayt
+    ofsetleri sayesinde dosyanın yalnızca ilgili kuyruğu okunur.
+    """
+    with kilit():
+        durum, anahtarlar = _hazirla()
+        t0 = pd.Timestamp(start).to_datetime64().astype('datetime64[s]').astype(np.int64)
+        konum = int(np.searchsorted(anahtarlar['t'], t0, side='left'))
+        return _kuyrugu_oku(anahtarlar, konum, durum['csv_size'])[2]
+
+
+def merge(new_df):
+    """
+    Yeni kayıtları kataloğa ekler. Yalnızca yeni kayıtların en eski zamanından
+    itibaren olan kuyruk okunur: anahtarı kuyrukta olmayan kayıtlar eklenir,
+    anahtarı olup değerleri değişen kayıtlar güncellenir (yeni değer geçerli),
+    aynıları atlanır. Değişiklik varsa yalnızca bu kuyruk yeniden yazılır;
+    yazım öncesi eski kuyruk günlüğe alınır, böylece yarıda kalan bir çalışma
+    kataloğu bozmaz.
+
+    (değişen kuyruğun başlangıç zamanı, yeni kuyruk, istatistik) döndürür;
+    değişiklik yoksa kuyruk None'dır. İstatistikteki onceki_boyut/boyut,
+    CSV'nin birleştirme öncesi ve sonrası onaylanmış boyutlarıdır. Değişen
+    en eski an ayrıca değişiklik kaydına yazılır (bkz. changes_since).
+    """
+    with kilit():
+        return _birlestir(new_df)
+
+
+def _birlestir(new_df):
+    durum, anahtarlar = _hazirla()
+    new_df = new_df[SUTUNLAR].copy()
+    new_df['Tarih'] = pd.to_datetime(new_df['Tarih'])
+    t, ll = olay_anahtarlari(new_df)
+    # Aynı sayfada tekrarlanan kayıtlardan ilki geçerli
+    tekil = ~pd.DataFrame({'t': t, 'll': ll}).duplicated().to_numpy()
+    new_df, t, ll = new_df[tekil].reset_index(drop=True), t[tekil], ll[tekil]
+    istatistik = {'eklenen': 0, 'guncellenen': 0, 'ayni': 0,
+                  'onceki_boyut': durum['csv_size'], 'boyut': durum['csv_size']}
+    if len(new_df) == 0:
+        return None, None, istatistik
+
+    # Yeni kayıtlardan eski satırlar yeni kayıtlarla çakışamaz
+    t0 = int(t.min())
+    konum = int(np.searchsorted(anahtarlar['t'], t0, side='left'))
+    kuyruk_anahtarlari = anahtarlar[konum:]
+    sira = {(int(a), int(b)): i for i, (a, b) in
+            enumerate(zip(kuyruk_anahtarlari['t'], kuyruk_anahtarlari['ll']))}
+    eslesen = np.array([sira.get((int(a), int(b)), -1) for a, b in zip(t, ll)], dtype=np.int64)
+
+    yeni = new_df[eslesen < 0]
+    istatistik['eklenen'] = len(yeni)
+    guncel = new_df[eslesen >= 0]
+    if len(guncel) == 0 and len(yeni) == 0:
+        return None, None, istatistik
+
+    ofset, eski_govde, kuyruk = _kuyrugu_oku(anahtarlar, konum, durum['csv_size'])
+    if len(guncel):
+        hedef = eslesen[eslesen >= 0]
+        eski_degerler = kuyruk.loc[hedef, DEGER_SUTUNLARI].reset_index(drop=True)
+        yeni_degerler = guncel[DEGER_SUTUNLARI].reset_index(drop=True)
+        farkli = ~((eski_degerler == yeni_degerler) |
+                   (eski_degerler.isna() & yeni_degerler.isna())).all(axis=1).to_numpy()
+        istatistik['guncellenen'] = int(farkli.sum())
+        istatistik['ayni'] = int((~farkli).sum())
+        for sutun in DEGER_SUTUNLARI:
+            kuyruk.loc[hedef[farkli], sutun] = yeni_degerler.loc[farkli, sutun].to_numpy()
+    if istatistik['eklenen'] == 0 and istatistik['guncellenen'] == 0:
+        return None, None, istatistik
+
+    # Eşit zamanlı kayıtlarda mevcut satırlar önce gelir
+    kuyruk = pd.concat([kuyruk, yeni], ignore_index=True).sort_values('Tarih', kind='mergesort')
+    kuyruk = kuyruk.reset_index(drop=True)
+    yeni_govde = _csv_baytlari(kuyruk, header=False)
+    yeni_kayitlar = _anahtar_kayitlari(kuyruk, _satir_sonlari(yeni_govde, ofset))
+
+    anahtar_ofseti = konum * ANAHTAR_TIPI.itemsize
+    eski_anahtarlar = kuyruk_anahtarlari.tobytes()
+    gunluk = {
+        'version': durum['version'] + 1,
+        'csv_offset': ofset, 'csv_tail': len(eski_govde),
+        'keys_offset': anahtar_ofseti, 'keys_tail': len(eski_anahtarlar),
+    }
+    atomic_write_bytes(journal_path, json.dumps(gunluk).encode('utf-8') + b'\n' + eski_govde + eski_anahtarlar)
+
+    # Değişen en eski an: eklenen ya da değerleri güncellenen kayıtların en eskisi
+    degisen = yeni['Tarih']
+    if istatistik['guncellenen']:
+        degisen = pd.concat([degisen, guncel['Tarih'][farkli]])
+    _degisiklik_kaydet(gunluk['version'], degisen.min())
+
+    for path, kesim, veri in ((csv_path, ofset, yeni_govde),
+                              (keys_path, anahtar_ofseti, yeni_kayitlar.tobytes())):
+        with open(path, 'r+b') as f:
+            f.truncate(kesim)
+        boyut = append_bytes(path, veri)
+        if path == csv_path:
+            csv_size = boyut
+
+    _durumu_kaydet(gunluk['version'], konum + len(kuyruk))
+    os.remove(journal_path)
+    istatistik['boyut'] = csv_size
+    return pd.Timestamp(t0, unit='s'), kuyruk, istatistik
@@ -0,0 +1,318 @@
+from collections import deque
+import math
+
+import numpy as np
+import pandas as pd
+
+# Son 30 günlük pencere ve son 30 deprem aralığı
+PENCERE_NS = pd.Timedelta('30D').value
+ARALIK_PENCERESI = 30
+
+SONAY_OZELLIKLERI = [
+    'SonAy_DepremSayisi', 'SonAy_OrtBuyukluk', 'SonAy_MaxBuyukluk',
+    'SonAy_MinBuyukluk', 'SonAy_StdBuyukluk',
+    'SonAy_OrtAralik', 'SonAy_MaxAralik', 'SonAy_MinAralik'
+]
+
+FEATURES = ['Konum_Encoded'] + SONAY_OZELLIKLERI
+
+
+class _KayanOrtalama:
+    """
+    Kompanzasyonlu (Kahan) toplamla ekle/çıkar ortalaması; pandas'ın
+    rolling mean hesabıyla aynı adımları izler
+    """
+
+    def __init__(self):
+        self.sifirla()
+
+    def sifirla(self, ilk=None):
+        self.nobs = 0
+        self.toplam = 0.0
+        self.neg = 0
+        self.komp_ekle = 0.0
+        self.komp_cikar = 0.0
+        self.ayni_sayisi = 0
+        self.onceki = ilk
+
+    def ekle(self, x):
+        if x != x:
+            return
+        self.nobs += 1
+        y = x - self.komp_ekle
+        t = self.toplam + y
+        self.komp_ekle = t - self.toplam - y
+        self.toplam = t
+        if math.copysign(1.0, x) < 0:
+            self.neg += 1
+        if x == self.onceki:
+            self.ayni_sayisi += 1
+        else:
+            self.ayni_sayisi = 1
+        self.onceki = x
+
+    def cikar(self, x):
+        if x != x:
+            return
+        self.nobs -= 1
+        y = -x - self.komp_cikar
+        t = self.toplam + y
+        self.komp_cikar = t - self.toplam - y
+        self.toplam = t
+        if math.copysign(1.0, x) < 0:
+            self.neg -= 1
+
+    def deger(self, min_gozlem=1):
+        if self.nobs < min_gozlem or self.nobs == 0:
+            return math.nan
+        sonuc = self.toplam / self.nobs
+        if self.ayni_sayisi >= self.nobs:
+            sonuc = self.onceki
+        elif self.neg == 0 and sonuc < 0:
+            sonuc = 0.0
+        elif self.neg == self.nobs and sonuc > 0:
+            sonuc = 0.0
+        return sonuc
+
+
+class _KayanVaryans:
+    """Welford yöntemiyle ekle/çıkar varyansı (pandas rolling var ile aynı adımlar)"""
+
+    def __init__(self):
+        self.sifirla()
+
+    def sifirla(self, ilk=None):
+        self.nobs = 0
+        self.ort = 0.0
+        self.ssqdm = 0.0
+        self.komp_ekle = 0.0
+        self.komp_cikar = 0.0
+        self.ayni_sayisi = 0
+        self.onceki = ilk
+
+    def ekle(self, x):
+        if x != x:
+            return
+        if self.nobs and self.ayni_sayisi >= self.nobs:
+            # Penceredeki tüm değerler aynı: birikmiş yuvarlama hatasını at
+            self.ort = self.onceki
+            self.ssqdm = 0.0
+        if x == self.onceki:
+            self.ayni_sayisi += 1
+        else:
+            self.ayni_sayisi = 1
+        self.onceki = x
+        self.nobs += 1
+        onceki_ort = self.ort - self.komp_ekle
+        y = x - self.komp_ekle
+        t = y - self.ort
+        self.komp_ekle = t + self.ort - y
+        self.ort = self.ort + t / self.nobs
+        self.ssqdm += (x - onceki_ort) * (x - self.ort)
+
+    def cikar(self, x):
+        if x != x:
+            return
+        self.nobs -= 1
+        if self.nobs:
+            onceki_ort = self.ort - self.komp_cikar
+            y = x - self.komp_cikar
+            t = y - self.ort
+            self.komp_cikar = t + self.ort - y
+            self.ort = self.ort - t / self.nobs
+            self.ssqdm -= (x - onceki_ort) * (x - self.ort)
+        else:
+            self.ort = 0.0
+            self.ssqdm = 0.0
+
+    def std(self, ddof=1):
+        if self.nobs <= ddof:
+            return math.nan
+        if self.ayni_sayisi >= self.nobs or self.nobs == 1:
+            return 0.0
+        varyans = self.ssqdm / (self.nobs - ddof)
+        return math.sqrt(varyans) if varyans > 0 else 0.0
+
+
+class _MonotonDeque:
+    """Kayan penceredeki en büyük (ya da en küçük) değeri O(1) amortize tutar"""
+
+    def __init__(self, buyuk=True):
+        self.buyuk = buyuk
+        self.q = deque()
+
+    def ekle(self, sira, x):
+        if x != x:
+            return
+        if self.buyuk:
+            while self.q and self.q[-1][1] <= x:
+                self.q.pop()
+        else:
+            while self.q and self.q[-1][1] >= x:
+                self.q.pop()
+        self.q.append((sira, x))
+
+    def temizle(self, ilk_gecerli_sira):
+        while self.q and self.q[0][0] < ilk_gecerli_sira:
+            self.q.popleft()
+
+    def deger(self):
+        return self.q[0][1] if self.q else math.nan
+
+
+class ProvinceState:
+    """
+    Tek bir ilin kayan durum bilgisi: son 30 gündeki depremler için sayı,
+    ortalama, varyans ve min/max; son 30 deprem aralığı için ortalama ve
+    min/max. Her yeni deprem O(1) amortize maliyetle işlenir.
+    """
+
+    def __init__(self):
+        self.pencere = deque()           # (sira, zaman_ns, buyukluk)
+        self.sira = 0
+        self.ortalama = _KayanOrtalama()
+        self.varyans = _KayanVaryans()
+        self.en_buyuk = _MonotonDeque(buyuk=True)
+        self.en_kucuk = _MonotonDeque(buyuk=False)
+
+        self.araliklar = deque()         # son 30 aralık (ilk aralık NaN)
+        self.aralik_ort = _KayanOrtalama()
+        self.aralik_max = _MonotonDeque(buyuk=True)
+        self.aralik_min = _MonotonDeque(buyuk=False)
+        self.son_zaman = None
+        self.son_ozellikler = None
+
+    def update(self, zaman_ns, buyukluk):
+        """Yeni depremi işler; bu depremi de içeren özellikleri döndürür"""
+        sira = self.sira
+        self.sira += 1
+
+        # Zaman penceresi (t - 30 gün, t]
+        sinir = zaman_ns - PENCERE_NS
+        if not self.pencere or self.pencere[-1][1] <= sinir:
+            # Önceki pencerenin tamamı düştü: pandas gibi sıfırdan başla
+            self.pencere.clear()
+            self.ortalama.sifirla(buyukluk)
+            self.varyans.sifirla(buyukluk)
+            self.ortalama.ekle(buyukluk)
+            self.varyans.ekle(buyukluk)
+        else:
+            while self.pencere[0][1] <= sinir:
+                _, _, eski = self.pencere.popleft()
+                self.ortalama.cikar(eski)
+                self.varyans.cikar(eski)
+            self.ortalama.ekle(buyukluk)
+            self.varyans.ekle(buyukluk)
+        self.pencere.append((sira, zaman_ns, buyukluk))
+        ilk_sira = self.pencere[0][0]
+        self.en_buyuk.ekle(sira, buyukluk)
+        self.en_kucuk.ekle(sira, buyukluk)
+        self.en_buyuk.temizle(ilk_sira)
+        self.en_kucuk.temizle(ilk_sira)
+
+        # Deprem aralığı (saat) ve son 30 aralık penceresi
+        aralik = math.nan if self.son_zaman is None else (zaman_ns - self.son_zaman) / 3.6e12
+        self.son_zaman = zaman_ns
+        if sira == 0:
+            self.aralik_ort.sifirla(aralik)
+        self.araliklar.append(aralik)
+        if len(self.araliklar) > ARALIK_PENCERESI:
+            self.aralik_ort.cikar(self.araliklar.popleft())
+        self.aralik_ort.ekle(aralik)
+        self.aralik_max.ekle(sira, aralik)
+        self.aralik_min.ekle(sira, aralik)
+        self.aralik_max.temizle(sira - ARALIK_PENCERESI + 1)
+        self.aralik_min.temizle(sira - ARALIK_PENCERESI + 1)
+
+        # Pencerede 30 geçerli aralık yoksa aralık özellikleri tanımsız
+        aralik_gecerli = self.aralik_ort.nobs >= ARALIK_PENCERESI
+        self.son_ozellikler = (
+            float(len(self.pencere)),
+            self.ortalama.deger(),
+            self.en_buyuk.deger(),
+            self.en_kucuk.deger(),
+            self.varyans.std(),
+            self.aralik_ort.deger(ARALIK_PENCERESI) if aralik_gecerli else math.nan,
+            self.aralik_max.deger() if aralik_gecerli else math.nan,
+            self.aralik_min.deger() if aralik_gecerli else math.nan,
+        )
+        return self.son_ozellikler, aralik
+
+
+class FeatureStore:
+    """
+    İl bazında artımlı özellik deposu. Eğitim (create_features) ve servis
+    (api) aynı hesaplamayı kullanır; servis tarafı son özellikleri
+    DataFrame işlemi yapmadan okur.
+    """
+
+    def __init__(self):
+        self.iller = {}
+
+    def update(self, konum, zaman_ns, buyukluk):
+        durum = self.iller.get(konum)
+        if durum is None:
+            durum = self.iller[konum] = ProvinceState()
+        return durum.update(zaman_ns, buyukluk)
+
+    def update_frame(self, df):
+        """
+        Satırları verilen sırayla (il içinde zamana göre artan olmalı) işler.
+        Her satır için SonAy_* özelliklerini ve DepremAraligi'nı döndürür.
+        """
+        n = len(df)
+        ozellikler = np.empty((n, len(SONAY_OZELLIKLERI)), dtype=np.float64)
+        araliklar = np.empty(n, dtype=np.float64)
+        zamanlar = df['Tarih_Saat'].to_numpy(dtype='datetime64[ns]').astype(np.int64).tolist()
+        buyuklukler = df['Buyukluk'].to_numpy(dtype=np.float64).tolist()
+        konumlar = df['Konum'].astype(str).tolist()
+
+        for i, (konum, zaman, buyukluk) in enumerate(zip(konumlar, zamanlar, buyuklukler)):
+            ozellikler[i], araliklar[i] = self.update(konum, zaman, buyukluk)
+
+        return pd.DataFrame(ozellikler, columns=SONAY_OZELLIKLERI, index=df.index), \
+            pd.Series(araliklar, index=df.index, name='DepremAraligi')
+
+    def last_time(self, konum):
+        durum = self.iller.get(konum)
+        return None if durum is None else durum.son_zaman
+
+    def features(self, konum):
+        """İlin son depreme göre özellikleri (kayıt yoksa sıfırlar, NaN -> 0)"""
+        durum = self.iller.get(konum)
+        if durum is None or durum.son_ozellikler is None:
+            return [0.0] * len(SONAY_OZELLIKLERI)
+        return [0.0 if x != x else x for x in durum.son_ozellikler]
+
+    def append(self, df, index=None):
+        """
+        CatalogIndex eklentisi olarak yeni satırları işler. Bir ilde daha eski
+        tarihli kayıt gelirse o ilin durumu indeksteki satırlardan yeniden kurulur.
+        """
+        df = df.sort_values('Tarih_Saat', kind='mergesort')
+        zamanlar = df['Tarih_Saat'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        yeniden = set()
+        for konum, zaman in zip(df['Konum'].astype(str), zamanlar):
+            son = self.last_time(konum)
+            if son is not None and zaman < son:
+                yeniden.add(konum)
+
+        if yeniden and index is not None:
+            tum = index.frame
+            for konum in yeniden:
+                self.iller.pop(konum, None)
+                satirlar = tum[tum['Konum'] == konum].sort_values('Tarih_Saat', kind='mergesort')
+                self.update_frame(satirlar)
+            df = df[~df['Konum'].astype(str).isin(yeniden)]
+
+        self.update_frame(df)
+
+
+def compute_features(df):
+    """
+    Tek geçişte create_features ile aynı sütunları üretir; df il içinde
+    zamana göre artan sırada olmalıdır
+    """
+    store = FeatureStore()
+    ozellikler, araliklar = store.update_frame(df)
+    return ozellikler, araliklar, store
@@ -0,0 +1,405 @@
+import argparse
+import json
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Dosya yollarını düzgün şekilde oluştur
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+data_dir = os.path.join(project_root, 'YapayZekaSon1', 'data')
+kutular_path = os.path.join(data_dir, 'turkiye_il_koordinatlari.json')
+# İsteğe bağlı il sınırları (GeoJSON Polygon/MultiPolygon). Varsa önce
+# poligon içinde olma testi yapılır; yoksa yalnızca kutu ve uzaklık kullanılır.
+poligon_path = os.path.join(data_dir, 'il_sinirlari.geojson')
+
+BELIRSIZ = 'BELIRSIZ'
+DUNYA_YARICAPI_KM = 6371.0088
+DERECE_KM = 111.195
+# Hiçbir bölgenin içinde olmayan nokta en fazla bu uzaklıktaki bölgeye atanır
+# (eski 1.4 derecelik kutu payının yaklaşık karşılığı)
+MAX_UZAKLIK_KM = 150.0
+# GeoJSON özelliklerinde il adının aranacağı alanlar
+AD_ALANLARI = ('name', 'NAME_1', 'il', 'il_adi', 'ad')
+# Nokta × kenar matrisinin en fazla hücre sayısı (bellek sınırı)
+PARCA_HUCRE = 4_000_000
+# Aday matrisleri bu kadar satırlık parçalarla hesaplanır
+PARCA_SATIR = 250_000
+
+
+def _haversine_a(lat1, lon1, lat2, lon2, cos1=None, cos2=None):
+    """
+    Haversine formülündeki a terimi (radyan girdiler); uzaklıkla monoton
+    artar. Enlem kosinüsleri önceden hesaplandıysa verilebilir.
+    """
+    cos1 = np.cos(lat1) if cos1 is None else cos1
+    cos2 = np.cos(lat2) if cos2 is None else cos2
+    return np.sin((lat2 - lat1) / 2) ** 2 + cos1 * cos2 * np.sin((lon2 - lon1) / 2) ** 2
+
+
+def _a_km(a):
+    return 2 * DUNYA_YARICAPI_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Büyük daire uzaklığı (km); NumPy dizileriyle yayınlanarak çalışır"""
+    return _a_km(_haversine_a(*map(np.radians, (lat1, lon1, lat2, lon2))))
+
+
+def ad_anahtari(ad):
+    """
+    İl adlarını eşleştirmek için karşılaştırma anahtarı: aksanlar ve Türkçe
+    harfler kaldırılır (İzmir, İZMİR, IZMIR aynı), boşluklar _ olur
+    """
+    ad = ad.strip().replace('ı', 'i').replace('İ', 'I')
+    ad = ''.join(c for c in unicodedata.normalize('NFKD', ad) if not unicodedata.combining(c))
+    return '_'.join(ad.upper().split())
+
+
+def _izgara(kutular, hucre):
+    """
+    Kutuları (lat_min, lat_max, lon_min, lon_max) düzenli bir ızgaraya
+    yerleştirir; hücre başına kesişen kutuların indekslerini tutan aday
+    tablosu döndürür. Boş yerler len(kutular) ile doldurulur.
+    """
+    lat0, lat1 = kutular[:, 0].min(), kutular[:, 1].max()
+    lon0, lon1 = kutular[:, 2].min(), kutular[:, 3].max()
+    n_lat = max(int(np.ceil((lat1 - lat0) / hucre)), 1)
+    n_lon = max(int(np.ceil((lon1 - lon0) / hucre)), 1)
+
+    pay = 1e-6
+    hucre_lat = lat0 + np.arange(n_lat) * hucre
+    hucre_lon = lon0 + np.arange(n_lon) * hucre
+    lat_kesisim = ((kutular[:, 0][None, :] <= hucre_lat[:, None] + hucre + pay) &
+                   (kutular[:, 1][None, :] >= hucre_lat[:, None] - pay))
+    lon_kesisim = ((kutular[:, 2][None, :] <= hucre_lon[:, None] + hucre + pay) &
+                   (kutular[:, 3][None, :] >= hucre_lon[:, None] - pay))
+    kesisim = (lat_kesisim[:, None, :] & lon_kesisim[None, :, :]).reshape(n_lat * n_lon, len(kutular))
+
+    max_aday = max(int(kesisim.sum(axis=1).max()), 1)
+    adaylar = np.full((n_lat * n_lon, max_aday), len(kutular), dtype=np.int32)
+    for i, satir in enumerate(kesisim):
+        idx = np.flatnonzero(satir)
+        adaylar[i, :len(idx)] = idx
+    return {'orijin': (lat0, lon0), 'ust': (lat1, lon1), 'boyut': (n_lat, n_lon),
+            'hucre': hucre, 'adaylar': adaylar}
+
+
+def _hucreler(izgara, lats, lons):
+    """Noktaların hücre numaraları; ızgara dışındakiler -1"""
+    lat0, lon0 = izgara['orijin']
+    lat1, lon1 = izgara['ust']
+    n_lat, n_lon = izgara['boyut']
+    icerde = (lats >= lat0) & (lats <= lat1) & (lons >= lon0) & (lons <= lon1)
+    satir = np.clip(((lats - lat0) // izgara['hucre']).astype(np.int64), 0, n_lat - 1)
+    sutun = np.clip(((lons - lon0) // izgara['hucre']).astype(np.int64), 0, n_lon - 1)
+    return np.where(icerde, satir * n_lon + sutun, -1)
+
+
+def _kutuda(kutu, lat, lon):
+    return ((kutu[..., 0] <= lat) & (lat <= kutu[..., 1]) &
+            (kutu[..., 2] <= lon) & (lon <= kutu[..., 3]))
+
+
+def poligon_icinde(lats, lons, kenarlar):
+    """
+    Işın atma (çift-tek kuralı) ile nokta-poligon testi. kenarlar (x1, y1,
+    x2, y2) dizileridir; dış halka, delikler ve çok parçalı poligonların tüm
+    halkaları birlikte verilir. Nokta × kenar matrisi parçalar halinde hesaplanır.
+    """
+    x1, y1, x2, y2 = kenarlar
+    sonuc = np.zeros(len(lats), dtype=bool)
+    parca = max(PARCA_HUCRE // max(len(x1), 1), 1)
+    for bas in range(0, len(lats), parca):
+        py = lats[bas:bas + parca, None]
+        px = lons[bas:bas + parca, None]
+        kesiyor = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_kesisim = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        sonuc[bas:bas + parca] = ((kesiyor & (px < x_kesisim)).sum(axis=1) % 2) == 1
+    return sonuc
+
+
+def _halkalar(geometri):
+    if geometri['type'] == 'Polygon':
+        return list(geometri['coordinates'])
+    if geometri['type'] == 'MultiPolygon':
+        return [halka for poligon in geometri['coordinates'] for halka in poligon]
+    return []
+
+
+def poligonlari_oku(path, bolgeler):
+    """
+    GeoJSON'daki il poligonlarını bölge adlarıyla eşleştirir. Bölge başına
+    kenar dizileri ve poligon kutusu döner; eşleşmeyen özellikler atlanır.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        veri = json.load(f)
+    kod = {ad_anahtari(ad): i for i, ad in enumerate(bolgeler)}
+
+    poligonlar = {}
+    for ozellik in veri.get('features', []):
+        ozellikler = ozellik.get('properties') or {}
+        ad = next((ozellikler[a] for a in AD_ALANLARI if ozellikler.get(a)), None)
+        i = kod.get(ad_anahtari(str(ad))) if ad is not None else None
+        if i is None:
+            print(f"Poligon eşleşmedi, atlanıyor: {ad}")
+            continue
+        for halka in _halkalar(ozellik['geometry']):
+            noktalar = np.asarray(halka, dtype=np.float64)[:, :2]
+            if len(noktalar) < 3:
+                continue
+            if not np.array_equal(noktalar[0], noktalar[-1]):
+                noktalar = np.vstack([noktalar, noktalar[:1]])
+            poligonlar.setdefault(i, []).append(noktalar)
+
+    sonuc = {}
+    for i, halkalar in poligonlar.items():
+        # (boylam, enlem) sırasındaki halkalar kenar listesine çevrilir
+        bas = np.concatenate([h[:-1] for h in halkalar])
+        son = np.concatenate([h[1:] for h in halkalar])
+        tum = np.concatenate(halkalar)
+        sonuc[i] = {
+            'kenarlar': (bas[:, 0], bas[:, 1], son[:, 0], son[:, 1]),
+            'kutu': (tum[:, 1].min(), tum[:, 1].max(), tum[:, 0].min(), tum[:, 0].max()),
+        }
+    return sonuc
+
+
+class GeoLabeler:
+    """
+    Koordinatları il/deniz bölgelerine toplu olarak atar.
+
+    1. Poligon dosyası varsa: nokta, kutusu ızgara ile ön elenmiş illerin
+       poligonlarında ışın atma testiyle aranır.
+    2. Poligona düşmeyen noktalar (ya da poligon yoksa tüm noktalar): kutusu
+       noktayı içeren bölgelerden merkezine haversine uzaklığı en küçük olan
+       seçilir. Hiçbir kutunun içinde değilse kutusuna en yakın bölge,
+       uzaklık MAX_UZAKLIK_KM içindeyse seçilir; değilse BELIRSIZ.
+
+    Sonuçlar bölge kodları (bolgeler listesindeki indeks, BELIRSIZ için
+    len(bolgeler)) olarak hesaplanır; etiketle() adlara çevirir.
+    """
+
+    def __init__(self, sinirlar, poligonlar=None, hucre=0.25, max_uzaklik_km=MAX_UZAKLIK_KM):
+        self.bolgeler = list(sinirlar.keys())
+        self.adlar = np.array(self.bolgeler + [BELIRSIZ], dtype=object)
+        self.max_uzaklik_km = max_uzaklik_km
+        kutular = np.array([[s['lat_min'], s['lat_max'], s['lon_min'], s['lon_max']]
+                            for s in sinirlar.values()], dtype=np.float64)
+        self.kutular = np.vstack([kutular, [np.inf, -np.inf, np.inf, -np.inf]])
+        self.merkezler = np.vstack([
+            np.column_stack([(kutular[:, 0] + kutular[:, 1]) / 2, (kutular[:, 2] + kutular[:, 3]) / 2]),
+            [np.nan, np.nan]])
+
+        # Uzaklık adayları: kutular erişim mesafesi kadar genişletilerek ızgaraya konur
+        dlat = max_uzaklik_km / DERECE_KM
+        cos = np.cos(np.radians(np.minimum(np.abs(kutular[:, :2]).max(axis=1) + dlat, 89.0)))
+        dlon = max_uzaklik_km / (DERECE_KM * cos)
+        genis = np.column_stack([kutular[:, 0] - dlat, kutular[:, 1] + dlat,
+                                 kutular[:, 2] - dlon, kutular[:, 3] + dlon])
+        self.izgara = _izgara(genis, hucre)
+        self.ic_izgara = _izgara(kutular, hucre)
+        self.genis = np.vstack([genis, [np.inf, -np.inf, np.inf, -np.inf]])
+        self.merkez_rad = np.radians(self.merkezler)
+        self.merkez_cos = np.cos(self.merkez_rad[:, 0])
+
+        self.poligonlar = poligonlar or {}
+        if self.poligonlar:
+            sirali = sorted(self.poligonlar)
+            self._poligon_kodlari = np.array(sirali, dtype=np.int32)
+            self.poligon_izgarasi = _izgara(np.array([self.poligonlar[i]['kutu'] for i in sirali]), hucre)
+
+    @classmethod
+    def varsayilan(cls):
+        with open(kutular_path, 'r', encoding='utf-8') as f:
+            sinirlar = json.load(f)
+        poligonlar = poligonlari_oku(poligon_path, list(sinirlar)) if os.path.exists(poligon_path) else None
+        return cls(sinirlar, poligonlar)
+
+    def _poligon_kodlari_bul(self, lats, lons):
+        """Poligon içindeki noktaların kodları; hiçbir poligonda olmayanlar -1"""
+        kodlar = np.full(len(lats), -1, dtype=np.int64)
+        izgara = self.poligon_izgarasi
+        hucreler = _hucreler(izgara, lats, lons)
+        gecerli = np.flatnonzero(hucreler >= 0)
+        if len(gecerli) == 0:
+            return kodlar
+
+        # Noktalar hücreye göre sıralanır; her poligon yalnızca kutusunun
+        # kestiği hücrelerdeki noktaları test eder
+        sira = gecerli[np.argsort(hucreler[gecerli], kind='stable')]
+        hucre_sirali = hucreler[sira]
+        adaylar = izgara['adaylar']
+        for j, kod in enumerate(self._poligon_kodlari):
+            hucre_listesi = np.flatnonzero((adaylar == j).any(axis=1))
+            bas = np.searchsorted(hucre_sirali, hucre_listesi, side='left')
+            son = np.searchsorted(hucre_sirali, hucre_listesi, side='right')
+            secim = np.concatenate([sira[b:s] for b, s in zip(bas, son) if s > b] or [np.empty(0, np.int64)])
+            if len(secim) == 0:
+                continue
+            lat_min, lat_max, lon_min, lon_max = self.poligonlar[kod]['kutu']
+            secim = secim[(kodlar[secim] < 0) &
+                          (lats[secim] >= lat_min) & (lats[secim] <= lat_max) &
+                          (lons[secim] >= lon_min) & (lons[secim] <= lon_max)]
+            if len(secim) == 0:
+                continue
+            icinde = poligon_icinde(lats[secim], lons[secim], self.poligonlar[kod]['kenarlar'])
+            kodlar[secim[icinde]] = kod
+        return kodlar
+
+    def _kutu_kodlari_bul(self, lats, lons):
+        """
+        İki aşama: önce kutusu noktayı içeren adaylar (dar ızgara) merkez
+        uzaklığıyla karşılaştırılır; hiçbir kutuda olmayan noktalar için geniş
+        ızgarada erişim mesafesindeki adayların kutu uzaklıkları hesaplanır.
+        Uzaklık yalnızca kutu testini geçen nokta-aday çiftleri için hesaplanır;
+        sıralama için haversine a terimi yeterlidir.
+        """
+        belirsiz = len(self.bolgeler)
+        kodlar = np.full(len(lats), belirsiz, dtype=np.int64)
+        lat_r, lon_r = np.radians(lats), np.radians(lons)
+        cos_lat = np.cos(lat_r)
+
+        hucreler = _hucreler(self.ic_izgara, lats, lons)
+        icerde = np.flatnonzero(hucreler >= 0)
+        bulundu = np.zeros(len(lats), dtype=bool)
+        if len(icerde):
+            aday = self.ic_izgara['adaylar'][hucreler[icerde]]
+            satir, sutun = np.nonzero(_kutuda(self.kutular[aday], lats[icerde][:, None], lons[icerde][:, None]))
+            bolge = aday[satir, sutun]
+            nokta = icerde[satir]
+            a = np.full(aday.shape, np.inf)
+            a[satir, sutun] = _haversine_a(lat_r[nokta], lon_r[nokta], self.merkez_rad[bolge, 0],
+                                           self.merkez_rad[bolge, 1], cos_lat[nokta], self.merkez_cos[bolge])
+            var = np.isfinite(a).any(axis=1)
+            kodlar[icerde[var]] = aday[var, np.argmin(a[var], axis=1)]
+            bulundu[icerde[var]] = True
+
+        kalan = np.flatnonzero(~bulundu)
+        hucreler = _hucreler(self.izgara, lats[kalan], lons[kalan])
+        kalan, hucreler = kalan[hucreler >= 0], hucreler[hucreler >= 0]
+        if len(kalan) == 0:
+            return kodlar
+        aday = self.izgara['adaylar'][hucreler]
+        satir, sutun = np.nonzero(_kutuda(self.genis[aday], lats[kalan][:, None], lons[kalan][:, None]))
+        bolge = aday[satir, sutun]
+        nokta = kalan[satir]
+        # Kutunun noktaya en yakın noktası
+        en_yakin_lat = np.radians(np.clip(lats[nokta], self.kutular[bolge, 0], self.kutular[bolge, 1]))
+        en_yakin_lon = np.radians(np.clip(lons[nokta], self.kutular[bolge, 2], self.kutular[bolge, 3]))
+        a = np.full(aday.shape, np.inf)
+        a[satir, sutun] = _haversine_a(lat_r[nokta], lon_r[nokta], en_yakin_lat, en_yakin_lon, cos_lat[nokta])
+        yakin = np.argmin(a, axis=1)
+        satirlar = np.arange(len(aday))
+        uzaklik = _a_km(a[satirlar, yakin])
+        kodlar[kalan] = np.where(uzaklik <= self.max_uzaklik_km, aday[satirlar, yakin], belirsiz)
+        return kodlar
+
+    def _parca_kodlari(self, lats, lons):
+        if not self.poligonlar:
+            return self._kutu_kodlari_bul(lats, lons)
+        kodlar = self._poligon_kodlari_bul(lats, lons)
+        kalan = np.flatnonzero(kodlar < 0)
+        if len(kalan):
+            kodlar[kalan] = self._kutu_kodlari_bul(lats[kalan], lons[kalan])
+        return kodlar
+
+    def kodlar(self, lats, lons):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if len(lats) <= PARCA_SATIR:
+            return self._parca_kodlari(lats, lons)
+        return np.concatenate([self._parca_kodlari(lats[b:b + PARCA_SATIR], lons[b:b + PARCA_SATIR])
+                               for b in range(0, len(lats), PARCA_SATIR)])
+
+    def etiketle(self, lats, lons):
+        """Koordinat dizilerini bölge adlarına çevirir"""
+        return self.adlar[self.kodlar(lats, lons)]
+
+
+_etiketleyici = None
+
+
+def varsayilan_etiketleyici():
+    global _etiketleyici
+    if _etiketleyici is None:
+        _etiketleyici = GeoLabeler.varsayilan()
+    return _etiketleyici
+
+
+def _parca_kodlari(args):
+    lats, lons = args
+    return varsayilan_etiketleyici().kodlar(lats, lons).astype(np.int16)
+
+
+def etiketle(lats, lons, workers=1, parca=200_000):
+    """
+    Koordinatları il adlarına çevirir. workers > 1 ise dizi parçalara bölünüp
+    süreç havuzunda işlenir; her süreç etiketleyiciyi bir kez kurar ve
+    yalnızca kısa tamsayı kodlar geri gönderilir.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    etiketleyici = varsayilan_etiketleyici()
+    if workers <= 1 or len(lats) <= parca:
+        return etiketleyici.etiketle(lats, lons)
+
+    parcalar = [(lats[b:b + parca], lons[b:b + parca]) for b in range(0, len(lats), parca)]
+    with ProcessPoolExecutor(max_workers=workers) as havuz:
+        kodlar = np.concatenate(list(havuz.map(_parca_kodlari, parcalar)))
+    return etiketleyici.adlar[kodlar]
+
+
+def relabel(workers, parca):
+    """
+    Tüm kataloğu yeni etiketleyiciyle baştan işler (data_processing --full)
+    ve önceki etiketlere göre değişen satır sayısını raporlar
+    """
+    import pandas as pd
+    import data_processing
+
+    onceki = None
+    if os.path.exists(data_processing.output_csv_path):
+        onceki = pd.read_csv(data_processing.output_csv_path)
+
+    t0 = time.perf_counter()
+    data_processing.tam_isle(workers=workers, parca=parca)
+    print(f"Yeniden etiketleme {time.perf_counter() - t0:.1f} sn sürdü "
+          f"({'poligon' if varsayilan_etiketleyici().poligonlar else 'kutu'} modu, {workers} süreç).")
+
+    if onceki is not None:
+        yeni = pd.read_csv(data_processing.output_csv_path)
+        if len(yeni) == len(onceki):
+            degisen = yeni['Konum'] != onceki['Konum']
+            print(f"Etiketi değişen satır: {int(degisen.sum())} / {len(yeni)}")
+            ornek = pd.DataFrame({'eski': onceki['Konum'][degisen], 'yeni': yeni['Konum'][degisen]})
+            if len(ornek):
+                print(ornek.value_counts().head(10).to_string())
+        else:
+            print("Satır sayısı değiştiği için etiket karşılaştırması yapılmadı.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Koordinatları il bilgisiyle etiketler')
+    alt = parser.add_subparsers(dest='komut', required=True)
+    yeniden = alt.add_parser('relabel', help='Tüm kataloğu paralel parçalarla yeniden etiketle')
+    yeniden.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                         help='Süreç sayısı (varsayılan: çekirdek sayısı)')
+    yeniden.add_argument('--chunk', type=int, default=200_000, help='Parça başına satır')
+    nokta = alt.add_parser('label', help='Tek bir koordinatın bölgesini yazdır')
+    nokta.add_argument('lat', type=float)
+    nokta.add_argument('lon', type=float)
+    args = parser.parse_args()
+
+    if args.komut == 'relabel':
+        relabel(max(args.workers, 1), args.chunk)
+    else:
+        print(varsayilan_etiketleyici().etiketle([args.lat], [args.lon])[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import argparse
+import os
+import queue
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+
+import data_processing
+import data_scrapper
+import earthquake_store
+from metrics import Metrics
+
+API_URL = os.environ.get('DEPREM_API_URL', 'http://127.0.0.1:5000')
+# Kandilli listesindeki zamanlar Türkiye saatidir; tazelik UTC'ye çevrilerek ölçülür
+KATALOG_SAAT_DILIMI = 'Europe/Istanbul'
+# API bildirimi için bağlantı ve okuma zaman aşımı (saniye)
+BILDIRIM_ZAMAN_ASIMI = (2, 30)
+# Olay zamanından sorgulanabilir olmasına kadar geçen süre aralıkları (saniye)
+TAZELIK_ARALIKLARI = (1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 21600, 86400)
+
+
+class IngestDaemon:
+    """
+    Sürekli çalışan veri alma hattı: indir → etiketle → özellikler → API.
+
+    Her tikte Kandilli sayfaları indirilip katalogla birleştirilir. Değişen
+    kuyruk bellekten doğrudan işleyiciye geçer; işleyici yalnızca filigrandan
+    sonraki olayları etiketler, updated_earthquakes.csv'ye ekler ve eklenen
+    satırları API'ye gönderir. API bunları CSV'yi okumadan indeksine ve il
+    bazındaki artımlı özellik durumuna işler.
+
+    İndirme ve işleme ayrı iş parçacıklarıdır, aralarındaki kuyruk sınırlıdır.
+    İşleyici geride kalırsa indirici bir tik boyunca bekler (yavaşlar); kuyruk
+    yine boşalmazsa o tikin kuyruğu bırakılır ve işleyici bir sonraki turda
+    filigrandan sonraki her şeyi earthquakes.csv'den tek seferde okur. Veri
+    kaybolmaz, çünkü her tik önce kataloğa yazılır.
+    """
+
+    def __init__(self, urls=None, api_url=API_URL, interval=60.0, max_kuyruk=4, max_workers=4,
+                 saat_dilimi=KATALOG_SAAT_DILIMI):
+        self.urls = urls or [data_scrapper.KANDILLI_URL]
+        self.api_url = api_url.rstrip('/') if api_url else None
+        self.interval = interval
+        self.max_workers = max_workers
+        self.saat_dilimi = saat_dilimi
+        self.session = data_scrapper.create_session(pool_size=max(max_workers, 1))
+        self.api_session = requests.Session()
+
+        self.durum = None
+        self.son_olay = None
+        self._kuyruk = queue.Queue(maxsize=max(max_kuyruk, 1))
+        # Kuyruk bırakıldı ya da işleme yarıda kaldı: sonraki tur katalogdan yetişir.
+        # Başlangıçta kapalıyken eklenen satırlar için de kurulu gelir.
+        self._geride = threading.Event()
+        self._geride.set()
+        self._stop = threading.Event()
+        self._threads = []
+
+        self.metrics = Metrics(prefix='earthquake_ingest_')
+        self.ticks = self.metrics.counter('ticks_total', 'Sonucuna göre tik sayısı', ['result'])
+        self.events = self.metrics.counter('events_total', 'Aşamaya göre olay sayısı', ['stage'])
+        self.errors = self.metrics.counter('errors_total', 'Aşamaya göre hata sayısı', ['stage'])
+        self.backpressure = self.metrics.counter(
+            'backpressure_total', 'İşleyici geride kaldığı için bekleyen (wait) ya da bırakılan (drop) tikler',
+            ['action'])
+        self.stage_duration = self.metrics.histogram('stage_duration_seconds', 'Aşama süresi', ['stage'])
+        self.freshness = self.metrics.histogram(
+            'freshness_seconds', 'Olay zamanından API\'de sorgulanabilir olmasına kadar geçen süre',
+            buckets=TAZELIK_ARALIKLARI)
+        self.pipeline_latency = self.metrics.histogram(
+            'pipeline_latency_seconds', 'Tik başlangıcından API onayına kadar geçen süre',
+            buckets=TAZELIK_ARALIKLARI)
+        self.metrics.collector(self._sayaclar)
+
+    def _sayaclar(self):
+        gecikme = None
+        if self.son_olay is not None:
+            gecikme = (pd.Timestamp.now(tz='UTC') - self.son_olay).total_seconds()
+        return [
+            ('queue_depth', 'gauge', 'İşlenmeyi bekleyen tik sayısı', [({}, self._kuyruk.qsize())]),
+            ('queue_capacity', 'gauge', 'Kuyruk sınırı', [({}, self._kuyruk.maxsize)]),
+            ('behind', 'gauge', 'İşleyici katalogdan yetişecekse 1', [({}, int(self._geride.is_set()))]),
+            ('last_event_age_seconds', 'gauge', 'API\'ye ulaşan en yeni olayın yaşı', [({}, gecikme)]),
+        ]
+
+    def _olay_zamanlari(self, df):
+        return df['Tarih_Saat'].dt.tz_localize(self.saat_dilimi, ambiguous='NaT',
+                                              nonexistent='NaT').dt.tz_convert('UTC')
+
+    def bildir(self, eklemeler=None):
+        """
+        API'ye yenileme bildirimi gönderir; onaylanırsa True. API'ye
+        ulaşılamazsa satırlar dosyada olduğu için izleyicisi onları okur.
+        """
+        if self.api_url is None:
+            return False
+        try:
+            yanit = self.api_session.post(f'{self.api_url}/api/refresh', json=eklemeler or {},
+                                          timeout=BILDIRIM_ZAMAN_ASIMI)
+            yanit.raise_for_status()
+            return True
+        except requests.RequestException as e:
+            self.errors.inc('notify')
+            print("API bildirimi başarısız:", str(e))
+            return False
+
+    def indir(self):
+        """
+        Bir tik: sayfaları indirip katalogla birleştirir, değişen kuyruğu
+        döndürür. Hata olursa tik hata sayılır ve None döner; o tikte kataloğa
+        yazılmış olabilecek satırlar işleyici katalogdan yetişirken okunur.
+        """
+        t0 = time.perf_counter()
+        try:
+            kuyruk = data_scrapper.get_kandilli_data(self.urls, self.max_workers, self.session)
+        except Exception as e:
+            self.errors.inc('fetch')
+            self.ticks.inc('error')
+            print("İndirme hatası:", str(e))
+            self._geride.set()
+            return None
+        finally:
+            self.stage_duration.observe(time.perf_counter() - t0, 'fetch')
+        self.ticks.inc('changed' if kuyruk is not None else 'unchanged')
+        return kuyruk
+
+    def isle(self, kuyruk, baslangic):
+        """
+        Yeni olayları etiketleyip ekler ve API'ye gönderir. kuyruk None ise,
+        işleyici geride kaldıysa ya da filigrandan eski bir değişiklik için
+        çıktı kırpıldıysa yeni olaylar katalogdan okunur.
+        """
+        t0 = time.perf_counter()
+        try:
+            if self.durum is None:
+                self.durum = data_processing.islem_durumu()
+                if self.durum is None:
+                    print("İşlem durumu bulunamadı, tam işleme yapılıyor.")
+                    data_processing.tam_isle()
+                    self.durum = data_processing.islem_durumu()
+                    self._geride.clear()
+                    self.bildir()
+                    return
+            with earthquake_store.kilit():
+                self.durum, kaynak_surumu, kirpildi = \
+                    data_processing.geri_degisiklikleri_isle(self.durum)
+                if kirpildi or self._geride.is_set() or kuyruk is None:
+                    # Bayrak okumadan önce temizlenir: bu arada bırakılan kuyruk
+                    # bir sonraki turda yine katalogdan okunur
+                    self._geride.clear()
+                    delta = data_processing.yeni_satirlari_oku(self.durum['watermark'])
+                else:
+                    delta = data_processing.filigrandan_sonra(kuyruk, self.durum['watermark'])
+            if len(delta) == 0:
+                return
+            offset = self.durum['output_size']
+            new_df, veri, self.durum = data_processing.delta_ekle(delta, self.durum, kaynak_surumu)
+        except Exception as e:
+            # Yarıda kalan ekleme durum yeniden okunurken geri alınır
+            self.errors.inc('process')
+            print("İşleme hatası:", str(e))
+            self.durum = None
+            self._geride.set()
+            return
+        finally:
+            self.stage_duration.observe(time.perf_counter() - t0, 'label')
+        self.events.inc('labelled', miktar=len(new_df))
+        print(f"{len(new_df)} yeni deprem etiketlendi.")
+
+        t0 = time.perf_counter()
+        onaylandi = self.bildir({'catalog': {'offset': offset, 'data': veri.decode('utf-8')}})
+        self.stage_duration.observe(time.perf_counter() - t0, 'notify')
+        if not onaylandi:
+            return
+
+        simdi = pd.Timestamp.now(tz='UTC')
+        zamanlar = self._olay_zamanlari(new_df).dropna()
+        for sure in (simdi - zamanlar).dt.total_seconds():
+            self.freshness.observe(sure)
+        self.events.inc('queryable', miktar=len(new_df))
+        self.pipeline_latency.observe(time.monotonic() - baslangic)
+        if len(zamanlar) and (self.son_olay is None or zamanlar.max() > self.son_olay):
+            self.son_olay = zamanlar.max()
+
+    def tick(self):
+        """Tek tik indirme ve işleme (iş parçacıkları olmadan)"""
+        baslangic = time.monotonic()
+        kuyruk = self.indir()
+        if kuyruk is not None or self._geride.is_set():
+            self.isle(kuyruk, baslangic)
+
+    def _indirici(self):
+        sonraki = time.monotonic()
+        while not self._stop.is_set():
+            baslangic = time.monotonic()
+            kuyruk = self.indir()
+
+            if kuyruk is not None:
+                try:
+                    self._kuyruk.put_nowait((kuyruk, baslangic))
+                except queue.Full:
+                    self.backpressure.inc('wait')
+                    try:
+                        self._kuyruk.put((kuyruk, baslangic), timeout=self.interval)
+                    except queue.Full:
+                        self.backpressure.inc('drop')
+                        self._geride.set()
+
+            # Tik süresi aralığı aştıysa kaçırılan tikler toplu çalıştırılmaz
+            sonraki += self.interval
+            simdi = time.monotonic()
+            if sonraki < simdi:
+                self.ticks.inc('overrun')
+                sonraki = simdi
+            self._stop.wait(sonraki - simdi)
+
+    def _isleyici(self):
+        # Kapalıyken kataloğa eklenenler için ilk tur katalogdan yetişir
+        self.isle(None, time.monotonic())
+        son_deneme = time.monotonic()
+        while not (self._stop.is_set() and self._kuyruk.empty()):
+            try:
+                kuyruk, baslangic = self._kuyruk.get(timeout=0.5)
+            except queue.Empty:
+                # Hata sonrası yetişme en fazla tik aralığında bir denenir
+                if (self._geride.is_set() and not self._stop.is_set() and
+                        time.monotonic() - son_deneme >= self.interval):
+                    son_deneme = time.monotonic()
+                    self.isle(None, son_deneme)
+                continue
+            self.isle(kuyruk, baslangic)
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._isleyici, name='ingest-processor', daemon=True),
+                         threading.Thread(target=self._indirici, name='ingest-fetcher', daemon=True)]
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self):
+        for t in self._threads:
+            while t.is_alive():
+                t.join(0.5)
+
+
+def metrics_sunucusu(metrics, port, host='127.0.0.1'):
+    """Metrikleri /metrics adresinde Prometheus formatında sunan arka plan sunucusu"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            govde = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(govde)))
+            self.end_headers()
+            self.wfile.write(govde)
+
+        def log_message(self, format, *args):
+            pass
+
+    sunucu = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=sunucu.serve_forever, name='ingest-metrics', daemon=True).start()
+    return sunucu
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kandilli verilerini sürekli alıp API\'ye işleyen servis')
+    parser.add_argument('--url', action='append', dest='urls',
+                        help='İndirilecek sayfa (birden fazla verilebilir, varsayılan: lst0.asp)')
+    parser.add_argument('--api', default=API_URL, help='Bildirim gönderilecek API adresi')
+    parser.add_argument('--no-api', action='store_true', help='API\'ye bildirim gönderme')
+    parser.add_argument('--aralik', type=float, default=60.0, help='Tik aralığı (saniye)')
+    parser.add_argument('--kuyruk', type=int, default=4,
+                        help='İşlenmeyi bekleyebilecek en fazla tik sayısı')
+    parser.add_argument('--workers', type=int, default=4, help='Eşzamanlı indirme sayısı')
+    parser.add_argument('--saat-dilimi', default=KATALOG_SAAT_DILIMI,
+                        help='Katalogdaki olay zamanlarının saat dilimi')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Metriklerin /metrics adresinden sunulacağı port')
+    parser.add_argument('--tek', action='store_true', help='Tek tik çalıştırıp çık')
+    args = parser.parse_args()
+    if args.aralik <= 0:
+        parser.error('--aralik sıfırdan büyük olmalı')
+
+    daemon = IngestDaemon(args.urls, None if args.no_api else args.api, args.aralik, args.kuyruk,
+                          args.workers, args.saat_dilimi)
+    if args.tek:
+        daemon.tick()
+        return
+
+    if args.metrics_port is not None:
+        metrics_sunucusu(daemon.metrics, args.metrics_port)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    daemon.start()
+    try:
+        daemon.join()
+    except KeyboardInterrupt:
+        daemon.stop()
+        daemon.join()
+
+
+if __name__ == "__main__":
+    main()
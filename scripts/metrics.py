@@ -0,0 +1,256 @@
+import bisect
+import collections
+import functools
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+# Prometheus'un varsayılan gecikme aralıkları (saniye)
+VARSAYILAN_ARALIKLAR = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _etiketler(anahtarlar, degerler):
+    if not anahtarlar:
+        return ''
+    parcalar = []
+    for ad, deger in zip(anahtarlar, degerler):
+        deger = str(deger).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parcalar.append(f'{ad}="{deger}"')
+    return '{' + ','.join(parcalar) + '}'
+
+
+def _sayi(deger):
+    if deger == math.inf:
+        return '+Inf'
+    if isinstance(deger, float) and deger.is_integer() and abs(deger) < 1e15:
+        return str(int(deger))
+    return repr(deger) if isinstance(deger, float) else str(deger)
+
+
+class Counter:
+    """Yalnızca artan sayaç; etiket değerleri sırasıyla verilir"""
+
+    tip = 'counter'
+
+    def __init__(self, name, doc, labels=()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._degerler = collections.defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *etiket, miktar=1):
+        with self._lock:
+            self._degerler[etiket] += miktar
+
+    def satirlar(self):
+        with self._lock:
+            degerler = sorted(self._degerler.items())
+        return [f'{self.name}{_etiketler(self.labels, e)} {_sayi(d)}' for e, d in degerler]
+
+
+class Histogram:
+    """
+    Kümülatif aralıklı histogram. Her gözlem ilgili aralığa bisect ile
+    yerleştirilir; yazdırırken aralıklar toplanır.
+    """
+
+    tip = 'histogram'
+
+    def __init__(self, name, doc, labels=(), buckets=VARSAYILAN_ARALIKLAR):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._seriler = {}
+        self._lock = threading.Lock()
+
+    def observe(self, deger, *etiket):
+        i = bisect.bisect_left(self.buckets, deger)
+        with self._lock:
+            seri = self._seriler.get(etiket)
+            if seri is None:
+                # [aralık sayıları..., +Inf sayısı], toplam
+                seri = self._seriler[etiket] = [[0] * (len(self.buckets) + 1), 0.0]
+            seri[0][i] += 1
+            seri[1] += deger
+
+    def satirlar(self):
+        with self._lock:
+            seriler = sorted((e, (list(s[0]), s[1])) for e, s in self._seriler.items())
+        sonuc = []
+        for etiket, (sayilar, toplam) in seriler:
+            kumulatif = 0
+            for ust, sayi in zip(self.buckets + (math.inf,), sayilar):
+                kumulatif += sayi
+                sonuc.append(f'{self.name}_bucket'
+                             f'{_etiketler(self.labels + ("le",), etiket + (_sayi(float(ust)),))} {kumulatif}')
+            sonuc.append(f'{self.name}_sum{_etiketler(self.labels, etiket)} {_sayi(toplam)}')
+            sonuc.append(f'{self.name}_count{_etiketler(self.labels, etiket)} {kumulatif}')
+        return sonuc
+
+
+class Metrics:
+    """
+    Süreç içi metrik deposu. Sayaç ve histogramlar doğrudan güncellenir;
+    başka nesnelerde tutulan sayaçlar (önbellek, registry, toplayıcı)
+    collector fonksiyonlarıyla yalnızca okunurken toplanır.
+
+    collector fonksiyonu (ad, tip, açıklama, [(etiket sözlüğü, değer), ...])
+    dörtlülerinin listesini döndürmelidir.
+    """
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self._metrikler = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self.spans = self.histogram('span_seconds', 'Ölçülen kod bölümlerinin süresi', ['span'])
+
+    def _ekle(self, metrik):
+        with self._lock:
+            return self._metrikler.setdefault(metrik.name, metrik)
+
+    def counter(self, name, doc, labels=()):
+        return self._ekle(Counter(self.prefix + name, doc, labels))
+
+    def histogram(self, name, doc, labels=(), buckets=VARSAYILAN_ARALIKLAR):
+        return self._ekle(Histogram(self.prefix + name, doc, labels, buckets))
+
+    def collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    @contextmanager
+    def span(self, ad):
+        """Bloğun süresini span_seconds{span=ad} histogramına yazar"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.observe(time.perf_counter() - t0, ad)
+
+    def timed(self, ad, fn):
+        """fn'i her çağrısı ölçülen bir fonksiyonla sarar"""
+        @functools.wraps(fn)
+        def sarici(*args, **kwargs):
+            with self.span(ad):
+                return fn(*args, **kwargs)
+        return sarici
+
+    def render(self):
+        """Prometheus metin formatı (0.0.4)"""
+        satirlar = []
+        with self._lock:
+            metrikler = list(self._metrikler.values())
+        for metrik in metrikler:
+            satirlar.append(f'# HELP {metrik.name} {metrik.doc}')
+            satirlar.append(f'# TYPE {metrik.name} {metrik.tip}')
+            satirlar.extend(metrik.satirlar())
+
+        for collector in self._collectors:
+            try:
+                aileler = collector()
+            except Exception as e:
+                print("Metrik toplama hatası:", str(e))
+                continue
+            for ad, tip, doc, ornekler in aileler:
+                ad = self.prefix + ad
+                satirlar.append(f'# HELP {ad} {doc}')
+                satirlar.append(f'# TYPE {ad} {tip}')
+                for etiket, deger in ornekler:
+                    if deger is None:
+                        continue
+                    satirlar.append(f'{ad}{_etiketler(tuple(etiket), tuple(etiket.values()))} {_sayi(deger)}')
+        return '\n'.join(satirlar) + '\n'
+
+
+class SamplingProfiler:
+    """
+    Çalışan tüm iş parçacıklarının yığınlarını belirli aralıklarla örnekleyen
+    profilleyici. Kapalıyken hiçbir maliyeti yoktur; süreç yeniden
+    başlatılmadan açılıp kapatılabilir. Örnekler flamegraph araçlarının
+    okuduğu katlanmış (folded) yığın formatında toplanır.
+    """
+
+    def __init__(self, max_derinlik=64):
+        self.max_derinlik = max_derinlik
+        self.interval = None
+        self.samples = 0
+        self._yiginlar = collections.Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.started_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=0.01):
+        with self._lock:
+            if self.running:
+                return False
+            self.interval = interval
+            self._yiginlar.clear()
+            self.samples = 0
+            self.started_at = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._calis, name='sampling-profiler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        return self.running
+
+    def toggle(self, interval=0.01):
+        if self.running:
+            self.stop()
+        else:
+            self.start(interval)
+        return self.running
+
+    def _calis(self):
+        kendi = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == kendi:
+                    continue
+                yigin = [f'{kare.f_code.co_name} ({os.path.basename(kare.f_code.co_filename)}:{satir})'
+                         for kare, satir in traceback.walk_stack(frame)][:self.max_derinlik]
+                with self._lock:
+                    self._yiginlar[';'.join(reversed(yigin))] += 1
+            with self._lock:
+                self.samples += 1
+
+    def folded(self):
+        """Katlanmış yığınlar: her satırda 'çağıran;...;çağrılan sayı'"""
+        with self._lock:
+            return '\n'.join(f'{yigin} {sayi}' for yigin, sayi in self._yiginlar.most_common()) + '\n'
+
+    def top(self, n=20):
+        """En çok örneklenen (yığının tepesindeki) fonksiyonlar"""
+        with self._lock:
+            yiginlar = list(self._yiginlar.items())
+        tepeler = collections.Counter()
+        for yigin, sayi in yiginlar:
+            tepeler[yigin.rsplit(';', 1)[-1]] += sayi
+        toplam = sum(tepeler.values()) or 1
+        return [{'frame': ad, 'samples': sayi, 'ratio': round(sayi / toplam, 4)}
+                for ad, sayi in tepeler.most_common(n)]
+
+    def status(self):
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'samples': self.samples,
+            'started_at': self.started_at,
+        }
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+class PredictionBatcher:
+    """
+    Tahmin isteklerini kısa bir pencerede (max_wait saniye) toplayıp tek bir
+    model çağrısında işler. Aynı konum için kuyrukta bekleyen ya da o anda
+    hesaplanan bir istek varsa yeni istek ayrı hesaplanmaz, onun sonucunu
+    paylaşır.
+
+    predict_fn konum listesi alıp aynı sırada sonuç listesi döndürmelidir.
+    İşçi iş parçacıkları ilk istekte başlatılır; fork ile oluşturulan
+    süreçlerde (ör. gunicorn işçileri) her süreç kendi işçilerini açar.
+    """
+
+    def __init__(self, predict_fn, max_wait=0.005, max_batch=256, workers=None):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._pid = None
+        self._baslat_kilidi = threading.Lock()
+
+    def _sifirla(self):
+        self._kosul = threading.Condition()
+        self._kuyruk = []
+        self._bekleyen = {}  # konum -> Future (kuyrukta ya da hesaplanıyor)
+        self.stats = {'requests': 0, 'coalesced': 0, 'batches': 0, 'batched_items': 0}
+        for i in range(self.workers):
+            threading.Thread(target=self._calis, name=f'prediction-batcher-{i}', daemon=True).start()
+        self._pid = os.getpid()
+
+    def _baslat(self):
+        if self._pid != os.getpid():
+            with self._baslat_kilidi:
+                if self._pid != os.getpid():
+                    self._sifirla()
+
+    def submit(self, location):
+        """Konum için tahmini kuyruğa ekler, sonucu taşıyan Future döndürür"""
+        self._baslat()
+        with self._kosul:
+            self.stats['requests'] += 1
+            future = self._bekleyen.get(location)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future
+            future = self._bekleyen[location] = Future()
+            self._kuyruk.append(location)
+            self._kosul.notify()
+            return future
+
+    def predict(self, locations, timeout=None):
+        futures = [self.submit(location) for location in locations]
+        return [future.result(timeout) for future in futures]
+
+    def _grup_al(self):
+        with self._kosul:
+            while not self._kuyruk:
+                self._kosul.wait()
+            # İlk istekten sonra max_wait kadar (ya da grup dolana kadar) bekle
+            son = time.monotonic() + self.max_wait
+            while len(self._kuyruk) < self.max_batch:
+                kalan = son - time.monotonic()
+                if kalan <= 0:
+                    break
+                self._kosul.wait(kalan)
+            grup = self._kuyruk[:self.max_batch]
+            del self._kuyruk[:self.max_batch]
+            self.stats['batches'] += 1
+            self.stats['batched_items'] += len(grup)
+            return grup
+
+    def _calis(self):
+        while True:
+            grup = self._grup_al()
+            try:
+                sonuclar, hata = self.predict_fn(grup), None
+            except Exception as e:
+                sonuclar, hata = None, e
+
+            # Sonuç yayınlanmadan önce kayıt silinir; sonraki istekler güncel
+            # model ve katalogla yeniden hesaplanır
+            with self._kosul:
+                futures = [self._bekleyen.pop(location) for location in grup]
+            for i, future in enumerate(futures):
+                if hata is not None:
+                    future.set_exception(hata)
+                else:
+                    future.set_result(sonuclar[i])
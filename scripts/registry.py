@@ -0,0 +1,290 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _ozet_nesnesi(path, blok=1024 * 1024, boyut=None):
+    """boyut verilirse yalnızca dosyanın ilk boyut baytı özetlenir"""
+    ozet = hashlib.sha1()
+    kalan = boyut
+    with open(path, 'rb') as f:
+        while kalan is None or kalan > 0:
+            parca = f.read(blok if kalan is None else min(blok, kalan))
+            if not parca:
+                break
+            ozet.update(parca)
+            if kalan is not None:
+                kalan -= len(parca)
+    return ozet
+
+
+def dosya_ozeti(path, blok=1024 * 1024):
+    """
+    Dosyanın SHA-1 özetini hesaplar
+    """
+    return _ozet_nesnesi(path, blok).hexdigest()
+
+
+def load_catalog(path):
+    """Deprem kataloğunu okuyup tarih sütununu datetime'a çevirir"""
+    df = pd.read_csv(path)
+    df['Tarih_Saat'] = pd.to_datetime(df['Tarih_Saat'], format='%Y-%m-%d %H:%M:%S')
+    return df
+
+
+def load_pickle(path):
+    """Pickle ile kaydedilmiş model/encoder dosyasını yükler"""
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+class _Kaynak:
+    """İzlenen tek bir dosya ve ondan yüklenen nesne"""
+
+    # Dosyanın sonuna ekleme yapıldığını doğrulamak için saklanan kuyruk boyu
+    SENTINEL_BOYU = 4096
+
+    def __init__(self, path, loader, appender=None):
+        self.path = path
+        self.loader = loader
+        self.appender = appender
+        self.value = None
+        self.mtime = None
+        self.size = None
+        self.inode = None
+        self.digest = None
+        self.hasher = None
+        self.header = b''
+        self.sentinel = b''
+        self.error = None
+        self.reloads = 0
+        self.appends = 0
+
+    def _kuyrugu_oku(self):
+        with open(self.path, 'rb') as f:
+            self.header = f.readline()
+            f.seek(max(self.size - self.SENTINEL_BOYU, 0))
+            self.sentinel = f.read(self.size - f.tell())
+
+
+class Registry:
+    """
+    Süreç genelinde katalog ve model deposu.
+
+    Dosyalar başlangıçta bir kez yüklenir ve istekler arasında salt okunur
+    olarak paylaşılır. Arka plandaki izleyici iş parçacığı dosyaların
+    mtime/boyut bilgisini kontrol eder; değişiklik varsa içerik özeti
+    karşılaştırılır ve yalnızca içerik gerçekten değiştiyse yeniden yüklenir.
+    İstek sırasında hiçbir dosya erişimi yapılmaz.
+    """
+
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self._kaynaklar = {}
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._fork_sonrasi)
+
+    def _fork_sonrasi(self):
+        """
+        Fork edilen süreçte (ör. gunicorn --preload işçileri) yalnızca fork
+        eden iş parçacığı yaşar: kilit yenilenir, izleyici çalışıyorduysa
+        yeniden başlatılır. Yüklü nesneler ana süreçle sayfa paylaşır.
+        """
+        self._lock = threading.Lock()
+        calisiyordu = self._watcher is not None and not self._stop.is_set()
+        self._watcher = None
+        if calisiyordu:
+            self.start_watcher()
+
+    def register(self, name, path, loader, appender=None):
+        """
+        appender verilirse dosyanın sonuna eklenen satırlar tüm dosya yeniden
+        okunmadan appender(mevcut_nesne, baslik_ve_yeni_satirlar) ile işlenir
+        """
+        self._kaynaklar[name] = _Kaynak(path, loader, appender)
+
+    # Yükleme sırasında dosya değişirse yeniden denenir
+    YUKLEME_DENEMESI = 3
+
+    def _yukle(self, kaynak, stat=None, hasher=None):
+        """
+        Dosyayı yükler. Yüklemeden sonra dosya yeniden stat edilir; yükleme
+        sürerken dosyaya ekleme yapıldıysa kayıtlı boyut yüklenen içerikle
+        uyuşmaz (eklenen satırlar sonra ikinci kez işlenirdi), bu yüzden
+        yükleme tekrarlanır. Özet, kayıtlı boyut kadar önekten hesaplanır.
+        """
+        try:
+            for _ in range(self.YUKLEME_DENEMESI):
+                stat = stat or os.stat(kaynak.path)
+                value = kaynak.loader(kaynak.path)
+                son = os.stat(kaynak.path)
+                if son.st_size == stat.st_size and son.st_mtime_ns == stat.st_mtime_ns:
+                    break
+                stat = hasher = None
+            else:
+                raise RuntimeError("dosya yükleme sırasında değişmeye devam ediyor")
+            hasher = hasher or _ozet_nesnesi(kaynak.path, boyut=stat.st_size)
+        except Exception as e:
+            kaynak.error = str(e)
+            logger.error("Yükleme hatası (%s): %s", kaynak.path, e)
+            return False
+
+        # Referans değişimi atomik; okuyucular ya eski ya yeni nesneyi görür
+        kaynak.value = value
+        kaynak.mtime = stat.st_mtime_ns
+        kaynak.size = stat.st_size
+        kaynak.inode = stat.st_ino
+        kaynak.hasher = hasher
+        kaynak.digest = hasher.hexdigest()
+        kaynak.error = None
+        kaynak.reloads += 1
+        if kaynak.appender is not None:
+            kaynak._kuyrugu_oku()
+        return True
+
+    def _ekle(self, kaynak, stat):
+        """
+        Dosya yalnızca sonuna satır eklenerek büyüdüyse yeni kısmı okuyup
+        appender'a verir. Ekleme doğrulanamazsa False (tam yükleme gerekir),
+        yazım henüz tamamlanmadıysa None döner. Yerine yeni dosya konduysa
+        (inode değiştiyse) ekleme sayılmaz.
+        """
+        if (kaynak.appender is None or kaynak.value is None or stat.st_ino != kaynak.inode or
+                stat.st_size <= kaynak.size or not kaynak.sentinel.endswith(b'\n')):
+            return False
+
+        with open(kaynak.path, 'rb') as f:
+            f.seek(kaynak.size - len(kaynak.sentinel))
+            if f.read(len(kaynak.sentinel)) != kaynak.sentinel:
+                return False
+            yeni = f.read(stat.st_size - kaynak.size)
+
+        if not yeni.endswith(b'\n'):
+            # Yazım sürüyor; bir sonraki kontrolde tekrar denenir
+            return None
+        return self._uygula(kaynak, yeni, stat)
+
+    def _uygula(self, kaynak, yeni, stat):
+        """Dosyanın kayıtlı boyutundan sonra gelen yeni baytları nesneye işler"""
+        try:
+            kaynak.value = kaynak.appender(kaynak.value, kaynak.header + yeni)
+        except Exception as e:
+            logger.error("Ekleme hatası (%s): %s", kaynak.path, e)
+            return False
+
+        kaynak.hasher.update(yeni)
+        kaynak.digest = kaynak.hasher.hexdigest()
+        kaynak.size += len(yeni)
+        # Dosya bu eklemeden sonra da büyüdüyse mtime eşleşmez; kalan kısım
+        # sonraki kontrolde eklenir
+        kaynak.mtime = stat.st_mtime_ns if stat.st_size == kaynak.size else None
+        kaynak.sentinel = (kaynak.sentinel + yeni)[-kaynak.SENTINEL_BOYU:]
+        kaynak.appends += 1
+        return True
+
+    def push(self, name, offset, data):
+        """
+        Dosyanın offset baytından itibaren eklendiği bilinen satırları
+        (başlıksız) dosyayı okumadan nesneye işler; satırları yazan süreç
+        (ör. veri alma servisi) bunları doğrudan gönderir. Kayıtlı boyut
+        offset ile eşleşmiyorsa False döner, değişiklik check() ile okunur.
+        """
+        with self._lock:
+            kaynak = self._kaynaklar[name]
+            if (kaynak.appender is None or kaynak.value is None or kaynak.size != offset or
+                    not data.endswith(b'\n') or not kaynak.sentinel.endswith(b'\n')):
+                return False
+            try:
+                stat = os.stat(kaynak.path)
+            except OSError:
+                return False
+            if stat.st_ino != kaynak.inode or stat.st_size < offset + len(data):
+                return False
+            return self._uygula(kaynak, data, stat)
+
+    def load_all(self):
+        with self._lock:
+            for kaynak in self._kaynaklar.values():
+                self._yukle(kaynak)
+
+    def check(self):
+        """
+        Değişen dosyaları yeniden yükler, yeniden yüklenenlerin adlarını döndürür
+        """
+        yenilenenler = []
+        with self._lock:
+            for name, kaynak in self._kaynaklar.items():
+                try:
+                    stat = os.stat(kaynak.path)
+                except OSError:
+                    continue
+
+                if (stat.st_mtime_ns == kaynak.mtime and stat.st_size == kaynak.size and
+                        stat.st_ino == kaynak.inode):
+                    continue
+
+                try:
+                    eklendi = self._ekle(kaynak, stat)
+                    if eklendi is None:
+                        continue
+                    if eklendi:
+                        yenilenenler.append(name)
+                        continue
+                    hasher = _ozet_nesnesi(kaynak.path, boyut=stat.st_size)
+                except OSError:
+                    continue
+
+                if hasher.hexdigest() == kaynak.digest:
+                    # Sadece mtime değişmiş (touch vb.), içerik aynı
+                    kaynak.mtime = stat.st_mtime_ns
+                    kaynak.size = stat.st_size
+                    kaynak.inode = stat.st_ino
+                    continue
+
+                if self._yukle(kaynak, stat, hasher):
+                    yenilenenler.append(name)
+        return yenilenenler
+
+    def _izle(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start_watcher(self):
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._izle, name='registry-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    def get(self, name):
+        kaynak = self._kaynaklar[name]
+        if kaynak.value is None:
+            raise RuntimeError(kaynak.error or f'"{name}" henüz yüklenmedi')
+        return kaynak.value
+
+    def version(self, name):
+        return self._kaynaklar[name].digest
+
+    def status(self):
+        return {
+            name: {
+                'path': kaynak.path,
+                'version': kaynak.digest,
+                'reloads': kaynak.reloads,
+                'appends': kaynak.appends,
+                'error': kaynak.error,
+            }
+            for name, kaynak in self._kaynaklar.items()
+        }
@@ -0,0 +1,59 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Boyutu sınırlı LRU yanıt önbelleği. Anahtar (uç nokta, normalize edilmiş
+    parametreler, kaynak sürümleri) üçlüsüdür; katalog ya da model değişince
+    sürüm değiştiği için eski kayıtlar bir daha eşleşmez. Kaynak sürümleri
+    değiştiğinde önbellek ayrıca tamamen boşaltılır.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._kayitlar = OrderedDict()
+        self._surumler = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'not_modified': 0}
+
+    def surumleri_kontrol_et(self, surumler):
+        """Güncel kaynak sürümleri öncekilerden farklıysa önbelleği boşaltır"""
+        with self._lock:
+            if surumler != self._surumler:
+                if self._kayitlar:
+                    self.stats['invalidations'] += 1
+                self._kayitlar.clear()
+                self._surumler = surumler
+
+    def get(self, anahtar):
+        with self._lock:
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is None:
+                self.stats['misses'] += 1
+                return None
+            self._kayitlar.move_to_end(anahtar)
+            self.stats['hits'] += 1
+            return kayit
+
+    def put(self, anahtar, deger):
+        with self._lock:
+            self._kayitlar[anahtar] = deger
+            self._kayitlar.move_to_end(anahtar)
+            while len(self._kayitlar) > self.max_entries:
+                self._kayitlar.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def not_modified(self):
+        with self._lock:
+            self.stats['not_modified'] += 1
+
+    def status(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._kayitlar), max_entries=self.max_entries)
+
+
+def etag(anahtar):
+    """Anahtardan türetilen ETag; aynı anahtar her zaman aynı yanıtı üretir"""
+    return hashlib.sha1(repr(anahtar).encode('utf-8')).hexdigest()
@@ -0,0 +1,147 @@
+import bisect
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+GUN_NS = 86_400 * 10**9
+# Katalog büyüklükleri 0.1 hassasiyetle yayımlanır; en ince aralık budur
+TEMEL_ARALIK = 0.1
+GRUPLAR = ('day', 'location', 'location_day')
+
+
+def _gun(gun_no):
+    return str(np.datetime64(gun_no, 'D'))
+
+
+class _IlGunleri:
+    """Bir ilin gün -> {büyüklük aralığı: sayı} tablosu ve gün başına en büyük deprem"""
+
+    def __init__(self):
+        self.gunler = []  # sıralı gün numaraları
+        self.aralik_sayilari = {}
+        self.maksimum = {}
+
+    def ekle(self, gun, aralik, sayi, maksimum):
+        tablo = self.aralik_sayilari.get(gun)
+        if tablo is None:
+            tablo = self.aralik_sayilari[gun] = defaultdict(int)
+            if not self.gunler or gun > self.gunler[-1]:
+                self.gunler.append(gun)
+            else:
+                bisect.insort(self.gunler, gun)
+        tablo[aralik] += sayi
+        if maksimum > self.maksimum.get(gun, -np.inf):
+            self.maksimum[gun] = maksimum
+
+    def aralik(self, ilk=None, son=None):
+        lo = 0 if ilk is None else bisect.bisect_left(self.gunler, ilk)
+        hi = len(self.gunler) if son is None else bisect.bisect_right(self.gunler, son)
+        return self.gunler[lo:hi]
+
+
+class RollupStore:
+    """
+    İl × gün × büyüklük aralığı özet tabloları. CatalogIndex eklentisi olarak
+    her eklemede yalnızca yeni satırlar tabloya işlenir; sayım ve en büyük
+    değer sıradan bağımsız olduğu için geç gelen kayıtlar da yeniden kurulum
+    gerektirmez. Sorgular satır sayısından değil, aralıktaki gün ve büyüklük
+    aralığı sayısından etkilenir.
+    """
+
+    def __init__(self):
+        self.iller = {}
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Kilit pickle edilemez; anlık görüntüden açılınca yenisi oluşturulur
+        with self._lock:
+            durum = self.__dict__.copy()
+        del durum['_lock']
+        return durum
+
+    def __setstate__(self, durum):
+        self.__dict__.update(durum)
+        self._lock = threading.Lock()
+
+    def append(self, df, index=None):
+        if len(df) == 0:
+            return
+        gunler = df['Tarih_Saat'].to_numpy(dtype='datetime64[ns]').astype(np.int64) // GUN_NS
+        mags = df['Buyukluk'].to_numpy(dtype=np.float64)
+        araliklar = np.floor(mags / TEMEL_ARALIK + 1e-9).astype(np.int64)
+        ozet = pd.DataFrame({'Konum': df['Konum'].astype(str).to_numpy(), 'gun': gunler,
+                             'aralik': araliklar, 'mag': mags})
+        ozet = ozet.groupby(['Konum', 'gun', 'aralik'], sort=True)['mag'].agg(['size', 'max'])
+
+        with self._lock:
+            for (konum, gun, aralik), sayi, maksimum in zip(ozet.index, ozet['size'], ozet['max']):
+                il = self.iller.get(konum)
+                if il is None:
+                    il = self.iller[konum] = _IlGunleri()
+                il.ekle(int(gun), int(aralik), int(sayi), float(maksimum))
+            self.rows += len(df)
+
+    def __contains__(self, konum):
+        return konum in self.iller
+
+    def query(self, konum=None, start=None, end=None, group=None, bin_width=None):
+        """
+        Toplam sayı ve en büyük büyüklük; group ('day', 'location' ya da
+        'location_day') ile grup başına aynı değerler. Tarihler gün
+        hassasiyetindedir, end günü dahildir. bin_width (0.1'in katı) verilirse
+        büyüklük histogramı ve Gutenberg-Richter için kümülatif N(>=M) eklenir.
+        """
+        ilk = None if start is None else pd.Timestamp(start).value // GUN_NS
+        son = None if end is None else pd.Timestamp(end).value // GUN_NS
+        birlestir = 1 if bin_width is None else max(int(round(bin_width / TEMEL_ARALIK)), 1)
+
+        histogram = defaultdict(int)
+        gruplar = defaultdict(lambda: [0, -np.inf])
+        genel = [0, -np.inf]
+        with self._lock:
+            iller = [konum] if konum is not None else sorted(self.iller)
+            for ad in iller:
+                il = self.iller.get(ad)
+                if il is None:
+                    continue
+                for gun in il.aralik(ilk, son):
+                    gun_sayisi = 0
+                    for aralik, sayi in il.aralik_sayilari[gun].items():
+                        histogram[aralik // birlestir] += sayi
+                        gun_sayisi += sayi
+                    hedefler = [genel]
+                    if group:
+                        hedefler.append(gruplar[{'day': gun, 'location': ad, 'location_day': (ad, gun)}[group]])
+                    for hedef in hedefler:
+                        hedef[0] += gun_sayisi
+                        hedef[1] = max(hedef[1], il.maksimum[gun])
+
+        sonuc = {
+            'count': genel[0],
+            'max_magnitude': None if genel[0] == 0 else genel[1],
+        }
+        if group:
+            sonuc['groups'] = []
+            for anahtar, (sayi, maks) in sorted(gruplar.items()):
+                if group == 'day':
+                    satir = {'day': _gun(anahtar)}
+                elif group == 'location':
+                    satir = {'location': anahtar}
+                else:
+                    satir = {'location': anahtar[0], 'day': _gun(anahtar[1])}
+                satir.update(count=sayi, max_magnitude=maks)
+                sonuc['groups'].append(satir)
+        if bin_width is not None:
+            genislik = birlestir * TEMEL_ARALIK
+            kumulatif = 0
+            satirlar = []
+            for aralik in sorted(histogram, reverse=True):
+                kumulatif += histogram[aralik]
+                satirlar.append({'magnitude': round(aralik * genislik, 1), 'count': histogram[aralik],
+                                 'cumulative': kumulatif})
+            sonuc['bin_width'] = round(genislik, 1)
+            sonuc['histogram'] = satirlar[::-1]
+        return sonuc
@@ -0,0 +1,300 @@
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+
+TARIH_FORMATI = '%Y-%m-%d %H:%M:%S'
+DUNYA_YARICAPI_KM = 6371.0088
+# Bir enlem derecesinin yaklaşık uzunluğu (km)
+DERECE_KM = 111.195
+
+SUTUNLAR = ['Tarih', 'Enlem', 'Boylam', 'Derinlik', 'Buyukluk', 'Yer']
+# Gruplama adı -> numpy tarih birimi
+GRUP_BIRIMLERI = {'hour': 'h', 'day': 'D', 'month': 'M'}
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Küre üzerinde büyük daire uzaklığı (km); diziler üzerinde çalışır"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * DUNYA_YARICAPI_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class _Dizi:
+    """Kapasitesi ikiye katlanarak büyüyen tek boyutlu dizi"""
+
+    def __init__(self, dtype, degerler=None):
+        self.n = 0
+        self.veri = np.empty(0, dtype=dtype)
+        if degerler is not None:
+            self.ekle(degerler)
+
+    def ekle(self, degerler):
+        m = len(degerler)
+        if self.n + m > len(self.veri):
+            yeni = np.empty(max(self.n + m, 2 * len(self.veri), 16), dtype=self.veri.dtype)
+            yeni[:self.n] = self.veri[:self.n]
+            self.veri = yeni
+        self.veri[self.n:self.n + m] = degerler
+        self.n += m
+
+    def __call__(self):
+        return self.veri[:self.n]
+
+
+class SpatialIndex:
+    """
+    earthquakes.csv üzerinde zaman/mekan indeksi.
+
+    Satırlar zamana göre sıralı sütun dizilerinde tutulur; zaman aralığı
+    searchsorted ile O(log n) bulunur. Ayrıca hucre derecelik düzenli bir
+    enlem/boylam ızgarası vardır: her hücre, içine düşen satırların
+    konumlarını ve zamanlarını (yine zamana göre sıralı) saklar. Kutu ve
+    yarıçap sorguları yalnızca kesişen hücrelerin zaman dilimlerini tarar.
+
+    Sorgular satır konumları (zamana göre artan) döndürür; events() ve
+    summarize() bu konumları sayfalanmış kayıtlara ya da zaman gruplarına
+    çevirir.
+    """
+
+    def __init__(self, df=None, hucre=0.5):
+        self.hucre = hucre
+        self.n_lon = int(np.ceil(360 / hucre))
+        self._lock = threading.Lock()
+        self._sifirla()
+        if df is not None:
+            self.append(df)
+
+    def __getstate__(self):
+        # Kilit pickle edilemez; anlık görüntüden açılınca yenisi oluşturulur
+        with self._lock:
+            durum = self.__dict__.copy()
+        del durum['_lock']
+        return durum
+
+    def __setstate__(self, durum):
+        self.__dict__.update(durum)
+        self._lock = threading.Lock()
+
+    def _sifirla(self):
+        self._times = _Dizi(np.int64)
+        self._lat = _Dizi(np.float64)
+        self._lon = _Dizi(np.float64)
+        self._depth = _Dizi(np.float64)
+        self._mag = _Dizi(np.float64)
+        self._yer = _Dizi(np.int32)
+        self._yerler = []
+        self._yer_kodu = {}
+        # hücre -> (satır konumları, zamanlar)
+        self._hucreler = {}
+
+    def __len__(self):
+        return self._times.n
+
+    def _hucre_no(self, lat, lon):
+        satir = np.floor((np.clip(lat, -90, 90) + 90) / self.hucre).astype(np.int64)
+        sutun = np.floor((np.clip(lon, -180, 180) + 180) / self.hucre).astype(np.int64)
+        return satir * self.n_lon + np.minimum(sutun, self.n_lon - 1)
+
+    def _kodla(self, yerler):
+        kodlar = np.empty(len(yerler), dtype=np.int32)
+        for i, yer in enumerate(yerler):
+            kod = self._yer_kodu.get(yer)
+            if kod is None:
+                kod = self._yer_kodu[yer] = len(self._yerler)
+                self._yerler.append(yer)
+            kodlar[i] = kod
+        return kodlar
+
+    def append(self, df):
+        """
+        Yeni satırları ekler. Satırlar mevcut son zamandan önce gelmiyorsa
+        yalnızca yeni satırlar işlenir; aksi halde indeks yeniden kurulur.
+        """
+        if len(df) == 0:
+            return
+        df = df.sort_values('Tarih', kind='mergesort')
+        times = df['Tarih'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+        with self._lock:
+            if self._times.n and times[0] < self._times()[-1]:
+                df = pd.concat([self._frame(), df], ignore_index=True).sort_values('Tarih', kind='mergesort')
+                times = df['Tarih'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+                self._sifirla()
+
+            bas = self._times.n
+            lat = df['Enlem'].to_numpy(dtype=np.float64)
+            lon = df['Boylam'].to_numpy(dtype=np.float64)
+            self._times.ekle(times)
+            self._lat.ekle(lat)
+            self._lon.ekle(lon)
+            self._depth.ekle(df['Derinlik'].to_numpy(dtype=np.float64))
+            self._mag.ekle(df['Buyukluk'].to_numpy(dtype=np.float64))
+            self._yer.ekle(self._kodla(df['Yer'].astype(str).to_numpy()))
+
+            # Hücrelere grupla; kararlı sıralama hücre içi zaman sırasını korur
+            hucreler = self._hucre_no(lat, lon)
+            sira = np.argsort(hucreler, kind='stable')
+            sinirlar = np.flatnonzero(np.diff(hucreler[sira])) + 1
+            for grup in np.split(sira, sinirlar):
+                hucre = int(hucreler[grup[0]])
+                if hucre not in self._hucreler:
+                    self._hucreler[hucre] = (_Dizi(np.int64), _Dizi(np.int64))
+                konumlar, zamanlar = self._hucreler[hucre]
+                konumlar.ekle(grup + bas)
+                zamanlar.ekle(times[grup])
+
+    def _frame(self):
+        return pd.DataFrame({
+            'Tarih': self._times().astype('datetime64[ns]'),
+            'Enlem': self._lat(),
+            'Boylam': self._lon(),
+            'Derinlik': self._depth(),
+            'Buyukluk': self._mag(),
+            'Yer': np.array(self._yerler, dtype=object)[self._yer()] if self._yerler else [],
+        })
+
+    def _hucre_araligi(self, lat_min, lat_max, lon_min, lon_max):
+        satir0, satir1 = (int(np.floor((np.clip(x, -90, 90) + 90) / self.hucre)) for x in (lat_min, lat_max))
+        sutun0, sutun1 = (min(int(np.floor((np.clip(x, -180, 180) + 180) / self.hucre)), self.n_lon - 1)
+                          for x in (lon_min, lon_max))
+        hucre_sayisi = (satir1 - satir0 + 1) * (sutun1 - sutun0 + 1)
+        if hucre_sayisi > len(self._hucreler):
+            # Geniş kutu: dolu hücreleri tek tek kontrol etmek daha ucuz
+            return [h for h in self._hucreler
+                    if satir0 <= h // self.n_lon <= satir1 and sutun0 <= h % self.n_lon <= sutun1]
+        return [satir * self.n_lon + sutun
+                for satir in range(satir0, satir1 + 1) for sutun in range(sutun0, sutun1 + 1)]
+
+    def query(self, start=None, end=None, bbox=None, center=None, radius_km=None,
+              min_mag=None, max_mag=None):
+        """
+        Filtrelere uyan satır konumlarını zamana göre artan sırada döndürür.
+        bbox: (lat_min, lat_max, lon_min, lon_max); center: (lat, lon) ve
+        radius_km birlikte verilir. Yarıçap sorgusunda ikinci değer olarak
+        uzaklıklar (km) döner, aksi halde None.
+        """
+        start_ns = None if start is None else pd.Timestamp(start).value
+        end_ns = None if end is None else pd.Timestamp(end).value
+
+        with self._lock:
+            times = self._times()
+            if center is not None:
+                lat0, lon0 = center
+                # Kutu küçük bir payla genişletilir; kesin eleme haversine ile yapılır
+                dlat = radius_km / DERECE_KM * 1.001
+                dlon = radius_km / (DERECE_KM * max(np.cos(np.radians(min(abs(lat0) + dlat, 90.0))), 1e-6))
+                kutu = (lat0 - dlat, lat0 + dlat, lon0 - dlon, lon0 + dlon)
+                if bbox is not None:
+                    kutu = (max(kutu[0], bbox[0]), min(kutu[1], bbox[1]),
+                            max(kutu[2], bbox[2]), min(kutu[3], bbox[3]))
+            else:
+                kutu = bbox
+
+            if kutu is None:
+                lo = 0 if start_ns is None else int(np.searchsorted(times, start_ns, side='left'))
+                hi = len(times) if end_ns is None else int(np.searchsorted(times, end_ns, side='right'))
+                konumlar = np.arange(lo, max(lo, hi), dtype=np.int64)
+            else:
+                parcalar = []
+                if kutu[0] <= kutu[1] and kutu[2] <= kutu[3]:
+                    for hucre in self._hucre_araligi(*kutu):
+                        kayit = self._hucreler.get(hucre)
+                        if kayit is None:
+                            continue
+                        hucre_konum, hucre_zaman = kayit[0](), kayit[1]()
+                        lo = 0 if start_ns is None else int(np.searchsorted(hucre_zaman, start_ns, side='left'))
+                        hi = len(hucre_zaman) if end_ns is None else int(
+                            np.searchsorted(hucre_zaman, end_ns, side='right'))
+                        if hi > lo:
+                            parcalar.append(hucre_konum[lo:hi])
+                konumlar = np.sort(np.concatenate(parcalar)) if parcalar else np.empty(0, dtype=np.int64)
+
+                lat, lon = self._lat()[konumlar], self._lon()[konumlar]
+                maske = ((lat >= kutu[0]) & (lat <= kutu[1]) & (lon >= kutu[2]) & (lon <= kutu[3]))
+                konumlar = konumlar[maske]
+
+            if min_mag is not None or max_mag is not None:
+                mags = self._mag()[konumlar]
+                maske = np.ones(len(konumlar), dtype=bool)
+                if min_mag is not None:
+                    maske &= mags >= min_mag
+                if max_mag is not None:
+                    maske &= mags <= max_mag
+                konumlar = konumlar[maske]
+
+            # Uzaklık en pahalı filtre olduğu için en son hesaplanır
+            uzakliklar = None
+            if center is not None:
+                uzakliklar = haversine_km(center[0], center[1], self._lat()[konumlar], self._lon()[konumlar])
+                maske = uzakliklar <= radius_km
+                konumlar, uzakliklar = konumlar[maske], uzakliklar[maske]
+            return konumlar, uzakliklar
+
+    def events(self, konumlar, uzakliklar=None, limit=100, offset=0, newest_first=True):
+        """Sorgu sonucunun bir sayfasını kayıt listesine çevirir"""
+        sira = np.arange(len(konumlar))
+        if newest_first:
+            sira = sira[::-1]
+        sira = sira[offset:offset + limit]
+        kayitlar = []
+        with self._lock:
+            for i in sira:
+                p = konumlar[i]
+                kayit = {
+                    'Tarih': pd.Timestamp(int(self._times.veri[p])).strftime(TARIH_FORMATI),
+                    'Enlem': float(self._lat.veri[p]),
+                    'Boylam': float(self._lon.veri[p]),
+                    'Derinlik': float(self._depth.veri[p]),
+                    'Buyukluk': float(self._mag.veri[p]),
+                    'Yer': self._yerler[self._yer.veri[p]],
+                }
+                if uzakliklar is not None:
+                    kayit['distance_km'] = round(float(uzakliklar[i]), 3)
+                kayitlar.append(kayit)
+        return kayitlar
+
+    def summarize(self, konumlar, group=None):
+        """
+        Sorgu sonucu için toplam sayı ve en büyük büyüklük; group verilirse
+        (hour/day/month) zaman grubu başına sayı ve en büyük büyüklük
+        """
+        with self._lock:
+            mags = self._mag()[konumlar]
+            times = self._times()[konumlar]
+        ozet = {
+            'count': int(len(konumlar)),
+            'max_magnitude': float(mags.max()) if len(mags) else None,
+        }
+        if group is None:
+            return ozet
+
+        donem = times.astype('datetime64[ns]').astype(f'datetime64[{GRUP_BIRIMLERI[group]}]')
+        # Konumlar zamana göre sıralı olduğundan gruplar ardışıktır
+        degisim = np.flatnonzero(donem[1:] != donem[:-1]) + 1
+        baslar = np.concatenate([[0], degisim]) if len(donem) else np.empty(0, dtype=np.int64)
+        sayilar = np.diff(np.concatenate([baslar, [len(donem)]]))
+        maksimumlar = np.maximum.reduceat(mags, baslar) if len(donem) else []
+        ozet['groups'] = [
+            {'period': str(donem[b]), 'count': int(sayi), 'max_magnitude': float(m)}
+            for b, sayi, m in zip(baslar, sayilar, maksimumlar)
+        ]
+        return ozet
+
+
+def _oku(kaynak):
+    df = pd.read_csv(kaynak)
+    df['Tarih'] = pd.to_datetime(df['Tarih'], format=TARIH_FORMATI)
+    return df[SUTUNLAR]
+
+
+def load_spatial_index(path):
+    return SpatialIndex(_oku(path))
+
+
+def append_spatial_index(index, data):
+    """Registry'den gelen yeni CSV satırlarını (başlık dahil) indekse ekler"""
+    index.append(_oku(io.BytesIO(data)))
+    return index
@@ -0,0 +1,109 @@
+import glob
+import hashlib
+import logging
+import os
+import pickle
+
+from atomic_io import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+# Dosya yollarını düzgün şekilde oluştur
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+snapshot_dir = os.path.join(project_root, 'YapayZekaSon1', 'data', 'snapshots')
+
+_kod_ozeti = None
+
+
+def kod_surumu():
+    """
+    scripts/ altındaki kaynak kodun özeti. Kod değişince sınıfların yapısı
+    da değişmiş olabileceğinden eski anlık görüntüler kullanılmaz.
+    """
+    global _kod_ozeti
+    if _kod_ozeti is None:
+        ozet = hashlib.sha1()
+        for yol in sorted(glob.glob(os.path.join(current_dir, '*.py'))):
+            with open(yol, 'rb') as f:
+                ozet.update(f.read())
+        _kod_ozeti = ozet.hexdigest()
+    return _kod_ozeti
+
+
+def snapshot_path(ad):
+    return os.path.join(snapshot_dir, f'{ad}.pkl')
+
+
+def _onek_ozeti(path, boyut, blok=1024 * 1024):
+    """Dosyanın ilk boyut baytının SHA-1 özet nesnesi"""
+    ozet = hashlib.sha1()
+    kalan = boyut
+    with open(path, 'rb') as f:
+        while kalan > 0:
+            parca = f.read(min(blok, kalan))
+            if not parca:
+                break
+            ozet.update(parca)
+            kalan -= len(parca)
+    return ozet
+
+
+def _oku(ad):
+    try:
+        with open(snapshot_path(ad), 'rb') as f:
+            goruntu = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Anlık görüntü okunamadı (%s): %s", ad, e)
+        return None
+    if not isinstance(goruntu, dict) or goruntu.get('code') != kod_surumu():
+        return None
+    return goruntu
+
+
+def _kaydet(ad, boyut, ozet, value):
+    try:
+        atomic_write_bytes(snapshot_path(ad), pickle.dumps(
+            {'code': kod_surumu(), 'size': boyut, 'digest': ozet, 'value': value},
+            protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception as e:
+        logger.warning("Anlık görüntü yazılamadı (%s): %s", ad, e)
+
+
+def snapshot_loader(ad, loader, appender):
+    """
+    Registry yükleyicisini anlık görüntüyle sarar. Dosyanın ilk N baytı
+    kayıtlı görüntüyle aynıysa nesne pickle'dan açılır, sonradan eklenen
+    satırlar appender ile işlenir; CSV'yi baştan okuyup özellik durumunu
+    yeniden kurmak gerekmez. Aksi halde loader ile kurulur. Her iki durumda
+    da görüntü dosyanın son haliyle güncellenir.
+    """
+    def yukle(path):
+        bilgi = os.stat(path)
+        goruntu = _oku(ad)
+        if goruntu is not None and goruntu['size'] <= bilgi.st_size:
+            ozet = _onek_ozeti(path, goruntu['size'])
+            if ozet.hexdigest() == goruntu['digest']:
+                if goruntu['size'] == bilgi.st_size:
+                    return goruntu['value']
+                with open(path, 'rb') as f:
+                    baslik = f.readline()
+                    f.seek(goruntu['size'])
+                    kuyruk = f.read(bilgi.st_size - goruntu['size'])
+                if kuyruk.endswith(b'\n'):
+                    value = appender(goruntu['value'], baslik + kuyruk)
+                    ozet.update(kuyruk)
+                    _kaydet(ad, bilgi.st_size, ozet.hexdigest(), value)
+                    return value
+
+        value = loader(path)
+        # Okuma sırasında dosya değiştiyse görüntü hangi bayta kadar olduğu
+        # bilinmeyen bir içerikle eşleşir; kaydedilmez
+        son = os.stat(path)
+        if (son.st_size, son.st_mtime_ns) == (bilgi.st_size, bilgi.st_mtime_ns):
+            _kaydet(ad, bilgi.st_size, _onek_ozeti(path, bilgi.st_size).hexdigest(), value)
+        return value
+
+    return yukle
@@ -0,0 +1,143 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+TEST_DIZINI = os.path.dirname(os.path.abspath(__file__))
+KOK = os.path.dirname(TEST_DIZINI)
+FIXTURE_DIZINI = os.path.join(TEST_DIZINI, 'fixtures')
+sys.path.insert(0, os.path.join(KOK, 'scripts'))
+
+
+def fixture_yolu(ad):
+    return os.path.join(FIXTURE_DIZINI, ad)
+
+
+def bos_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class SayfaSunucusu:
+    """
+    Yanıtları test tarafından belirlenen yerel HTTP sunucusu. yanitla(istek)
+    (durum kodu, başlıklar, gövde) döndürür; gelen istekler zamanıyla kaydedilir.
+    """
+
+    def __init__(self, yanitla):
+        self.istekler = []
+        sunucu = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                sunucu.istekler.append((time.monotonic(), dict(self.headers)))
+                durum, basliklar, govde = yanitla(self)
+                self.send_response(durum)
+                for ad, deger in basliklar.items():
+                    self.send_header(ad, deger)
+                self.send_header('Content-Length', str(len(govde)))
+                self.end_headers()
+                self.wfile.write(govde)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}/scripts/lst0.asp'
+
+    def kapat(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def sayfa_sunucusu():
+    sunucular = []
+
+    def baslat(yanitla):
+        sunucu = SayfaSunucusu(yanitla)
+        sunucular.append(sunucu)
+        return sunucu
+
+    yield baslat
+    for sunucu in sunucular:
+        sunucu.kapat()
+
+
+@pytest.fixture
+def veri_dizini(tmp_path, monkeypatch):
+    """
+    Katalog modüllerinin dosya yollarını geçici proje ağacının
+    (tmp/YapayZekaSon1/data) altına yönlendirir
+    """
+    import columnar_store
+    import data_processing
+    import data_scrapper
+    import earthquake_store
+    import geo_labeling
+
+    dizin = tmp_path / 'YapayZekaSon1' / 'data'
+    dizin.mkdir(parents=True)
+    monkeypatch.setattr(earthquake_store, 'data_dir', str(dizin))
+    for ad in ('csv_path', 'keys_path', 'state_path', 'journal_path', 'lock_path', 'changes_path'):
+        monkeypatch.setattr(earthquake_store, ad, str(dizin / os.path.basename(getattr(earthquake_store, ad))))
+    monkeypatch.setattr(data_scrapper, 'data_dir', str(dizin))
+    monkeypatch.setattr(data_scrapper, 'state_path', str(dizin / 'scraper_state.json'))
+    monkeypatch.setattr(columnar_store, 'data_dir', str(dizin))
+    monkeypatch.setattr(columnar_store, 'store_root', str(dizin / 'columnar'))
+    monkeypatch.setattr(data_processing, 'input_csv_path', str(dizin / 'earthquakes.csv'))
+    monkeypatch.setattr(data_processing, 'output_csv_path', str(dizin / 'updated_earthquakes.csv'))
+    monkeypatch.setattr(data_processing, 'state_path', str(dizin / 'processing_state.json'))
+    # Etiketleme depodaki il kutularıyla, poligonsuz yapılır
+    monkeypatch.setattr(geo_labeling, 'kutular_path', os.path.join(KOK, 'data', 'turkiye_il_koordinatlari.json'))
+    monkeypatch.setattr(geo_labeling, 'poligon_path', str(dizin / 'il_sinirlari.geojson'))
+    monkeypatch.setattr(geo_labeling, '_etiketleyici', None)
+    return dizin
+
+
+@pytest.fixture
+def api_sureci(veri_dizini):
+    """
+    API'yi geçici proje ağacındaki scripts/ kopyasından ayrı süreçte başlatır
+    ve adresini döndürür. api.py içe aktarılırken katalogları varsayılan
+    yollarından yüklediği için test sürecinde açılmaz; katalog önceden
+    veri_dizini altına yazılmış olmalıdır.
+    """
+    kok = veri_dizini.parent
+    surecler = []
+
+    def baslat():
+        if not (kok / 'scripts').exists():
+            shutil.copytree(os.path.join(KOK, 'scripts'), kok / 'scripts',
+                            ignore=shutil.ignore_patterns('__pycache__'))
+        port = bos_port()
+        api = subprocess.Popen([sys.executable, str(kok / 'scripts' / 'api.py'), '--serve', '--port', str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        surecler.append(api)
+        api_url = f'http://127.0.0.1:{port}'
+        bitis = time.monotonic() + 120
+        while True:
+            try:
+                if requests.get(f'{api_url}/api/earthquakes/count', timeout=5).status_code == 200:
+                    return api_url
+            except requests.ConnectionError:
+                pass
+            assert api.poll() is None and time.monotonic() < bitis, 'API başlatılamadı'
+            time.sleep(0.2)
+
+    yield baslat
+    for api in surecler:
+        api.terminate()
+        api.wait(30)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog_index import TARIH_FORMATI, CatalogIndex
+
+
+def katalog(n, baslangic='2024-01-01', tohum=0):
+    rng = np.random.default_rng(tohum)
+    return pd.DataFrame({
+        'Tarih_Saat': pd.Timestamp(baslangic) + pd.to_timedelta(np.sort(rng.integers(0, 90 * 86400, n)), unit='s'),
+        'Konum': rng.choice(['ANKARA', 'IZMIR', 'VAN', 'MUĞLA'], n),
+        # 0.1 adımlı büyüklükler: eşit büyüklükler sık
+        'Buyukluk': np.round(rng.gamma(2.0, 0.8, n) + 1.0, 1),
+    })
+
+
+def referans(df, k, konum=None, start=None, end=None):
+    """Süz, büyüklüğe göre kararlı sırala, ilk k satırı al"""
+    if konum is not None:
+        df = df[df['Konum'] == konum]
+    if start is not None:
+        df = df[df['Tarih_Saat'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['Tarih_Saat'] <= pd.Timestamp(end)]
+    df = df.sort_values('Buyukluk', ascending=False, kind='mergesort').head(k)
+    return [{'Tarih_Saat': t.strftime(TARIH_FORMATI), 'Konum': konum_, 'Buyukluk': float(m)}
+            for t, konum_, m in zip(df['Tarih_Saat'], df['Konum'], df['Buyukluk'])]
+
+
+@pytest.fixture(scope='module')
+def indeks_ve_katalog():
+    # Üç ekleme: ilk yükleme, sıralı ekleme ve geç gelen (daha eski) kayıtlar
+    parcalar = [katalog(3000, tohum=1), katalog(500, '2024-03-31', tohum=2), katalog(300, '2024-01-15', tohum=3)]
+    indeks = CatalogIndex(parcalar[0], top_k=20)
+    for parca in parcalar[1:]:
+        indeks.append(parca)
+    return indeks, pd.concat(parcalar, ignore_index=True)
+
+
+ARALIKLAR = [(None, None), ('2024-02-01', None), (None, '2024-01-20 12:00:00'),
+             ('2024-02-10', '2024-02-11'), ('2024-03-01 06:00:00', '2024-05-01'), ('2030-01-01', None)]
+
+
+@pytest.mark.parametrize('konum', [None, 'ANKARA', 'MUĞLA', 'ATLANTIS'])
+@pytest.mark.parametrize('start,end', ARALIKLAR)
+@pytest.mark.parametrize('k', [1, 5, 20, 60])
+def test_en_buyukler_sirala_ve_dilimle_ile_ayni(indeks_ve_katalog, k, konum, start, end):
+    indeks, df = indeks_ve_katalog
+    assert indeks.largest(k, konum=konum, start=start, end=end) == referans(df, k, konum, start, end)
+
+
+@pytest.mark.parametrize('konum', [None, 'VAN', 'ATLANTIS'])
+@pytest.mark.parametrize('start,end', ARALIKLAR)
+def test_sayim_suzme_ile_ayni(indeks_ve_katalog, konum, start, end):
+    indeks, df = indeks_ve_katalog
+    assert indeks.count(konum, start, end) == len(referans(df, len(df), konum, start, end))
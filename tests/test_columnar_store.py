@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+from atomic_io import atomic_write_json, read_json
+
+
+def csv_yaz(path, n=300, tohum=0):
+    rng = np.random.default_rng(tohum)
+    df = pd.DataFrame({
+        'Tarih_Saat': pd.date_range('2024-01-20', periods=n, freq='3h').strftime('%Y-%m-%d %H:%M:%S'),
+        'Konum': rng.choice(['ANKARA', 'IZMIR', 'VAN'], n),
+        'Buyukluk': np.round(rng.uniform(1.0, 5.0, n), 1),
+    })
+    df.loc[0, 'Buyukluk'] = 2.3
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def test_buyukluk_csv_ile_birebir_ayni(veri_dizini):
+    path = veri_dizini / 'updated_earthquakes.csv'
+    beklenen = csv_yaz(path)
+    columnar_store.build_from_csv('updated_earthquakes', str(path))
+
+    df = columnar_store.read_catalog('updated_earthquakes')
+    assert df['Buyukluk'].iloc[0] == 2.3
+    np.testing.assert_array_equal(df['Buyukluk'].to_numpy(), beklenen['Buyukluk'].to_numpy())
+    assert list(df['Konum'].astype(str)) == list(beklenen['Konum'])
+
+
+def test_eski_semali_katalog_yeniden_kurulur(veri_dizini):
+    path = veri_dizini / 'updated_earthquakes.csv'
+    csv_yaz(path)
+    manifest = columnar_store.write_catalog('updated_earthquakes', pd.DataFrame({
+        'Tarih_Saat': pd.to_datetime(['2024-01-01']), 'Konum': ['VAN'], 'Buyukluk': [2.3]}),
+        source_size=path.stat().st_size)
+    # float32 şemayla yazılmış (önceki sürüm) katalog
+    manifest['schema'] = dict(manifest['schema'], Buyukluk='float32')
+    yol = os.path.join(columnar_store.catalog_dir('updated_earthquakes'), 'manifest.json')
+    atomic_write_json(yol, manifest)
+
+    assert columnar_store.sync_with_csv('updated_earthquakes', str(path), path.stat().st_size)
+    assert read_json(yol)['schema'] == columnar_store.SEMALAR['updated_earthquakes']['columns']
+    assert len(columnar_store.read_catalog('updated_earthquakes')) == 300
+    assert not columnar_store.sync_with_csv('updated_earthquakes', str(path), path.stat().st_size)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+
+import compact_model
+
+
+@pytest.fixture
+def kompakt_dizini(tmp_path, monkeypatch):
+    monkeypatch.setattr(compact_model, 'compact_root', str(tmp_path / 'compact'))
+    return tmp_path / 'compact'
+
+
+def ornekler(n=2000, tohum=0):
+    """Eğitimdeki gibi dokuz özellik; bazı değerler eksik (NaN)"""
+    rng = np.random.default_rng(tohum)
+    X = rng.normal(size=(n, 9))
+    X[:, 0] = rng.integers(0, 81, n)
+    X[rng.random((n, 9)) < 0.05] = np.nan
+    y_mag = np.round(np.nan_to_num(X[:, 1]) + rng.uniform(1.0, 5.0, n), 1)
+    y_time = rng.integers(0, 5, n)
+    return X, y_mag, y_time
+
+
+def test_regresyon_tahminleri_sklearn_ile_ayni(kompakt_dizini):
+    X, y_mag, _ = ornekler()
+    model = RandomForestRegressor(n_estimators=25, max_depth=12, random_state=0).fit(X, y_mag)
+    kompakt = compact_model.load_forest(compact_model.export_forest(model, 'magnitude_model'))
+
+    test, _, _ = ornekler(500, tohum=1)
+    np.testing.assert_array_equal(kompakt.predict(test), model.predict(test))
+    with pytest.raises(AttributeError):
+        kompakt.predict_proba(test)
+
+
+def test_siniflandirma_tahminleri_sklearn_ile_ayni(kompakt_dizini):
+    X, _, y_time = ornekler()
+    model = RandomForestClassifier(n_estimators=25, class_weight='balanced', random_state=0).fit(X, y_time)
+    kompakt = compact_model.load_forest(compact_model.export_forest(model, 'time_model'), mmap=False)
+
+    test, _, _ = ornekler(500, tohum=1)
+    np.testing.assert_array_equal(kompakt.predict_proba(test), model.predict_proba(test))
+    np.testing.assert_array_equal(kompakt.predict(test), model.predict(test))
+    np.testing.assert_array_equal(kompakt.classes_, model.classes_)
+
+
+def test_yeni_surum_eski_surumleri_temizler(kompakt_dizini):
+    X, y_mag, _ = ornekler(300)
+    for tohum in range(3):
+        model = RandomForestRegressor(n_estimators=3, random_state=tohum).fit(X, y_mag)
+        yol = compact_model.export_forest(model, 'magnitude_model')
+    assert compact_model.load_forest(yol).meta['version'] == 3
+    assert sorted(p.name for p in kompakt_dizini.iterdir() if p.is_dir()) == \
+        ['magnitude_model.v2', 'magnitude_model.v3']
+    np.testing.assert_array_equal(compact_model.load_forest(yol).predict(X), model.predict(X))
+
+
+def test_encoder_kodlari_ayni(kompakt_dizini):
+    encoder = LabelEncoder().fit(['VAN', 'ANKARA', 'IZMIR', 'MUĞLA'])
+    kompakt = compact_model.load_encoder(compact_model.export_encoder(encoder))
+    iller = ['IZMIR', 'MUĞLA', 'VAN', 'ANKARA', 'IZMIR']
+    np.testing.assert_array_equal(kompakt.transform(iller), encoder.transform(iller))
+    with pytest.raises(ValueError):
+        kompakt.transform(['ATLANTIS'])
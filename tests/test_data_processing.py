@@ -0,0 +1,101 @@
+import io
+
+import pandas as pd
+import pytest
+
+import columnar_store
+import data_processing
+import earthquake_store
+from registry import Registry
+from test_earthquake_store import olaylar, katalog
+
+
+def beklenen_cikti():
+    """Ham kataloğun baştan etiketlenmiş hâli: artımlı işlemenin varması gereken çıktı"""
+    return data_processing.etiketle(katalog()).to_csv(
+        index=False, date_format=data_processing.TARIH_FORMATI).encode('utf-8')
+
+
+def cikti():
+    with open(data_processing.output_csv_path, 'rb') as f:
+        return f.read()
+
+
+def revize(df, i, buyukluk):
+    """i numaralı olayın büyüklüğü değişmiş kopyası (Kandilli REVIZE satırı)"""
+    df = df.iloc[[i]].copy()
+    df['Buyukluk'] = buyukluk
+    return df
+
+
+def test_gec_gelen_olay_ve_revize_ciktiya_yansir(veri_dizini):
+    ilk = olaylar('2024-01-01', 200, tohum=1)
+    earthquake_store.merge(ilk)
+    data_processing.tam_isle()
+    columnar_store.build_from_csv('updated_earthquakes', data_processing.output_csv_path)
+
+    earthquake_store.merge(olaylar('2024-01-01 03:20', 5, tohum=2))
+    data_processing.artimli_isle()
+    assert cikti() == beklenen_cikti()
+
+    # Filigrandan eski geç gelen olay ve büyüklüğü revize edilen eski olay
+    gec = olaylar('2024-01-01 01:00:30', 1, tohum=3)
+    earthquake_store.merge(pd.concat([gec, revize(ilk, 100, 4.9)]))
+    data_processing.artimli_isle()
+
+    veri = cikti()
+    assert veri == beklenen_cikti()
+    durum = data_processing.islem_durumu()
+    assert durum['output_size'] == len(veri)
+    assert durum['rows'] == 206
+    assert durum['watermark']['Tarih'] == '2024-01-01 03:24:00'
+
+    sutunlu = columnar_store.read_catalog('updated_earthquakes')
+    dosya = pd.read_csv(io.BytesIO(veri), parse_dates=['Tarih_Saat'])
+    assert columnar_store.source_size('updated_earthquakes') == len(veri)
+    assert (sutunlu['Tarih_Saat'].to_numpy() == dosya['Tarih_Saat'].to_numpy()).all()
+    assert list(sutunlu['Konum'].astype(str)) == list(dosya['Konum'])
+
+    # Değişiklikler bir kez işlenir
+    data_processing.artimli_isle()
+    assert cikti() == veri
+
+
+def test_yarida_kalan_kirpma_tamamlanir(veri_dizini, monkeypatch):
+    ilk = olaylar('2024-01-01', 100, tohum=1)
+    earthquake_store.merge(ilk)
+    data_processing.tam_isle()
+    earthquake_store.merge(revize(ilk, 10, 0.5))
+
+    asil = data_processing.atomic_truncate
+
+    def kesinti(*args, **kwargs):
+        raise OSError("disk dolu")
+
+    monkeypatch.setattr(data_processing, 'atomic_truncate', kesinti)
+    with pytest.raises(OSError):
+        data_processing.artimli_isle()
+    monkeypatch.setattr(data_processing, 'atomic_truncate', asil)
+
+    data_processing.artimli_isle()
+    assert cikti() == beklenen_cikti()
+
+
+def test_api_yeniden_yazilan_kuyrugu_ekleme_sanmaz(veri_dizini):
+    ilk = olaylar('2024-01-01', 400, tohum=1)
+    earthquake_store.merge(ilk)
+    data_processing.tam_isle()
+
+    registry = Registry()
+    registry.register('catalog', data_processing.output_csv_path, pd.read_csv,
+                      lambda df, veri: pd.concat([df, pd.read_csv(io.BytesIO(veri))], ignore_index=True))
+    registry.load_all()
+
+    # Aynı uzunlukta, sentinel penceresinden eski bir revizyon ve sona yeni olay
+    earthquake_store.merge(pd.concat([revize(ilk, 10, 4.9), olaylar('2024-01-01 06:40', 1, tohum=2)]))
+    data_processing.artimli_isle()
+
+    assert registry.check() == ['catalog']
+    df = registry.get('catalog')
+    assert len(df) == 401
+    assert df['Buyukluk'].iloc[10] == 4.9
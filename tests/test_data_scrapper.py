@@ -0,0 +1,124 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+import requests
+
+import data_scrapper
+from conftest import fixture_yolu
+
+
+def sayfa_baytlari():
+    with open(fixture_yolu('lst0.asp'), 'rb') as f:
+        return f.read()
+
+
+def eski_ayristirici(text):
+    """Önceki satır satır strptime/split ayrıştırıcısı (karşılaştırma için)"""
+    data = []
+    for line in text.split("\n")[6:]:
+        if line.strip() and len(line) > 120:
+            try:
+                parts = line.split()
+                data.append({
+                    'Tarih': datetime.strptime(f"{parts[0]} {parts[1]}", "%Y.%m.%d %H:%M:%S"),
+                    'Enlem': float(parts[2]),
+                    'Boylam': float(parts[3]),
+                    'Derinlik': float(parts[4]),
+                    'Buyukluk': float(parts[6]),
+                    'Yer': ' '.join(parts[8:]).strip(),
+                })
+            except Exception:
+                continue
+    return pd.DataFrame(data)
+
+
+def test_ayristirma_eski_ayristiriciyla_ayni():
+    metin = sayfa_baytlari().decode(data_scrapper.KODLAMA)
+    yeni = data_scrapper.parse_kandilli(metin)
+    eski = eski_ayristirici(metin)
+
+    assert len(yeni) == 9  # ML'si olmayan satır atlanır
+    pd.testing.assert_frame_equal(yeni.drop(columns='Tarih'), eski.drop(columns='Tarih'), check_dtype=False)
+    assert (yeni['Tarih'].to_numpy() == pd.to_datetime(eski['Tarih']).to_numpy()).all()
+
+    # Büyüklük ML sütunudur (MD ve Mw değil); çok kelimeli yer adı korunur
+    satir = yeni[yeni['Yer'].str.startswith('EKINOZU')].iloc[0]
+    assert satir['Buyukluk'] == 4.2
+    assert satir['Yer'] == 'EKINOZU (KAHRAMANMARAS) REVIZE01 (2024.01.28 13:20:05)'
+    assert 'GIRIT ADASI ACIKLARI (AKDENIZ) İlksel' in set(yeni['Yer'])
+    assert 'GÖKSU-HINIS (ERZURUM) İlksel' in set(yeni['Yer'])
+
+
+@pytest.fixture
+def birlestirme_sayaci(monkeypatch):
+    cagrilar = []
+    asil = data_scrapper.merge_catalog
+
+    def sayan(new_df):
+        cagrilar.append(len(new_df))
+        return asil(new_df)
+
+    monkeypatch.setattr(data_scrapper, 'merge_catalog', sayan)
+    return cagrilar
+
+
+def test_304_birlestirmeyi_atlar(veri_dizini, sayfa_sunucusu, birlestirme_sayaci):
+    govde = sayfa_baytlari()
+
+    def yanitla(istek):
+        if istek.headers.get('If-None-Match') == '"v1"':
+            return 304, {'ETag': '"v1"'}, b''
+        return 200, {'ETag': '"v1"', 'Content-Type': 'text/html; charset=utf-8'}, govde
+
+    sunucu = sayfa_sunucusu(yanitla)
+    session = data_scrapper.create_session(retries=0)
+
+    kuyruk = data_scrapper.get_kandilli_data([sunucu.url], session=session)
+    assert len(kuyruk) == 9
+    assert data_scrapper.get_kandilli_data([sunucu.url], session=session) is None
+    assert sunucu.istekler[1][1].get('If-None-Match') == '"v1"'
+    assert birlestirme_sayaci == [9]
+
+
+def test_ayni_icerik_ozeti_birlestirmeyi_atlar(veri_dizini, sayfa_sunucusu, birlestirme_sayaci):
+    govde = sayfa_baytlari()
+    sunucu = sayfa_sunucusu(lambda istek: (200, {}, govde))
+    session = data_scrapper.create_session(retries=0)
+
+    assert len(data_scrapper.get_kandilli_data([sunucu.url], session=session)) == 9
+    assert data_scrapper.get_kandilli_data([sunucu.url], session=session) is None
+    assert len(sunucu.istekler) == 2
+    assert birlestirme_sayaci == [9]
+
+
+def test_5xx_bekleyerek_yeniden_denenir(sayfa_sunucusu):
+    govde = sayfa_baytlari()
+
+    def yanitla(istek):
+        if len(sunucu.istekler) <= 2:
+            return 503, {}, b'bakim'
+        return 200, {}, govde
+
+    sunucu = sayfa_sunucusu(yanitla)
+    session = data_scrapper.create_session(retries=3, backoff=0.2)
+    icerik, kayit = data_scrapper.fetch_page(session, sunucu.url)
+
+    assert icerik == govde
+    assert len(sunucu.istekler) == 3
+    # İlk yeniden deneme hemen, ikincisi backoff * 2 saniye sonra yapılır
+    assert sunucu.istekler[2][0] - sunucu.istekler[1][0] >= 0.35
+
+
+def test_5xx_surerse_hata_cagirana_iletilir(veri_dizini, sayfa_sunucusu, birlestirme_sayaci, monkeypatch):
+    sunucu = sayfa_sunucusu(lambda istek: (503, {}, b'bakim'))
+    oturum = data_scrapper.create_session
+    monkeypatch.setattr(data_scrapper, 'create_session', lambda pool_size=8: oturum(pool_size, 2, 0))
+    session = data_scrapper.create_session()
+
+    with pytest.raises(requests.RequestException):
+        data_scrapper.get_kandilli_data([sunucu.url], session=session)
+    assert len(sunucu.istekler) == 3
+    # Oturum verilmeyen komut satırı yolu hatayı raporlayıp None döndürür
+    assert data_scrapper.get_kandilli_data([sunucu.url]) is None
+    assert birlestirme_sayaci == []
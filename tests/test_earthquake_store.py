@@ -0,0 +1,160 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import earthquake_store
+
+
+def olaylar(baslangic, n, tohum=0, siklik='min'):
+    rng = np.random.default_rng(tohum)
+    return pd.DataFrame({
+        'Tarih': pd.date_range(baslangic, periods=n, freq=siklik),
+        'Enlem': np.round(rng.uniform(36.0, 42.0, n), 4),
+        'Boylam': np.round(rng.uniform(26.0, 45.0, n), 4),
+        'Derinlik': np.round(rng.uniform(1.0, 30.0, n), 1),
+        'Buyukluk': np.round(rng.uniform(1.0, 5.0, n), 1),
+        'Yer': 'MERKEZ (ANKARA)',
+    })
+
+
+def katalog():
+    return earthquake_store.read_since('1900-01-01')
+
+
+def test_disaridan_degistirilen_csv_kirpilmaz(veri_dizini):
+    earthquake_store.merge(olaylar('2024-01-01', 640, tohum=1))
+
+    # Depo dışında geçmiş verilerle doldurulmuş (daha büyük, en yeni en üstte) dosya
+    gecmis = olaylar('2023-11-01', 640, tohum=2, siklik='15min')
+    yedek = pd.concat([katalog(), gecmis]).sort_values('Tarih', ascending=False)
+    yedek['Tarih'] = yedek['Tarih'].dt.strftime(earthquake_store.TARIH_FORMATI)
+    yedek.to_csv(earthquake_store.csv_path, index=False)
+
+    earthquake_store.merge(olaylar('2024-02-01', 5, tohum=3))
+    df = katalog()
+    assert len(df) == 1285
+    assert df['Tarih'].is_monotonic_increasing
+    assert df['Tarih'].max() == pd.Timestamp('2024-02-01 00:04:00')
+    assert df['Tarih'].min() == pd.Timestamp('2023-11-01')
+
+
+def test_ayni_boyutta_degistirilen_csv_yeniden_dizinlenir(veri_dizini):
+    earthquake_store.merge(olaylar('2024-01-01', 50, tohum=1))
+    with open(earthquake_store.csv_path, 'rb') as f:
+        veri = f.read()
+    # Aynı boyutlu, farklı içerikli dosya: ilk olay iki ay sonraya taşınır
+    satir = veri.splitlines()[1]
+    yeni = satir.replace(b'2024-01-01', b'2024-03-01', 1)
+    assert len(yeni) == len(satir)
+    stat = os.stat(earthquake_store.csv_path)
+    with open(earthquake_store.csv_path, 'wb') as f:
+        f.write(veri.replace(satir, yeni, 1))
+    os.utime(earthquake_store.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    df = earthquake_store.read_since('2024-02-01')
+    assert len(df) == 1 and df['Tarih'].iloc[0] == pd.Timestamp('2024-03-01')
+    assert katalog()['Tarih'].is_monotonic_increasing
+
+
+def test_yarida_kalan_yazim_gunlukle_geri_alinir(veri_dizini, monkeypatch):
+    earthquake_store.merge(olaylar('2024-01-01', 100, tohum=1))
+    with open(earthquake_store.csv_path, 'rb') as f:
+        onceki = f.read()
+
+    def coker(*args, **kwargs):
+        raise OSError('güç kesildi')
+
+    # Veri dosyaları yazıldı, durum yazılamadan süreç öldü
+    asil = earthquake_store._durumu_kaydet
+    monkeypatch.setattr(earthquake_store, '_durumu_kaydet', coker)
+    yeni = olaylar('2024-01-01 00:30:30', 50, tohum=2)
+    try:
+        earthquake_store.merge(yeni)
+    except OSError:
+        pass
+    monkeypatch.setattr(earthquake_store, '_durumu_kaydet', asil)
+    assert os.path.exists(earthquake_store.journal_path)
+    assert os.path.getsize(earthquake_store.csv_path) != len(onceki)
+
+    assert len(katalog()) == 100
+    assert not os.path.exists(earthquake_store.journal_path)
+    with open(earthquake_store.csv_path, 'rb') as f:
+        assert f.read() == onceki
+    # Tekrar denenen birleştirme eksiksiz yazılır
+    earthquake_store.merge(yeni)
+    assert len(katalog()) == 150
+
+
+def test_tamamlanan_yazimin_gunlugu_silinir(veri_dizini, monkeypatch):
+    earthquake_store.merge(olaylar('2024-01-01', 100, tohum=1))
+    yedek = earthquake_store.journal_path + '.yedek'
+    asil = earthquake_store._durumu_kaydet
+
+    def kopyalayan(*args, **kwargs):
+        shutil.copy(earthquake_store.journal_path, yedek)
+        return asil(*args, **kwargs)
+
+    # Durum yazıldı, günlük silinemeden süreç öldü
+    monkeypatch.setattr(earthquake_store, '_durumu_kaydet', kopyalayan)
+    earthquake_store.merge(olaylar('2024-01-01 00:30:30', 50, tohum=2))
+    monkeypatch.setattr(earthquake_store, '_durumu_kaydet', asil)
+    os.replace(yedek, earthquake_store.journal_path)
+
+    assert len(katalog()) == 150
+    assert not os.path.exists(earthquake_store.journal_path)
+
+
+def test_birlestirme_ekler_gunceller_ve_tekrarlari_atlar(veri_dizini):
+    mevcut = olaylar('2024-01-01', 100, tohum=1)
+    _, kuyruk, istatistik = earthquake_store.merge(mevcut)
+    assert len(kuyruk) == 100 and istatistik['eklenen'] == 100
+    surum, _ = earthquake_store.changes_since(0)
+
+    ayni = mevcut.iloc[60:70]
+    revize = mevcut.iloc[[40, 80, 95]].copy()
+    revize['Buyukluk'] += 0.5
+    revize.loc[revize.index[0], 'Derinlik'] = 7.0
+    sonra = olaylar('2024-01-01 01:40', 5, tohum=2)
+    gec = olaylar('2024-01-01 00:50:30', 2, tohum=3)
+    # Aynı sayfada tekrarlanan kayıt: ilki geçerli
+    tekrar = sonra.iloc[[0]].assign(Buyukluk=9.9)
+    sayfa = pd.concat([sonra, ayni, revize, gec, tekrar])
+
+    baslangic, kuyruk, istatistik = earthquake_store.merge(sayfa)
+    assert {k: istatistik[k] for k in ('eklenen', 'guncellenen', 'ayni')} == \
+        {'eklenen': 7, 'guncellenen': 3, 'ayni': 10}
+    assert istatistik['boyut'] == os.path.getsize(earthquake_store.csv_path)
+    assert baslangic == sayfa['Tarih'].min()
+
+    df = katalog()
+    assert len(df) == 107 and df['Tarih'].is_monotonic_increasing
+    pd.testing.assert_frame_equal(kuyruk, df[df['Tarih'] >= baslangic].reset_index(drop=True))
+    anahtar = df.set_index(['Tarih', 'Enlem', 'Boylam'])
+    for r in revize.itertuples():
+        assert anahtar.loc[(r.Tarih, r.Enlem, r.Boylam), 'Buyukluk'] == r.Buyukluk
+        assert anahtar.loc[(r.Tarih, r.Enlem, r.Boylam), 'Derinlik'] == r.Derinlik
+    ilk = sonra.iloc[0]
+    assert anahtar.loc[(ilk.Tarih, ilk.Enlem, ilk.Boylam), 'Buyukluk'] == ilk.Buyukluk
+    # Değişen en eski an: revize edilen en eski olay
+    assert earthquake_store.changes_since(surum) == (surum + 1, revize['Tarih'].min())
+
+    # Aynı sayfa yeniden: değişiklik yok, dosya yazılmaz
+    with open(earthquake_store.csv_path, 'rb') as f:
+        onceki = f.read()
+    baslangic, kuyruk, istatistik = earthquake_store.merge(sayfa)
+    assert (baslangic, kuyruk) == (None, None)
+    assert (istatistik['eklenen'], istatistik['guncellenen'], istatistik['ayni']) == (0, 0, 20)
+    with open(earthquake_store.csv_path, 'rb') as f:
+        assert f.read() == onceki
+    assert earthquake_store.changes_since(surum + 1) == (surum + 1, None)
+
+    # Anahtar dizini baştan kurulanla aynı
+    with open(earthquake_store.keys_path, 'rb') as f:
+        anahtarlar = f.read()
+    earthquake_store.rebuild()
+    with open(earthquake_store.keys_path, 'rb') as f:
+        assert f.read() == anahtarlar
+    with open(earthquake_store.csv_path, 'rb') as f:
+        assert f.read() == onceki
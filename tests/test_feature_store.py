@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from feature_store import SONAY_OZELLIKLERI, compute_features
+
+
+def katalog(n=600, tohum=0):
+    """Üç ilde rastgele depremler; her ilde aynı anda olan depremler de var"""
+    rng = np.random.default_rng(tohum)
+    baslangic = pd.Timestamp('2024-01-01')
+    zamanlar = baslangic + pd.to_timedelta(np.sort(rng.integers(0, 120 * 86400, n)), unit='s')
+    df = pd.DataFrame({
+        'Tarih_Saat': zamanlar,
+        'Konum': rng.choice(['ANKARA', 'IZMIR', 'VAN'], n),
+        'Buyukluk': np.round(rng.uniform(1.0, 5.0, n), 1),
+    })
+    # Aynı ilde aynı anda kaydedilmiş depremler
+    tekrar = df.sample(60, random_state=tohum).copy()
+    tekrar['Buyukluk'] = np.round(rng.uniform(1.0, 5.0, len(tekrar)), 1)
+    return pd.concat([df, tekrar]).sort_values('Tarih_Saat', kind='mergesort').reset_index(drop=True)
+
+
+def il_bazinda_referans(df):
+    """Her il için ayrı ayrı pandas rolling('30D') ve son 30 aralık pencereleri"""
+    parcalar = []
+    for _, il in df.groupby('Konum', sort=False):
+        pencere = il.rolling('30D', on='Tarih_Saat')['Buyukluk']
+        aralik = il['Tarih_Saat'].diff().dt.total_seconds() / 3600
+        parcalar.append(pd.DataFrame({
+            'SonAy_DepremSayisi': pencere.count(),
+            'SonAy_OrtBuyukluk': pencere.mean(),
+            'SonAy_MaxBuyukluk': pencere.max(),
+            'SonAy_MinBuyukluk': pencere.min(),
+            'SonAy_StdBuyukluk': pencere.std(),
+            'SonAy_OrtAralik': aralik.rolling(30).mean(),
+            'SonAy_MaxAralik': aralik.rolling(30).max(),
+            'SonAy_MinAralik': aralik.rolling(30).min(),
+        }, index=il.index))
+    return pd.concat(parcalar).loc[df.index, SONAY_OZELLIKLERI]
+
+
+def test_ozellikler_il_bazinda_rolling_ile_ayni():
+    df = katalog()
+    assert df.duplicated(['Konum', 'Tarih_Saat']).sum() > 0
+
+    ozellikler, araliklar, _ = compute_features(df)
+    referans = il_bazinda_referans(df)
+
+    assert not (referans.fillna(0) == 0).all().any()
+    np.testing.assert_allclose(ozellikler.to_numpy(), referans.to_numpy(), rtol=1e-12, atol=0)
+    beklenen = df.groupby('Konum')['Tarih_Saat'].diff().dt.total_seconds() / 3600
+    np.testing.assert_array_equal(araliklar.to_numpy(), beklenen.to_numpy())
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import geo_labeling
+from conftest import fixture_yolu
+
+SINIRLAR = {
+    'ANKARA': {'lat_min': 39.0, 'lat_max': 41.0, 'lon_min': 32.0, 'lon_max': 34.0},
+    'KIRIKKALE': {'lat_min': 39.7, 'lat_max': 40.3, 'lon_min': 32.7, 'lon_max': 33.3},
+    'IZMIR': {'lat_min': 37.9, 'lat_max': 39.1, 'lon_min': 25.9, 'lon_max': 28.1},
+    'EGE_DENIZI': {'lat_min': 36.0, 'lat_max': 40.0, 'lon_min': 23.5, 'lon_max': 26.0},
+}
+ANKARA, KIRIKKALE, IZMIR, EGE_DENIZI = range(4)
+
+
+@pytest.fixture(scope='module')
+def poligonlar():
+    return geo_labeling.poligonlari_oku(fixture_yolu('il_sinirlari.geojson'), list(SINIRLAR))
+
+
+@pytest.fixture(scope='module')
+def etiketleyici(poligonlar):
+    return geo_labeling.GeoLabeler(SINIRLAR, poligonlar)
+
+
+def test_poligonlari_oku(poligonlar):
+    # Atlantis eşleşmez; adlar aksan ve büyük/küçük harf farkı olmadan eşleşir
+    assert sorted(poligonlar) == [ANKARA, KIRIKKALE, IZMIR]
+    # Dış halka ve iki delik: 4 + 4 + 4 kenar
+    assert len(poligonlar[ANKARA]['kenarlar'][0]) == 12
+    # Kapatılmamış halka kapatılır
+    assert len(poligonlar[KIRIKKALE]['kenarlar'][0]) == 4
+    # MultiPolygon kutusu tüm parçaları kapsar (enlem, enlem, boylam, boylam)
+    assert poligonlar[IZMIR]['kutu'] == (38.0, 39.0, 25.7, 28.0)
+
+
+def test_poligon_kodlari(etiketleyici):
+    lats = np.array([40.5, 40.0, 40.6, 38.5, 38.4, 38.5, 0.0])
+    lons = np.array([32.5, 33.0, 33.6, 27.0, 25.8, 24.5, 0.0])
+    kodlar = etiketleyici._poligon_kodlari_bul(lats, lons)
+    assert kodlar.tolist() == [
+        ANKARA,
+        KIRIKKALE,  # Ankara'nın deliği, Kırıkkale poligonu
+        -1,         # Ankara'nın hiçbir poligonun doldurmadığı deliği
+        IZMIR,
+        IZMIR,      # MultiPolygon'un ada parçası
+        -1,         # deniz
+        -1,         # ızgara dışı
+    ]
+
+
+def test_etiketle(etiketleyici):
+    noktalar = [
+        ((40.0, 33.0), 'KIRIKKALE'),   # kutu yolunda iki merkez de eşit uzaklıkta; poligon belirler
+        ((40.6, 33.6), 'ANKARA'),      # delikte, poligon yok: kutu yoluna düşer
+        ((38.4, 25.8), 'IZMIR'),       # yalnızca Ege kutusunda, ama İzmir adasında
+        ((38.5, 24.5), 'EGE_DENIZI'),  # poligon yok, kutu içinde
+        ((41.5, 33.0), 'ANKARA'),      # hiçbir kutuda değil, Ankara kutusuna ~55 km
+        ((43.0, 33.0), geo_labeling.BELIRSIZ),  # en yakın kutu ~220 km
+        ((0.0, 0.0), geo_labeling.BELIRSIZ),
+    ]
+    lats, lons = np.array([n for n, _ in noktalar]).T
+    assert etiketleyici.etiketle(lats, lons).tolist() == [ad for _, ad in noktalar]
+
+
+def test_poligonsuz_kutu_yolu():
+    etiketleyici = geo_labeling.GeoLabeler(SINIRLAR)
+    lats = np.array([40.0, 38.4, 41.5, 43.0])
+    lons = np.array([33.0, 25.8, 33.0, 33.0])
+    assert etiketleyici.etiketle(lats, lons).tolist() == [
+        'ANKARA', 'EGE_DENIZI', 'ANKARA', geo_labeling.BELIRSIZ]
@@ -0,0 +1,174 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+import data_processing
+import data_scrapper
+import earthquake_store
+from ingest_daemon import IngestDaemon
+
+BASLIK = """<HTML><HEAD><TITLE>Son Depremler</TITLE></HEAD><BODY>
+<pre>
+                           RECENT EARTHQUAKES IN TURKEY
+                  KOERI REGIONAL EARTHQUAKE-TSUNAMI MONITORING CENTER
+                     (QUICK EPICENTER DETERMINATIONS)
+ 
+Date       Time      Latit(N)  Long(E)   Depth(km)     MD   ML   Mw    Region
+---------- --------  --------  -------   ----------    ------------    -----------
+"""
+
+
+def kandilli_sayfasi(df, ek=''):
+    """Olayları lst0.asp düzeninde (en yeni en üstte) bir sayfaya yazar"""
+    satirlar = [f"{r.Tarih:%Y.%m.%d %H:%M:%S}  {r.Enlem:7.4f}   {r.Boylam:7.4f}       {r.Derinlik:5.1f}"
+                f"      -.-  {r.Buyukluk:.1f}  -.-   {r.Yer:<50}İlksel\n"
+                for r in df.sort_values('Tarih', ascending=False).itertuples()]
+    return (BASLIK + ek + ''.join(satirlar) + '</pre></BODY></HTML>\n').encode(data_scrapper.KODLAMA)
+
+
+def olaylar(baslangic, n, tohum):
+    rng = np.random.default_rng(tohum)
+    return pd.DataFrame({
+        'Tarih': pd.Timestamp(baslangic) + pd.to_timedelta(np.arange(n) * 60, unit='s'),
+        'Enlem': np.round(rng.uniform(37.0, 40.5, n), 4),
+        'Boylam': np.round(rng.uniform(27.0, 40.0, n), 4),
+        'Derinlik': np.round(rng.uniform(2.0, 20.0, n), 1),
+        'Buyukluk': np.round(rng.uniform(1.0, 4.5, n), 1),
+        'Yer': 'MERKEZ (ANKARA)',
+    })
+
+
+class Ortam:
+    def __init__(self, daemon, sunucu, api_url, sayfa):
+        self.daemon = daemon
+        self.sunucu = sunucu
+        self.api_url = api_url
+        self.sayfa = sayfa
+        self.olaylar = None
+        self.hata = False
+
+    def yayinla(self, df, ek=''):
+        self.olaylar = df
+        self.sayfa[0] = kandilli_sayfasi(df, ek)
+
+    def sayi(self):
+        return requests.get(f'{self.api_url}/api/earthquakes/count', timeout=10).json()['count']
+
+    def islenen(self):
+        return requests.get(f'{self.api_url}/api/aggregates', timeout=10).json()['count']
+
+    def metrik(self, ad):
+        for satir in self.daemon.metrics.render().splitlines():
+            if satir.startswith(f'earthquake_ingest_{ad} '):
+                return float(satir.split()[-1])
+        return 0.0
+
+
+@pytest.fixture
+def ortam(veri_dizini, sayfa_sunucusu, api_sureci):
+    """
+    Mevcut bir katalog, onu sunan Kandilli taklidi, geçici proje ağacında
+    ayrı süreçte çalışan API ve tek tikle işlem durumu kurulmuş servis
+    """
+    # Mevcut katalog, aynı sayfanın önceki bir indirmesiyle yazılmış gibi kurulur
+    mevcut = olaylar('2024-01-28 08:00:00', 20, tohum=1)
+    earthquake_store.merge(data_scrapper.parse_kandilli(kandilli_sayfasi(mevcut).decode(data_scrapper.KODLAMA)))
+
+    sayfa = [b'']
+    ortam = None
+
+    def yanitla(istek):
+        if ortam is not None and ortam.hata:
+            return 503, {}, b'bakim'
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, sayfa[0]
+
+    sunucu = sayfa_sunucusu(yanitla)
+    api_url = api_sureci()
+    daemon = IngestDaemon([sunucu.url], api_url, interval=0.5)
+    daemon.session = data_scrapper.create_session(retries=0)
+    ortam = Ortam(daemon, sunucu, api_url, sayfa)
+    ortam.yayinla(mevcut)
+    # İlk tik: sayfadaki olaylar zaten katalogda, işlem durumu tam işlemeyle kurulur
+    daemon.tick()
+    assert ortam.sayi() == 20 and ortam.islenen() == 20
+    return ortam
+
+
+def test_tik_yeni_olaylar_kadar_artirir(ortam):
+    ortam.yayinla(pd.concat([ortam.olaylar, olaylar('2024-01-28 09:00:00', 5, tohum=2)]))
+    ortam.daemon.tick()
+    assert ortam.sayi() == 25
+    assert ortam.islenen() == 25
+    assert ortam.metrik('events_total{stage="queryable"}') == 5
+
+    ortam.yayinla(pd.concat([ortam.olaylar, olaylar('2024-01-28 09:30:00', 3, tohum=3)]))
+    ortam.daemon.tick()
+    assert ortam.sayi() == 28
+    assert ortam.islenen() == 28
+    assert ortam.metrik('ticks_total{result="changed"}') == 2
+
+
+def test_tekrarlanan_sayfa_etkisiz(ortam):
+    boyutlar = (os.path.getsize(earthquake_store.csv_path), os.path.getsize(data_processing.output_csv_path))
+
+    # Aynı baytlar (içerik özeti aynı) ve yeniden üretilmiş aynı olaylar (birleştirmede aynı)
+    ortam.daemon.tick()
+    ortam.yayinla(ortam.olaylar, ek='Son guncelleme: 2024.01.28 10:00:00\n')
+    ortam.daemon.tick()
+
+    assert ortam.sayi() == 20
+    assert ortam.islenen() == 20
+    assert ortam.metrik('ticks_total{result="unchanged"}') == 3
+    assert ortam.metrik('events_total{stage="labelled"}') == 0
+    assert boyutlar == (os.path.getsize(earthquake_store.csv_path),
+                        os.path.getsize(data_processing.output_csv_path))
+
+
+def test_birakilan_tik_katalogdan_yetisir(ortam):
+    ortam.yayinla(pd.concat([ortam.olaylar, olaylar('2024-01-28 09:00:00', 4, tohum=4)]))
+    # İşleyici geride kaldığında indiricinin yaptığı gibi: kuyruk kataloğa
+    # yazıldıktan sonra bırakılır
+    assert ortam.daemon.indir() is not None
+    ortam.daemon.backpressure.inc('drop')
+    ortam.daemon._geride.set()
+    assert ortam.islenen() == 20
+
+    # Sayfa değişmese de sonraki tik filigrandan sonrasını katalogdan okur
+    ortam.daemon.tick()
+    assert ortam.sayi() == 24
+    assert ortam.islenen() == 24
+    assert not ortam.daemon._geride.is_set()
+    assert len(pd.read_csv(data_processing.output_csv_path)) == 24
+
+
+def test_indirme_hatasi_sayilir(ortam):
+    ortam.hata = True
+    ortam.daemon.tick()
+    assert ortam.metrik('errors_total{stage="fetch"}') == 1
+    assert ortam.metrik('ticks_total{result="error"}') == 1
+
+    ortam.hata = False
+    ortam.yayinla(pd.concat([ortam.olaylar, olaylar('2024-01-28 09:00:00', 2, tohum=5)]))
+    ortam.daemon.tick()
+    assert ortam.sayi() == 22
+    assert ortam.islenen() == 22
+
+
+def test_revize_ve_gec_olay_apiye_yansir(ortam):
+    # Filigrandan eski iki değişiklik: büyüklüğü revize edilen olay ve geç gelen olay
+    revize = ortam.olaylar.copy()
+    revize.loc[3, 'Buyukluk'] = 6.6
+    gec = olaylar('2024-01-28 08:05:30', 1, tohum=6)
+    ortam.yayinla(pd.concat([revize, gec], ignore_index=True))
+    ortam.daemon.tick()
+
+    assert ortam.sayi() == 21
+    assert ortam.islenen() == 21
+    en_buyuk = requests.get(f'{ortam.api_url}/api/largest-earthquakes?k=1', timeout=10).json()['data'][0]
+    assert (en_buyuk['Tarih_Saat'], en_buyuk['Buyukluk']) == ('2024-01-28 08:03:00', 6.6)
+    cikti = pd.read_csv(data_processing.output_csv_path)
+    assert len(cikti) == 21 and cikti['Tarih_Saat'].is_monotonic_increasing
+    assert cikti['Buyukluk'].max() == 6.6
@@ -0,0 +1,63 @@
+import requests
+
+import data_processing
+import earthquake_store
+from response_cache import ResponseCache, etag
+from test_ingest_daemon import olaylar
+
+
+def test_lru_ve_surum_degisince_bosalma():
+    cache = ResponseCache(max_entries=2)
+    cache.surumleri_kontrol_et((1, 1))
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)  # en az yakın zamanda kullanılan 'b' atılır
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+    cache.surumleri_kontrol_et((1, 1))
+    assert cache.get('a') == 1
+    cache.surumleri_kontrol_et((2, 1))
+    assert cache.get('a') is None and cache.get('c') is None
+    assert cache.status() == dict(hits=3, misses=3, evictions=1, invalidations=1, not_modified=0,
+                                  entries=0, max_entries=2)
+
+
+def test_etag_anahtara_bagli():
+    assert etag(('largest', (5, None, None), (3,))) == etag(('largest', (5, None, None), (3,)))
+    assert etag(('largest', (5, None, None), (3,))) != etag(('largest', (5, None, None), (4,)))
+
+
+def test_etag_304_ve_eklemeden_sonra_gecersizlesme(veri_dizini, api_sureci):
+    earthquake_store.merge(olaylar('2024-01-28 08:00:00', 30, tohum=1))
+    data_processing.tam_isle()
+    api_url = api_sureci()
+    url = f'{api_url}/api/largest-earthquakes?k=3'
+
+    ilk = requests.get(url, timeout=10)
+    assert ilk.status_code == 200 and ilk.headers['ETag']
+    ayni = requests.get(url, headers={'If-None-Match': ilk.headers['ETag']}, timeout=10)
+    assert ayni.status_code == 304 and ayni.content == b''
+    assert ayni.headers['ETag'] == ilk.headers['ETag']
+    # Önbellekten dönen yanıt aynı gövde ve ETag'i taşır
+    tekrar = requests.get(url, timeout=10)
+    assert tekrar.content == ilk.content and tekrar.headers['ETag'] == ilk.headers['ETag']
+
+    # Katalogdakilerden büyük yeni bir olay eklenip API'ye bildirilir
+    yeni = olaylar('2024-01-28 09:00:00', 1, tohum=2)
+    yeni['Buyukluk'] = 7.1
+    earthquake_store.merge(yeni)
+    data_processing.artimli_isle()
+    assert requests.post(f'{api_url}/api/refresh', json={}, timeout=10).json()['refreshed'] == ['catalog', 'spatial']
+
+    sonra = requests.get(url, headers={'If-None-Match': ilk.headers['ETag']}, timeout=10)
+    assert sonra.status_code == 200
+    assert sonra.headers['ETag'] != ilk.headers['ETag']
+    en_buyuk = sonra.json()['data'][0]
+    assert (en_buyuk['Tarih_Saat'], en_buyuk['Buyukluk']) == ('2024-01-28 09:00:00', 7.1)
+
+    istatistik = requests.get(f'{api_url}/api/cache-stats', timeout=10).json()['cache']
+    assert istatistik['not_modified'] == 1
+    assert istatistik['invalidations'] >= 1
+    assert istatistik['hits'] >= 1
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rollup_store import RollupStore
+
+
+def katalog(n, baslangic='2024-01-01', tohum=0):
+    rng = np.random.default_rng(tohum)
+    return pd.DataFrame({
+        'Tarih_Saat': pd.Timestamp(baslangic) + pd.to_timedelta(rng.integers(0, 40 * 86400, n), unit='s'),
+        'Konum': rng.choice(['ANKARA', 'IZMIR', 'VAN', 'MUĞLA'], n),
+        'Buyukluk': np.round(rng.gamma(2.0, 0.7, n) + 0.5, 1),
+    })
+
+
+@pytest.fixture(scope='module')
+def depo_ve_katalog():
+    # Sırasız satırlar ve önceki eklemelerle aynı günlere düşen geç kayıtlar
+    parcalar = [katalog(3000, tohum=1), katalog(500, '2024-02-05', tohum=2), katalog(400, '2024-01-10', tohum=3)]
+    depo = RollupStore()
+    for parca in parcalar:
+        depo.append(parca)
+    return depo, pd.concat(parcalar, ignore_index=True)
+
+
+def suz(df, konum, start, end):
+    gun = df['Tarih_Saat'].dt.floor('D')
+    maske = np.ones(len(df), dtype=bool)
+    if konum is not None:
+        maske &= df['Konum'] == konum
+    if start is not None:
+        maske &= gun >= pd.Timestamp(start).floor('D')
+    if end is not None:
+        maske &= gun <= pd.Timestamp(end).floor('D')
+    return df[maske].assign(day=gun[maske].dt.strftime('%Y-%m-%d'))
+
+
+def gruplar(df, group):
+    anahtarlar = {'day': ['day'], 'location': ['Konum'], 'location_day': ['Konum', 'day']}[group]
+    ozet = df.groupby(anahtarlar)['Buyukluk'].agg(['size', 'max']).reset_index()
+    ozet = ozet.rename(columns={'Konum': 'location', 'size': 'count', 'max': 'max_magnitude'})
+    return [{k: (int(v) if k == 'count' else v) for k, v in satir.items()}
+            for satir in ozet.to_dict('records')]
+
+
+def histogram(df, genislik):
+    birlestir = int(round(genislik / 0.1))
+    kutular = np.floor(df['Buyukluk'].to_numpy() / 0.1 + 1e-9).astype(np.int64) // birlestir
+    sayilar = pd.Series(kutular).value_counts().sort_index()
+    kumulatif = sayilar[::-1].cumsum()[::-1]
+    return [{'magnitude': round(k * birlestir * 0.1, 1), 'count': int(sayilar[k]), 'cumulative': int(kumulatif[k])}
+            for k in sayilar.index]
+
+
+ARALIKLAR = [(None, None), ('2024-01-15', None), (None, '2024-01-20 18:30:00'), ('2024-02-01', '2024-02-01')]
+
+
+@pytest.mark.parametrize('konum', [None, 'VAN', 'MUĞLA'])
+@pytest.mark.parametrize('start,end', ARALIKLAR)
+@pytest.mark.parametrize('group', [None, 'day', 'location', 'location_day'])
+def test_ozetler_pandas_ile_ayni(depo_ve_katalog, konum, start, end, group):
+    depo, df = depo_ve_katalog
+    sonuc = depo.query(konum, start, end, group)
+    secilen = suz(df, konum, start, end)
+
+    assert sonuc['count'] == len(secilen)
+    assert sonuc['max_magnitude'] == (secilen['Buyukluk'].max() if len(secilen) else None)
+    if group is None:
+        assert 'groups' not in sonuc
+    else:
+        assert sonuc['groups'] == gruplar(secilen, group)
+
+
+@pytest.mark.parametrize('genislik', [0.1, 0.5, 1.0])
+@pytest.mark.parametrize('konum,start,end', [(None, None, None), ('IZMIR', '2024-01-05', '2024-02-10')])
+def test_histogram_pandas_ile_ayni(depo_ve_katalog, genislik, konum, start, end):
+    depo, df = depo_ve_katalog
+    sonuc = depo.query(konum, start, end, bin_width=genislik)
+    assert sonuc['bin_width'] == genislik
+    assert sonuc['histogram'] == histogram(suz(df, konum, start, end), genislik)
+
+
+def test_bilinmeyen_il_ve_bos_aralik(depo_ve_katalog):
+    depo, _ = depo_ve_katalog
+    assert 'ATLANTIS' not in depo
+    assert depo.query('ATLANTIS') == {'count': 0, 'max_magnitude': None}
+    assert depo.query(start='2030-01-01', group='day') == {'count': 0, 'max_magnitude': None, 'groups': []}
+    assert depo.rows == 3900
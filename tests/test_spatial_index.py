@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial_index import SpatialIndex, haversine_km
+
+
+def olaylar(n, baslangic='2024-01-01', tohum=0):
+    rng = np.random.default_rng(tohum)
+    df = pd.DataFrame({
+        'Tarih': pd.Timestamp(baslangic) + pd.to_timedelta(np.sort(rng.integers(0, 60 * 86400, n)), unit='s'),
+        'Enlem': np.round(rng.uniform(35.0, 43.0, n), 4),
+        'Boylam': np.round(rng.uniform(25.0, 45.0, n), 4),
+        'Derinlik': np.round(rng.uniform(1.0, 30.0, n), 1),
+        'Buyukluk': np.round(rng.uniform(1.0, 6.0, n), 1),
+        'Yer': rng.choice(['MERKEZ (ANKARA)', 'AKDENIZ', 'EGE DENIZI'], n),
+    })
+    # Izgara çizgisi üzerindeki olaylar (hücre sınırı 0.5 derece)
+    df.loc[:19, 'Enlem'] = 38.5
+    df.loc[10:29, 'Boylam'] = 27.0
+    return df
+
+
+@pytest.fixture(scope='module')
+def indeks_ve_katalog():
+    # İlk yükleme, sıralı ekleme ve mevcut son zamandan eski satırlar (yeniden kurulum)
+    parcalar = [olaylar(4000, tohum=1), olaylar(300, '2024-03-01', tohum=2), olaylar(200, '2024-01-20', tohum=3)]
+    indeks = SpatialIndex(parcalar[0])
+    for parca in parcalar[1:]:
+        indeks.append(parca)
+    df = pd.concat(parcalar, ignore_index=True).sort_values('Tarih', kind='mergesort').reset_index(drop=True)
+    return indeks, df
+
+
+def zaman_maskesi(df, start, end):
+    maske = np.ones(len(df), dtype=bool)
+    if start is not None:
+        maske &= df['Tarih'] >= pd.Timestamp(start)
+    if end is not None:
+        maske &= df['Tarih'] <= pd.Timestamp(end)
+    return maske
+
+
+ARALIKLAR = [(None, None), ('2024-01-15', None), (None, '2024-02-01 12:00:00'), ('2024-02-10', '2024-02-12')]
+
+
+@pytest.mark.parametrize('start,end', ARALIKLAR)
+@pytest.mark.parametrize('min_mag,max_mag', [(None, None), (3.0, None), (2.0, 2.5)])
+def test_zaman_araligi_kaba_kuvvetle_ayni(indeks_ve_katalog, start, end, min_mag, max_mag):
+    indeks, df = indeks_ve_katalog
+    konumlar, uzakliklar = indeks.query(start=start, end=end, min_mag=min_mag, max_mag=max_mag)
+    maske = zaman_maskesi(df, start, end)
+    if min_mag is not None:
+        maske &= df['Buyukluk'] >= min_mag
+    if max_mag is not None:
+        maske &= df['Buyukluk'] <= max_mag
+    assert uzakliklar is None
+    np.testing.assert_array_equal(konumlar, np.flatnonzero(maske))
+
+
+@pytest.mark.parametrize('start,end', ARALIKLAR)
+@pytest.mark.parametrize('bbox', [(38.5, 40.0, 27.0, 30.0), (36.12, 36.13, 30.0, 31.0),
+                                  (30.0, 50.0, 20.0, 50.0), (40.0, 39.0, 27.0, 30.0)])
+def test_kutu_kaba_kuvvetle_ayni(indeks_ve_katalog, start, end, bbox):
+    indeks, df = indeks_ve_katalog
+    konumlar, _ = indeks.query(start=start, end=end, bbox=bbox)
+    maske = (zaman_maskesi(df, start, end) & df['Enlem'].between(bbox[0], bbox[1]) &
+             df['Boylam'].between(bbox[2], bbox[3]))
+    np.testing.assert_array_equal(konumlar, np.flatnonzero(maske))
+
+
+@pytest.mark.parametrize('start,end', ARALIKLAR)
+@pytest.mark.parametrize('merkez,yaricap', [((38.5, 27.0), 50.0), ((39.9, 32.85), 250.0),
+                                             ((41.0, 29.0), 1.0), ((37.0, 44.9), 400.0)])
+def test_yaricap_kaba_kuvvetle_ayni(indeks_ve_katalog, start, end, merkez, yaricap):
+    indeks, df = indeks_ve_katalog
+    konumlar, uzakliklar = indeks.query(start=start, end=end, center=merkez, radius_km=yaricap)
+    tum = haversine_km(merkez[0], merkez[1], df['Enlem'].to_numpy(), df['Boylam'].to_numpy())
+    beklenen = np.flatnonzero(zaman_maskesi(df, start, end) & (tum <= yaricap))
+    np.testing.assert_array_equal(konumlar, beklenen)
+    np.testing.assert_array_equal(uzakliklar, tum[beklenen])
+
+
+def test_sayfa_ve_ozet_pandas_ile_ayni(indeks_ve_katalog):
+    indeks, df = indeks_ve_katalog
+    konumlar, _ = indeks.query(start='2024-02-01', bbox=(36.0, 41.0, 26.0, 40.0))
+    secilen = df.iloc[konumlar]
+
+    sayfa = indeks.events(konumlar, limit=10, offset=5)
+    beklenen = secilen.iloc[::-1].iloc[5:15]
+    assert [k['Tarih'] for k in sayfa] == list(beklenen['Tarih'].dt.strftime('%Y-%m-%d %H:%M:%S'))
+    assert [(k['Enlem'], k['Boylam'], k['Yer']) for k in sayfa] == \
+        list(zip(beklenen['Enlem'], beklenen['Boylam'], beklenen['Yer']))
+
+    ozet = indeks.summarize(konumlar, group='day')
+    gunluk = secilen.groupby(secilen['Tarih'].dt.strftime('%Y-%m-%d'))['Buyukluk'].agg(['count', 'max'])
+    assert ozet['count'] == len(secilen)
+    assert ozet['max_magnitude'] == secilen['Buyukluk'].max()
+    assert [(g['period'], g['count'], g['max_magnitude']) for g in ozet['groups']] == \
+        list(zip(gunluk.index, gunluk['count'], gunluk['max']))